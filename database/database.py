@@ -1,10 +1,32 @@
 import sqlite3
 import os
 from pathlib import Path
+from database import migrations
+
+# Pragmas aplicados a cada conexión que entrega el manager.
+# cache_size negativo = KiB (≈16 MB de caché de páginas).
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+def database_key(conn) -> str:
+    """Ruta del archivo 'main' de una conexión; identifica la BD en cachés de proceso."""
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main" and path:
+            return path
+    return f":memory:{id(conn)}"
+
 
 class DatabaseManager:
     def __init__(self, db_path=None):
         self.db_path = db_path or self.get_default_db_path()
+        self._conn = None
         self.init_db()
     
     def get_default_db_path(self):
@@ -18,23 +40,49 @@ class DatabaseManager:
         return app_data / 'school.db'
     
     def get_connection(self):
-        """Obtener conexión a la base de datos"""
+        """Abrir una conexión nueva y configurada (hilos de trabajo, scripts)"""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         return conn
-    
+
+    def connection(self):
+        """Conexión compartida de larga vida para las pantallas de la app.
+
+        Se abre una sola vez; navegar entre pantallas reutiliza la misma
+        conexión (y su caché de páginas caliente) en lugar de reconectar.
+        """
+        if self._conn is None:
+            self._conn = self.get_connection()
+        return self._conn
+
+    def close(self):
+        """Cerrar la conexión compartida (al salir de la aplicación)"""
+        if self._conn is not None:
+            try:
+                # Deja el WAL integrado en la BD principal antes de salir
+                self._conn.execute("PRAGMA optimize")
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+            self._conn = None
+
     def init_db(self):
-        """Inicializar la base de datos si no existe"""
+        """Crear la base de datos si no existe y aplicar migraciones pendientes"""
         if not os.path.exists(self.db_path):
             print("Creando base de datos por primera vez...")
             self.create_database()
+        # Con el esquema al día esto cuesta una lectura de PRAGMA user_version
+        migrations.migrate(self.connection())
     
     def create_database(self):
         """Crear la base de datos desde schema.sql"""
         schema_path = Path(__file__).parent / 'schema.sql'
         print(f"Schema Path: {schema_path}")
 
-        with self.get_connection() as conn:
+        with self.connection() as conn:
             # Ejecutar schema completo
             with open(schema_path, 'r', encoding='utf-8') as f:
                 schema_sql = f.read()
@@ -44,6 +92,9 @@ class DatabaseManager:
             self.insert_initial_data(conn)
             
             conn.commit()
+
+        # schema.sql ya es el esquema más reciente
+        migrations.stamp(self.connection())
     
     def insert_initial_data(self, conn):
         """Insertar datos mínimos para que funcione la app"""
@@ -70,7 +121,7 @@ class DatabaseManager:
     def authenticate_user(self, username, password):
         """Autenticar usuario contra la base de datos"""
         username = username.upper()
-        with self.get_connection() as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, employee_code, first_name, second_name, role, job_title 
@@ -83,7 +134,7 @@ class DatabaseManager:
 
     def get_user_by_id(self, user_id):
         """Obtener usuario por ID"""
-        with self.get_connection() as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, employee_code, first_name, second_name, role, username
@@ -0,0 +1,388 @@
+# database/migrations.py
+"""
+Migraciones versionadas del esquema.
+
+La versión vive en PRAGMA user_version. schema.sql describe siempre el
+esquema más reciente: una BD nueva se crea desde ahí y se marca con
+SCHEMA_VERSION; una BD existente aplica, en orden, los pasos pendientes.
+Cada paso corre en su propia transacción junto con el cambio de versión,
+así que una falla deja la BD en la última versión completa. Cada paso trae
+su propio DDL (no lee schema.sql): una versión publicada no cambia aunque
+schema.sql siga evolucionando.
+"""
+import sqlite3
+from shared.utils import student_search_tokens
+
+
+def _split_statements(script: str) -> list:
+    """Divide un script SQL en sentencias completas (respeta BEGIN...END)."""
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def column_exists(conn, table: str, column: str) -> bool:
+    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+
+# =========================================
+# PASOS
+# =========================================
+def _m1_products_pos_flags(conn):
+    # Instalaciones anteriores a los accesos directos del POS
+    for column in ("is_pos_shortcut", "print_logo"):
+        if not column_exists(conn, "products", column):
+            conn.execute(f"ALTER TABLE products ADD COLUMN {column} BOOLEAN DEFAULT FALSE")
+
+
+_M2_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_sale_items_sku ON sale_items(sku);
+CREATE INDEX IF NOT EXISTS idx_products_active ON products(active, description);
+CREATE INDEX IF NOT EXISTS idx_customers_active ON customers(active, first_name, second_name);
+"""
+
+
+# DDL de cada migración tal como se publicó: schema.sql puede seguir
+# cambiando, pero una versión ya aplicada no debe cambiar de significado.
+_M3_SALES_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_items_ai AFTER INSERT ON sale_items
+BEGIN
+  UPDATE sales
+  SET subtotal       = subtotal + NEW.qty*NEW.unit_price,
+      discount_total = discount_total + NEW.discount,
+      tax_total      = tax_total + ((NEW.qty*NEW.unit_price)-NEW.discount)*NEW.tax_rate,
+      total          = total + ((NEW.qty*NEW.unit_price)-NEW.discount)*(1+NEW.tax_rate)
+  WHERE id = NEW.sale_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_au AFTER UPDATE ON sale_items
+BEGIN
+  UPDATE sales
+  SET subtotal       = subtotal - OLD.qty*OLD.unit_price,
+      discount_total = discount_total - OLD.discount,
+      tax_total      = tax_total - ((OLD.qty*OLD.unit_price)-OLD.discount)*OLD.tax_rate,
+      total          = total - ((OLD.qty*OLD.unit_price)-OLD.discount)*(1+OLD.tax_rate)
+  WHERE id = OLD.sale_id;
+  UPDATE sales
+  SET subtotal       = subtotal + NEW.qty*NEW.unit_price,
+      discount_total = discount_total + NEW.discount,
+      tax_total      = tax_total + ((NEW.qty*NEW.unit_price)-NEW.discount)*NEW.tax_rate,
+      total          = total + ((NEW.qty*NEW.unit_price)-NEW.discount)*(1+NEW.tax_rate)
+  WHERE id = NEW.sale_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_ad AFTER DELETE ON sale_items
+BEGIN
+  UPDATE sales
+  SET subtotal       = subtotal - OLD.qty*OLD.unit_price,
+      discount_total = discount_total - OLD.discount,
+      tax_total      = tax_total - ((OLD.qty*OLD.unit_price)-OLD.discount)*OLD.tax_rate,
+      total          = total - ((OLD.qty*OLD.unit_price)-OLD.discount)*(1+OLD.tax_rate)
+  WHERE id = OLD.sale_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_payments_ai AFTER INSERT ON payments
+BEGIN
+  UPDATE sales SET paid_total = paid_total + NEW.amount WHERE id = NEW.sale_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_payments_au AFTER UPDATE ON payments
+BEGIN
+  UPDATE sales SET paid_total = paid_total - OLD.amount WHERE id = OLD.sale_id;
+  UPDATE sales SET paid_total = paid_total + NEW.amount WHERE id = NEW.sale_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_payments_ad AFTER DELETE ON payments
+BEGIN
+  UPDATE sales SET paid_total = paid_total - OLD.amount WHERE id = OLD.sale_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sales_payment_status
+AFTER UPDATE OF total, paid_total ON sales
+FOR EACH ROW
+WHEN NEW.payment_status IS NOT (CASE
+    WHEN NEW.paid_total >= NEW.total - 0.005 THEN 'paid'
+    WHEN NEW.paid_total > 0 THEN 'partial'
+    ELSE 'unpaid'
+  END)
+BEGIN
+  UPDATE sales
+  SET payment_status = CASE
+    WHEN NEW.paid_total >= NEW.total - 0.005 THEN 'paid'
+    WHEN NEW.paid_total > 0 THEN 'partial'
+    ELSE 'unpaid'
+  END
+  WHERE id = NEW.id;
+END;
+"""
+
+
+def _m3_incremental_sale_totals(conn):
+    # Triggers viejos: recálculo completo vía v_sales_calc y dos familias
+    # (trg_payments_* y trg_pay_*) reescribiendo payment_status
+    for name in ("trg_items_ai", "trg_items_au", "trg_items_ad",
+                 "trg_payments_ai", "trg_payments_au", "trg_payments_ad",
+                 "trg_pay_ai", "trg_pay_au", "trg_pay_ad"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    if not column_exists(conn, "sales", "paid_total"):
+        conn.execute("ALTER TABLE sales ADD COLUMN paid_total REAL NOT NULL DEFAULT 0")
+
+    for statement in _split_statements(_M3_SALES_TRIGGERS):
+        conn.execute(statement)
+
+    # Recalcular una sola vez; trg_sales_payment_status normaliza el estado
+    conn.execute("""
+        UPDATE sales
+        SET subtotal       = (SELECT sub  FROM v_sales_calc WHERE sale_id = sales.id),
+            discount_total = (SELECT disc FROM v_sales_calc WHERE sale_id = sales.id),
+            tax_total      = (SELECT iva  FROM v_sales_calc WHERE sale_id = sales.id),
+            total          = (SELECT tot  FROM v_sales_calc WHERE sale_id = sales.id),
+            paid_total     = COALESCE((SELECT SUM(amount) FROM payments WHERE sale_id = sales.id), 0)
+    """)
+
+
+_M4_ITEMS_TRIGGER = """
+DROP TRIGGER IF EXISTS trg_items_ai;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_ai AFTER INSERT ON sale_items
+WHEN (SELECT status FROM sales WHERE id = NEW.sale_id) IS NOT 'posting'
+BEGIN
+  UPDATE sales
+  SET subtotal       = subtotal + NEW.qty*NEW.unit_price,
+      discount_total = discount_total + NEW.discount,
+      tax_total      = tax_total + ((NEW.qty*NEW.unit_price)-NEW.discount)*NEW.tax_rate,
+      total          = total + ((NEW.qty*NEW.unit_price)-NEW.discount)*(1+NEW.tax_rate)
+  WHERE id = NEW.sale_id;
+END;
+"""
+
+
+def fts5_available(conn) -> bool:
+    """True si el SQLite enlazado trae FTS5 compilado."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+# Índice de texto completo de productos. Es opcional (depende de FTS5), por
+# eso vive aquí y no en schema.sql. Tabla FTS con copia propia del texto:
+# products no tiene INTEGER PRIMARY KEY y su rowid puede cambiar con VACUUM.
+_PRODUCTS_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+  sku, description,
+  tokenize = "unicode61 remove_diacritics 2",
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_ai AFTER INSERT ON products
+BEGIN
+  INSERT INTO products_fts (sku, description) VALUES (NEW.sku, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_au AFTER UPDATE OF sku, description ON products
+BEGIN
+  DELETE FROM products_fts WHERE sku = OLD.sku;
+  INSERT INTO products_fts (sku, description) VALUES (NEW.sku, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_ad AFTER DELETE ON products
+BEGIN
+  DELETE FROM products_fts WHERE sku = OLD.sku;
+END;
+"""
+
+
+def _m5_products_fts(conn):
+    if not fts5_available(conn):
+        print("FTS5 no disponible: la búsqueda de productos usará LIKE")
+        return
+    for statement in _split_statements(_PRODUCTS_FTS):
+        conn.execute(statement)
+    conn.execute("DELETE FROM products_fts")
+    conn.execute("INSERT INTO products_fts (sku, description) SELECT sku, description FROM products")
+
+
+_M6_SEARCH_TOKENS = """
+CREATE TABLE IF NOT EXISTS customer_search_tokens (
+  token TEXT NOT NULL,
+  customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+  PRIMARY KEY (token, customer_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_customer_tokens_customer ON customer_search_tokens(customer_id);
+"""
+
+
+def _m6_customer_search_keys(conn):
+    if not column_exists(conn, "customers", "search_key"):
+        conn.execute("ALTER TABLE customers ADD COLUMN search_key TEXT")
+    for statement in _split_statements(_M6_SEARCH_TOKENS):
+        conn.execute(statement)
+
+    # La normalización es Python (unicodedata): se calcula aquí y no en SQL
+    rows = conn.execute("SELECT id, enrollment, first_name, second_name FROM customers").fetchall()
+    keys, tokens = [], []
+    for customer_id, enrollment, first_name, second_name in rows:
+        words = student_search_tokens(enrollment, first_name, second_name)
+        keys.append((" ".join(words), customer_id))
+        tokens.extend((word, customer_id) for word in words)
+    conn.executemany("UPDATE customers SET search_key = ? WHERE id = ?", keys)
+    conn.execute("DELETE FROM customer_search_tokens")
+    conn.executemany("INSERT OR IGNORE INTO customer_search_tokens (token, customer_id) VALUES (?, ?)", tokens)
+
+
+def _m7_customer_import_hash(conn):
+    # NULL = nunca importado con huella: el siguiente import compara campo por campo
+    if not column_exists(conn, "customers", "import_hash"):
+        conn.execute("ALTER TABLE customers ADD COLUMN import_hash TEXT")
+
+
+_M8_IMPORT_CHECKPOINTS = """
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+  source TEXT PRIMARY KEY,        -- ruta absoluta del archivo
+  fingerprint TEXT NOT NULL,      -- tamaño:fecha de modificación
+  rows_done INTEGER NOT NULL,     -- renglones de datos ya confirmados
+  updated_at TEXT NOT NULL DEFAULT (datetime('now','localtime'))
+);
+"""
+
+
+# Los triggers de la migración 5 borran por sku: FTS5 no puede usar índice
+# con ese WHERE y recorre toda la tabla en cada cambio de producto.
+# products_fts_docs le da a cada SKU un rowid estable en el índice y los
+# triggers nuevos borran por rowid (búsqueda directa).
+_PRODUCTS_FTS_ROWIDS = """
+DROP TRIGGER IF EXISTS trg_products_fts_ai;
+DROP TRIGGER IF EXISTS trg_products_fts_au;
+DROP TRIGGER IF EXISTS trg_products_fts_ad;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+  sku, description,
+  tokenize = "unicode61 remove_diacritics 2",
+  prefix = '2 3'
+);
+
+CREATE TABLE IF NOT EXISTS products_fts_docs (
+  docid INTEGER PRIMARY KEY,
+  sku TEXT NOT NULL UNIQUE
+);
+
+CREATE TRIGGER trg_products_fts_ai AFTER INSERT ON products
+BEGIN
+  INSERT INTO products_fts_docs (sku) VALUES (NEW.sku);
+  INSERT INTO products_fts (rowid, sku, description)
+  VALUES ((SELECT docid FROM products_fts_docs WHERE sku = NEW.sku), NEW.sku, NEW.description);
+END;
+
+CREATE TRIGGER trg_products_fts_au AFTER UPDATE OF sku, description ON products
+BEGIN
+  DELETE FROM products_fts WHERE rowid = (SELECT docid FROM products_fts_docs WHERE sku = OLD.sku);
+  UPDATE products_fts_docs SET sku = NEW.sku WHERE sku = OLD.sku;
+  INSERT INTO products_fts (rowid, sku, description)
+  VALUES ((SELECT docid FROM products_fts_docs WHERE sku = NEW.sku), NEW.sku, NEW.description);
+END;
+
+CREATE TRIGGER trg_products_fts_ad AFTER DELETE ON products
+BEGIN
+  DELETE FROM products_fts WHERE rowid = (SELECT docid FROM products_fts_docs WHERE sku = OLD.sku);
+  DELETE FROM products_fts_docs WHERE sku = OLD.sku;
+END;
+
+DELETE FROM products_fts;
+DELETE FROM products_fts_docs;
+INSERT INTO products_fts_docs (sku) SELECT sku FROM products;
+INSERT INTO products_fts (rowid, sku, description)
+SELECT d.docid, p.sku, p.description
+  FROM products p JOIN products_fts_docs d ON d.sku = p.sku;
+"""
+
+
+def _m9_products_fts_rowids(conn):
+    if not fts5_available(conn):
+        return
+    for statement in _split_statements(_PRODUCTS_FTS_ROWIDS):
+        conn.execute(statement)
+
+
+# (versión, descripción, paso) — el paso es SQL o un callable(conn)
+MIGRATIONS = [
+    (1, "Columnas POS en products", _m1_products_pos_flags),
+    (2, "Índices de listados y más vendidos", _M2_INDEXES),
+    (3, "Totales de venta incrementales", _m3_incremental_sale_totals),
+    (4, "Ventas en captura no acumulan renglones", _M4_ITEMS_TRIGGER),
+    (5, "Búsqueda de productos FTS5", _m5_products_fts),
+    (6, "Llaves de búsqueda de alumnos sin acentos", _m6_customer_search_keys),
+    (7, "Huella de importación de alumnos", _m7_customer_import_hash),
+    (8, "Puntos de control de importación", _M8_IMPORT_CHECKPOINTS),
+    (9, "Índice FTS5 de productos con rowid por SKU", _m9_products_fts_rowids),
+]
+
+# Pasos que schema.sql no puede expresar (dependen de extensiones opcionales);
+# también corren al crear una BD nueva
+OPTIONAL_STEPS = [_m5_products_fts, _m9_products_fts_rowids]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# =========================================
+# MOTOR
+# =========================================
+def get_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def stamp(conn, version: int = SCHEMA_VERSION):
+    """Prepara una BD recién creada desde schema.sql y la marca con su versión."""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for step in OPTIONAL_STEPS:
+            step(conn)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def migrate(conn) -> int:
+    """Aplica las migraciones pendientes. Si la BD está al día solo lee el pragma."""
+    current = get_version(conn)
+    if current >= SCHEMA_VERSION:
+        return current
+
+    if conn.in_transaction:
+        conn.commit()
+
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if callable(step):
+                step(conn)
+            else:
+                for statement in _split_statements(step):
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Migración {version} aplicada: {description}")
+        current = version
+
+    return current
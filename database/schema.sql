@@ -85,6 +85,8 @@ CREATE TABLE IF NOT EXISTS customers (
   curp TEXT UNIQUE,
   pay_reference TEXT,
   active INTEGER NOT NULL DEFAULT 1,
+  search_key TEXT, -- nombre + matrícula normalizados (shared.utils.fold_text)
+  import_hash TEXT, -- huella del último renglón importado del Excel (tools/import_customers.py)
   created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
   updated_at TEXT NOT NULL DEFAULT (datetime('now','localtime'))
 );
@@ -100,6 +102,28 @@ END;
 CREATE INDEX IF NOT EXISTS idx_customers_enrollment ON customers(enrollment);
 CREATE INDEX IF NOT EXISTS idx_customers_nombre ON customers(second_name, first_name);
 CREATE INDEX IF NOT EXISTS idx_customers_salon ON customers(grade_id, group_id, shift_id);
+CREATE INDEX IF NOT EXISTS idx_customers_active ON customers(active, first_name, second_name);
+
+-- Palabras de search_key para búsqueda por prefijo (token >= ? AND token < ?)
+-- Las mantiene StudentRepository / tools/import_customers.py
+CREATE TABLE IF NOT EXISTS customer_search_tokens (
+  token TEXT NOT NULL,
+  customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+  PRIMARY KEY (token, customer_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_customer_tokens_customer ON customer_search_tokens(customer_id);
+
+
+
+-- Avance de tools/import_customers.py por archivo, para reanudar una
+-- importación interrumpida; se borra al terminar
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+  source TEXT PRIMARY KEY,        -- ruta absoluta del archivo
+  fingerprint TEXT NOT NULL,      -- tamaño:fecha de modificación
+  rows_done INTEGER NOT NULL,     -- renglones de datos ya confirmados
+  updated_at TEXT NOT NULL DEFAULT (datetime('now','localtime'))
+);
 
 
 
@@ -209,6 +233,9 @@ FOR EACH ROW BEGIN
 END;
 
 CREATE INDEX IF NOT EXISTS idx_products_desc ON products(description);
+CREATE INDEX IF NOT EXISTS idx_products_active ON products(active, description);
+
+-- products_fts (FTS5, opcional) se crea desde database/migrations.py
 
 -- =========================================
 -- TABLA: sales
@@ -224,6 +251,7 @@ CREATE TABLE IF NOT EXISTS sales (
   discount_total REAL NOT NULL DEFAULT 0,
   tax_total REAL NOT NULL DEFAULT 0,
   total REAL NOT NULL DEFAULT 0,
+  paid_total REAL NOT NULL DEFAULT 0,
   status TEXT NOT NULL DEFAULT 'paid',
   payment_status TEXT NOT NULL DEFAULT 'unpaid',
   created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
@@ -268,6 +296,7 @@ CREATE TABLE IF NOT EXISTS sale_items (
 );
 
 CREATE INDEX IF NOT EXISTS idx_sale_items_saleid ON sale_items(sale_id);
+CREATE INDEX IF NOT EXISTS idx_sale_items_sku ON sale_items(sku);
 
 -- ================================
 -- TABLA: Métodos de Pago
@@ -319,118 +348,97 @@ FROM sales s
 LEFT JOIN sale_items si ON si.sale_id = s.id
 GROUP BY s.id;
 
+-- =========================================
+-- VISTA: v_sales_paid (pagos por venta)
+-- =========================================
+DROP VIEW IF EXISTS v_sales_paid;
+CREATE VIEW v_sales_paid AS
+SELECT
+  s.id AS sale_id,
+  s.total AS total_doc,
+  COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.sale_id = s.id),0) AS total_paid
+FROM sales s;
+
 -- =========================================
 -- TRIGGERS: mantener totales en sales
+-- Cada renglón suma/resta solo su aporte (O(1)); v_sales_calc queda
+-- para conciliación y reportes. Una venta en status 'posting' ya trae
+-- sus totales calculados (SaleRepository.create_sale) y no se acumula.
 -- =========================================
 CREATE TRIGGER IF NOT EXISTS trg_items_ai AFTER INSERT ON sale_items
+WHEN (SELECT status FROM sales WHERE id = NEW.sale_id) IS NOT 'posting'
 BEGIN
   UPDATE sales
-  SET subtotal       = (SELECT sub  FROM v_sales_calc WHERE sale_id = NEW.sale_id),
-      discount_total = (SELECT disc FROM v_sales_calc WHERE sale_id = NEW.sale_id),
-      tax_total      = (SELECT iva  FROM v_sales_calc WHERE sale_id = NEW.sale_id),
-      total          = (SELECT tot  FROM v_sales_calc WHERE sale_id = NEW.sale_id)
+  SET subtotal       = subtotal + NEW.qty*NEW.unit_price,
+      discount_total = discount_total + NEW.discount,
+      tax_total      = tax_total + ((NEW.qty*NEW.unit_price)-NEW.discount)*NEW.tax_rate,
+      total          = total + ((NEW.qty*NEW.unit_price)-NEW.discount)*(1+NEW.tax_rate)
   WHERE id = NEW.sale_id;
 END;
 
 CREATE TRIGGER IF NOT EXISTS trg_items_au AFTER UPDATE ON sale_items
 BEGIN
   UPDATE sales
-  SET subtotal       = (SELECT sub  FROM v_sales_calc WHERE sale_id = NEW.sale_id),
-      discount_total = (SELECT disc FROM v_sales_calc WHERE sale_id = NEW.sale_id),
-      tax_total      = (SELECT iva  FROM v_sales_calc WHERE sale_id = NEW.sale_id),
-      total          = (SELECT tot  FROM v_sales_calc WHERE sale_id = NEW.sale_id)
+  SET subtotal       = subtotal - OLD.qty*OLD.unit_price,
+      discount_total = discount_total - OLD.discount,
+      tax_total      = tax_total - ((OLD.qty*OLD.unit_price)-OLD.discount)*OLD.tax_rate,
+      total          = total - ((OLD.qty*OLD.unit_price)-OLD.discount)*(1+OLD.tax_rate)
+  WHERE id = OLD.sale_id;
+  UPDATE sales
+  SET subtotal       = subtotal + NEW.qty*NEW.unit_price,
+      discount_total = discount_total + NEW.discount,
+      tax_total      = tax_total + ((NEW.qty*NEW.unit_price)-NEW.discount)*NEW.tax_rate,
+      total          = total + ((NEW.qty*NEW.unit_price)-NEW.discount)*(1+NEW.tax_rate)
   WHERE id = NEW.sale_id;
 END;
 
 CREATE TRIGGER IF NOT EXISTS trg_items_ad AFTER DELETE ON sale_items
 BEGIN
   UPDATE sales
-  SET subtotal       = (SELECT sub  FROM v_sales_calc WHERE sale_id = OLD.sale_id),
-      discount_total = (SELECT disc FROM v_sales_calc WHERE sale_id = OLD.sale_id),
-      tax_total      = (SELECT iva  FROM v_sales_calc WHERE sale_id = OLD.sale_id),
-      total          = (SELECT tot  FROM v_sales_calc WHERE sale_id = OLD.sale_id)
+  SET subtotal       = subtotal - OLD.qty*OLD.unit_price,
+      discount_total = discount_total - OLD.discount,
+      tax_total      = tax_total - ((OLD.qty*OLD.unit_price)-OLD.discount)*OLD.tax_rate,
+      total          = total - ((OLD.qty*OLD.unit_price)-OLD.discount)*(1+OLD.tax_rate)
   WHERE id = OLD.sale_id;
 END;
 
-
+-- =========================================
+-- TRIGGERS: mantener paid_total en sales
+-- =========================================
 CREATE TRIGGER IF NOT EXISTS trg_payments_ai AFTER INSERT ON payments
 BEGIN
-    UPDATE sales
-    SET payment_status = CASE
-        WHEN (SELECT SUM(amount) FROM payments WHERE sale_id = NEW.sale_id) >= total
-        THEN 'PAID'
-        ELSE 'PARTIAL'
-    END
-    WHERE id = NEW.sale_id;
+  UPDATE sales SET paid_total = paid_total + NEW.amount WHERE id = NEW.sale_id;
 END;
 
 CREATE TRIGGER IF NOT EXISTS trg_payments_au AFTER UPDATE ON payments
 BEGIN
-    UPDATE sales
-    SET payment_status = CASE
-        WHEN (SELECT SUM(amount) FROM payments WHERE sale_id = NEW.sale_id) >= total
-        THEN 'PAID'
-        ELSE 'PARTIAL'
-    END
-    WHERE id = NEW.sale_id;
+  UPDATE sales SET paid_total = paid_total - OLD.amount WHERE id = OLD.sale_id;
+  UPDATE sales SET paid_total = paid_total + NEW.amount WHERE id = NEW.sale_id;
 END;
 
-
 CREATE TRIGGER IF NOT EXISTS trg_payments_ad AFTER DELETE ON payments
 BEGIN
-    UPDATE sales
-    SET payment_status = CASE
-        WHEN (SELECT SUM(amount) FROM payments WHERE sale_id = OLD.sale_id) >= total
-        THEN 'PAID'
-        ELSE 'PARTIAL'
-    END
-    WHERE id = OLD.sale_id;
+  UPDATE sales SET paid_total = paid_total - OLD.amount WHERE id = OLD.sale_id;
 END;
 
 -- =========================================
--- VISTA: v_sales_paid (pagos por venta)
+-- TRIGGER: payment_status a partir de total / paid_total
+-- (tolerancia de medio centavo por redondeo de REAL)
 -- =========================================
-DROP VIEW IF EXISTS v_sales_paid;
-CREATE VIEW v_sales_paid AS
-SELECT
-  s.id AS sale_id,
-  s.total AS total_doc,
-  COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.sale_id = s.id),0) AS total_paid
-FROM sales s;
-
--- =========================================
--- TRIGGERS: mantener payment_status en sales
--- =========================================
-CREATE TRIGGER IF NOT EXISTS trg_pay_ai AFTER INSERT ON payments
-BEGIN
-  UPDATE sales
-  SET payment_status = CASE
-    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = NEW.sale_id) >= total THEN 'paid'
-    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = NEW.sale_id) > 0    THEN 'partial'
-    ELSE 'unpaid'
-  END
-  WHERE id = NEW.sale_id;
-END;
-
-CREATE TRIGGER IF NOT EXISTS trg_pay_au AFTER UPDATE ON payments
-BEGIN
-  UPDATE sales
-  SET payment_status = CASE
-    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = NEW.sale_id) >= total THEN 'paid'
-    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = NEW.sale_id) > 0    THEN 'partial'
+CREATE TRIGGER IF NOT EXISTS trg_sales_payment_status
+AFTER UPDATE OF total, paid_total ON sales
+FOR EACH ROW
+WHEN NEW.payment_status IS NOT (CASE
+    WHEN NEW.paid_total >= NEW.total - 0.005 THEN 'paid'
+    WHEN NEW.paid_total > 0 THEN 'partial'
     ELSE 'unpaid'
-  END
-  WHERE id = NEW.sale_id;
-END;
-
-CREATE TRIGGER IF NOT EXISTS trg_pay_ad AFTER DELETE ON payments
+  END)
 BEGIN
   UPDATE sales
   SET payment_status = CASE
-    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = OLD.sale_id) >= total THEN 'paid'
-    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = OLD.sale_id) > 0    THEN 'partial'
+    WHEN NEW.paid_total >= NEW.total - 0.005 THEN 'paid'
+    WHEN NEW.paid_total > 0 THEN 'partial'
     ELSE 'unpaid'
   END
-  WHERE id = OLD.sale_id;
+  WHERE id = NEW.id;
 END;
-
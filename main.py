@@ -7,6 +7,9 @@ from ui.students import StudentsFrame
 from ui.products import ProductsFrame
 from ui.educational_catalogs import EducationalCatalogsFrame
 from ui.pos import POSFrame
+from services.db_worker import DBWorker
+from printer.spooler import PrintSpooler
+from printer import transports
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("green")
@@ -20,6 +23,7 @@ class App(ctk.CTk):
 
         self.db = DatabaseManager()
         self.current_user = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.show_login()
 
@@ -39,21 +43,21 @@ class App(ctk.CTk):
 
     def show_students(self):
         self.clear_view()
-        frame = StudentsFrame(self, self.db.get_connection())
+        frame = StudentsFrame(self, self.db.connection())
         frame.pack(fill="both", expand=True)
 
     def show_products(self):
         self.clear_view()
-        frame = ProductsFrame(self, self.db.get_connection())
+        frame = ProductsFrame(self, self.db.connection())
         frame.pack(fill="both", expand=True)
 
     def show_pos(self):        
         self.clear_view()
-        POSFrame(self, self.db.get_connection()).pack(fill="both", expand=True)
+        POSFrame(self, self.db.connection()).pack(fill="both", expand=True)
 
     def show_catalogs(self):
         self.clear_view()
-        frame = EducationalCatalogsFrame(self, self.db.get_connection())
+        frame = EducationalCatalogsFrame(self, self.db.connection())
         frame.pack(fill="both", expand=True)        
 
     def show_settings(self):
@@ -63,6 +67,13 @@ class App(ctk.CTk):
         self.current_user = None
         self.show_login()
 
+    def on_close(self):
+        DBWorker.close_all()
+        PrintSpooler.close_all()
+        transports.close_all()
+        self.db.close()
+        self.destroy()
+
 
 if __name__ == "__main__":
     app = App()
@@ -0,0 +1,331 @@
+# printer/emulator.py
+"""
+Emulador ESC/POS: convierte los bytes que TicketPrinter mandaría a la
+impresora en imágenes monocromo (una por corte).
+
+Sirve para la vista previa en pantalla y para revisar en Linux, sin
+impresora, cómo sale un ticket:
+
+    emulator = EscPosEmulator(columns=48)
+    pages = emulator.render(data)          # [Image '1', ...]
+    pages[0].save("ticket.png")
+
+Entiende lo que usa la app: ESC @, ESC a, ESC E, ESC M, ESC !, GS !,
+ESC d, LF, GS v 0 (raster), GS ( L / GS 8 L y FS q / FS p (logo NV) y
+GS V (corte). Lo demás se ignora.
+
+Los glifos se dibujan una vez por (carácter, negrita, fuente, tamaño) y
+se guardan en una caché de clase; componer un ticket es pegar glifos ya
+hechos sobre el lienzo.
+"""
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from printer.raster import _INVERT
+
+ESC, GS, FS, LF = 0x1B, 0x1D, 0x1C, 0x0A
+
+# Celda de cada fuente en puntos (203 dpi): Font A 12x24, Font B 9x17
+FONT_CELLS = {0: (12, 24), 1: (9, 17)}
+# Interlineado por defecto (ESC 2): 30 puntos
+LINE_SPACING = 30
+
+
+@dataclass
+class _Line:
+    align: int
+    runs: List[Tuple[str, bool, int, int, int]] = field(default_factory=list)  # (texto, negrita, fuente, ancho, alto)
+    width: int = 0
+    height: int = 0
+
+
+class EscPosEmulator:
+    _glyphs: Dict[tuple, Image.Image] = {}
+    _glyphs_lock = threading.Lock()
+    _fonts: Dict[tuple, ImageFont.ImageFont] = {}
+
+    def __init__(self, columns: int = 48, font_path: Optional[str] = None, encoding: str = "cp437"):
+        """
+        :param columns: columnas de Font A del papel (32 en 58 mm, 48 en 80 mm).
+        :param font_path: TTF monoespaciada opcional; sin ella se usa la de Pillow.
+        """
+        self.dot_width = columns * FONT_CELLS[0][0]
+        self.font_path = font_path
+        self.encoding = encoding
+        # Imágenes NV definidas en la "impresora": llave -> imagen
+        self.nv_images: Dict[bytes, Image.Image] = {}
+
+    # =========================================
+    # INTÉRPRETE
+    # =========================================
+    def render(self, data: bytes) -> List[Image.Image]:
+        """Interpreta data y regresa una imagen por ticket (separados por GS V)."""
+        self._reset()
+        self._rows, self._pages, self._line = [], [], None
+        data = bytes(data)
+        i, n = 0, len(data)
+        while i < n:
+            b = data[i]
+            if b == LF:
+                self._newline()
+                i += 1
+            elif b == ESC:
+                i = self._esc(data, i)
+            elif b == GS:
+                i = self._gs(data, i)
+            elif b == FS:
+                i = self._fs(data, i)
+            elif b < 0x20:
+                i += 1
+            else:
+                # Texto: hasta el siguiente byte de control
+                j = i
+                while j < n and data[j] >= 0x20:
+                    j += 1
+                self._text(data[i:j].decode(self.encoding, errors="replace"))
+                i = j
+
+        self._flush()
+        if self._rows:
+            self._pages.append(self._compose(self._rows))
+        return self._pages
+
+    def render_image(self, data: bytes) -> Image.Image:
+        """Primer ticket de data (lienzo en blanco si no hay nada)."""
+        pages = self.render(data)
+        return pages[0] if pages else Image.new("1", (self.dot_width, LINE_SPACING), 1)
+
+    def _reset(self):
+        self.align, self.bold, self.font = 0, False, 0
+        self.width_mul, self.height_mul = 1, 1
+
+    def _esc(self, data: bytes, i: int) -> int:
+        cmd = data[i + 1] if i + 1 < len(data) else None
+        arg = data[i + 2] if i + 2 < len(data) else 0
+        if cmd == 0x40:                     # ESC @
+            self._reset()
+            return i + 2
+        if cmd == 0x61:                     # ESC a n
+            self.align = arg - 0x30 if arg >= 0x30 else arg
+        elif cmd == 0x45:                   # ESC E n
+            self.bold = bool(arg & 1)
+        elif cmd == 0x4D:                   # ESC M n
+            self.font = 1 if arg & 1 else 0
+        elif cmd == 0x21:                   # ESC ! n
+            self.font = arg & 0x01
+            self.bold = bool(arg & 0x08)
+            self.height_mul = 2 if arg & 0x10 else 1
+            self.width_mul = 2 if arg & 0x20 else 1
+        elif cmd == 0x64:                   # ESC d n
+            for _ in range(arg):
+                self._newline()
+        elif cmd in (0x74, 0x33, 0x2D, 0x47, 0x52, 0x4A):
+            pass                            # un parámetro, sin efecto en la vista
+        else:
+            return i + 2
+        return i + 3
+
+    def _gs(self, data: bytes, i: int) -> int:
+        cmd = data[i + 1] if i + 1 < len(data) else None
+        if cmd == 0x21:                     # GS ! n
+            arg = data[i + 2]
+            self.width_mul = (arg >> 4 & 0x07) + 1
+            self.height_mul = (arg & 0x07) + 1
+            return i + 3
+        if cmd == 0x56:                     # GS V m [n]
+            m = data[i + 2]
+            self._cut()
+            return i + (4 if m in (0x41, 0x42, 0x61, 0x62, 0x67, 0x68) else 3)
+        if cmd == 0x76 and data[i + 2] == 0x30:   # GS v 0 m xL xH yL yH
+            m = data[i + 3]
+            width_bytes = int.from_bytes(data[i + 4:i + 6], "little")
+            height = int.from_bytes(data[i + 6:i + 8], "little")
+            end = i + 8 + width_bytes * height
+            img = self._raster(data[i + 8:end], width_bytes, height)
+            if m & 1:
+                img = img.resize((img.width * 2, img.height))
+            if m & 2:
+                img = img.resize((img.width, img.height * 2))
+            self._image(img)
+            return end
+        if cmd in (0x28, 0x38) and data[i + 2] == 0x4C:   # GS ( L / GS 8 L
+            size = 2 if cmd == 0x28 else 4
+            length = int.from_bytes(data[i + 3:i + 3 + size], "little")
+            start = i + 3 + size
+            self._graphics(data[start:start + length])
+            return start + length
+        return i + 2
+
+    def _fs(self, data: bytes, i: int) -> int:
+        cmd = data[i + 1] if i + 1 < len(data) else None
+        if cmd == 0x71:                     # FS q n [xL xH yL yH d...]k
+            i += 3
+            self.nv_images = {k: v for k, v in self.nv_images.items() if not isinstance(k, int)}
+            for number in range(1, data[i - 1] + 1):
+                x_bytes = int.from_bytes(data[i:i + 2], "little")
+                y_bytes = int.from_bytes(data[i + 2:i + 4], "little")
+                end = i + 4 + x_bytes * y_bytes * 8
+                # Columnas de arriba abajo: se arma transpuesta y se regresa
+                column = self._raster(data[i + 4:end], y_bytes, x_bytes * 8)
+                self.nv_images[number] = column.transpose(Image.Transpose.TRANSPOSE)
+                i = end
+            return i
+        if cmd == 0x70:                     # FS p n m
+            img = self.nv_images.get(data[i + 2])
+            if img is not None:
+                self._image(img)
+            return i + 4
+        return i + 2
+
+    def _graphics(self, body: bytes):
+        """Funciones de GS ( L usadas por printer/raster.py (definir/imprimir/borrar NV)."""
+        fn = body[1] if len(body) > 1 else None
+        if fn == 0x43:                      # definir: 0x30 0x43 0x30 kc1 kc2 b xL xH yL yH c datos
+            key = body[3:5]
+            width = int.from_bytes(body[6:8], "little")
+            height = int.from_bytes(body[8:10], "little")
+            self.nv_images[key] = self._raster(body[11:], (width + 7) // 8, height)
+        elif fn == 0x45:                    # imprimir: 0x30 0x45 kc1 kc2 x y
+            img = self.nv_images.get(body[2:4])
+            if img is not None:
+                self._image(img)
+        elif fn == 0x42:                    # borrar
+            self.nv_images.pop(body[2:4], None)
+
+    @staticmethod
+    def _raster(data: bytes, width_bytes: int, height: int) -> Image.Image:
+        # ESC/POS: 1 = negro; PIL '1': 0 = negro
+        return Image.frombytes("1", (width_bytes * 8, height), bytes(data).translate(_INVERT))
+
+    # =========================================
+    # RENGLONES
+    # =========================================
+    def _text(self, text: str):
+        cell_w, cell_h = FONT_CELLS[self.font]
+        char_w = cell_w * self.width_mul
+        for ch in text:
+            line = self._line
+            if line is None:
+                line = self._line = _Line(self.align)
+            elif line.width + char_w > self.dot_width:
+                # La impresora pasa solita al siguiente renglón
+                self._flush()
+                line = self._line = _Line(self.align)
+            style = (self.bold, self.font, self.width_mul, self.height_mul)
+            if line.runs and line.runs[-1][1:] == style:
+                line.runs[-1] = (line.runs[-1][0] + ch,) + style
+            else:
+                line.runs.append((ch,) + style)
+            line.width += char_w
+            line.height = max(line.height, cell_h * self.height_mul)
+
+    def _newline(self):
+        if self._line is None:
+            # Renglón vacío: avanza el interlineado con el tamaño actual
+            self._rows.append(("feed", LINE_SPACING + FONT_CELLS[0][1] * (self.height_mul - 1)))
+        else:
+            self._flush()
+
+    def _flush(self):
+        if self._line is not None:
+            self._rows.append(("text", self._line))
+            self._line = None
+
+    def _image(self, img: Image.Image):
+        self._flush()
+        self._rows.append(("image", (self.align, img)))
+
+    def _cut(self):
+        self._flush()
+        self._pages.append(self._compose(self._rows))
+        self._rows = []
+
+    # =========================================
+    # COMPOSICIÓN
+    # =========================================
+    def _compose(self, rows) -> Image.Image:
+        heights = []
+        for kind, value in rows:
+            if kind == "feed":
+                heights.append(value)
+            elif kind == "text":
+                heights.append(max(value.height + LINE_SPACING - FONT_CELLS[0][1], LINE_SPACING))
+            else:
+                heights.append(value[1].height)
+
+        canvas = Image.new("1", (self.dot_width, max(sum(heights), 1)), 1)
+        y = 0
+        for (kind, value), height in zip(rows, heights):
+            if kind == "text":
+                x = self._x(value.align, value.width)
+                for text, bold, font, wmul, hmul in value.runs:
+                    for ch in text:
+                        glyph = self._glyph(ch, bold, font, wmul, hmul)
+                        # Glifos alineados a la base del renglón
+                        if ch != " ":
+                            canvas.paste(0, (x, y + value.height - glyph.height), glyph)
+                        x += glyph.width
+            elif kind == "image":
+                align, img = value
+                img = img.crop((0, 0, min(img.width, self.dot_width), img.height))
+                canvas.paste(img, (self._x(align, img.width), y))
+            y += height
+        return canvas
+
+    def _x(self, align: int, width: int) -> int:
+        if align == 1:
+            return max(0, (self.dot_width - width) // 2)
+        if align == 2:
+            return max(0, self.dot_width - width)
+        return 0
+
+    def _glyph(self, ch: str, bold: bool, font: int, wmul: int, hmul: int) -> Image.Image:
+        """Máscara del carácter (255 = tinta) escalada; se dibuja una sola vez."""
+        key = (self.font_path, ch, bold, font, wmul, hmul)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            return glyph
+        with self._glyphs_lock:
+            glyph = self._glyphs.get(key)
+            if glyph is None:
+                cell_w, cell_h = FONT_CELLS[font]
+                base = Image.new("L", (cell_w, cell_h), 0)
+                draw = ImageDraw.Draw(base)
+                pil_font = self._pil_font(cell_h)
+                if not self._has_glyph(pil_font, ch):
+                    # Sin glifo (p. ej. acentos en la fuente de Pillow): la letra base
+                    ch = unicodedata.normalize("NFD", ch)[0]
+                left, _, right, _ = draw.textbbox((0, 0), ch, font=pil_font)
+                x = (cell_w - (right - left)) // 2 - left
+                draw.text((x, 1), ch, font=pil_font, fill=255)
+                if bold:
+                    draw.text((x + 1, 1), ch, font=pil_font, fill=255)
+                base = base.point(lambda v: 255 if v >= 96 else 0)
+                if wmul != 1 or hmul != 1:
+                    base = base.resize((cell_w * wmul, cell_h * hmul), Image.Resampling.NEAREST)
+                glyph = self._glyphs[key] = base.convert("1")
+        return glyph
+
+    @staticmethod
+    def _has_glyph(font, ch: str) -> bool:
+        if ch.isascii():
+            return True
+        # Un carácter sin glifo se dibuja igual que el de "no definido"
+        return bytes(font.getmask(ch)) != bytes(font.getmask("\uffff"))
+
+    def _pil_font(self, cell_h: int):
+        key = (self.font_path, cell_h)
+        font = self._fonts.get(key)
+        if font is None:
+            size = cell_h - 4
+            try:
+                font = ImageFont.truetype(self.font_path, size) if self.font_path else ImageFont.load_default(size)
+            except (OSError, AttributeError, TypeError):
+                # Pillow viejo o sin FreeType: fuente de mapa de bits
+                font = ImageFont.load_default()
+            font = self._fonts[key] = font
+        return font
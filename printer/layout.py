@@ -0,0 +1,320 @@
+# printer/layout.py
+"""
+Plantilla del ticket compilada por ancho de papel.
+
+TICKET es una lista de elementos (texto, par izquierda/derecha, tabla de
+conceptos, separadores...). compile_layout() la compila una vez por número
+de columnas (32 en 58 mm, 48 en 80 mm): calcula las columnas de la tabla,
+corta los textos fijos y deja listos los renglones que no dependen de la
+venta. render() solo formatea los datos y escribe:
+
+- EscPosWriter: todo en un bytearray; alineación, negrita y tamaño se
+  mandan solo cuando cambian respecto al renglón anterior;
+- TextWriter: la vista previa en texto plano con el mismo acomodo.
+"""
+import textwrap
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+# Columnas de Font A por ancho de papel
+PAPER_COLUMNS = {58: 32, 80: 48}
+ENCODING = "cp437"
+
+LEFT, CENTER, RIGHT = 0, 1, 2
+TALL = 0x01          # GS ! doble alto
+WIDE = 0x10          # GS ! doble ancho
+
+
+class Style(NamedTuple):
+    # None = no importa (se deja lo que esté activo)
+    align: Optional[int] = LEFT
+    bold: Optional[bool] = False
+    size: Optional[int] = 0
+
+
+NORMAL = Style()
+BOLD = Style(bold=True)
+CENTERED = Style(align=CENTER)
+CENTER_BOLD = Style(align=CENTER, bold=True)
+RIGHT_ALIGNED = Style(align=RIGHT)
+PLAIN = Style(None, None, 0)      # separadores: solo importa el tamaño
+
+
+# =========================================
+# ELEMENTOS DE PLANTILLA
+# =========================================
+@dataclass(frozen=True)
+class Logo:
+    pass
+
+
+@dataclass(frozen=True)
+class Text:
+    fmt: str
+    style: Style = NORMAL
+    when: Optional[str] = None    # se omite si ese campo viene vacío
+
+
+@dataclass(frozen=True)
+class Pair:
+    left: str
+    right: str
+    style: Style = NORMAL
+
+
+@dataclass(frozen=True)
+class Rule:
+    char: str = "-"
+
+
+@dataclass(frozen=True)
+class Feed:
+    lines: int = 1
+
+
+@dataclass(frozen=True)
+class Items:
+    pass
+
+
+@dataclass(frozen=True)
+class Cut:
+    feed: int = 3
+
+
+TICKET = (
+    Logo(),
+    Text("PREESCOLAR", CENTER_BOLD),
+    Text("{nombre}", Style(CENTER, True, TALL)),
+    Text("{clave}", CENTER_BOLD),
+    Feed(),
+    Text("{title}", CENTERED, when="title"),
+    Text("RFC: {rfc}", CENTERED, when="rfc"),
+    Text("{direccion}", CENTERED, when="direccion"),
+    Text("{contacto}", CENTERED, when="contacto"),
+    Feed(),
+    Rule(),
+    Feed(),
+    Pair("FOLIO: {folio}", "{date}", BOLD),
+    Text("MATRICULA: {enrollment}"),
+    Text("ALUMNO: {student}"),
+    Feed(),
+    Items(),
+    Text("SUBTOTAL: {subtotal}", RIGHT_ALIGNED),
+    Text("IVA: {tax}", RIGHT_ALIGNED),
+    Text("TOTAL: {total}", Style(RIGHT, True, TALL)),
+    Rule(),
+    Text("Método de Pago: {payment_method}"),
+    Feed(),
+    Text("{notas01}", CENTER_BOLD),
+    Text("{notas02}", CENTER_BOLD),
+    Cut(feed=3),
+)
+
+
+def money(value) -> str:
+    return f"${value:,.2f}"
+
+
+def ticket_context(header: dict, items: list, totals: dict, payment_method: str, business: dict,
+                   date: str = "") -> Dict:
+    """Campos de la plantilla a partir de los argumentos de print_ticket."""
+    return {
+        "nombre": business.get("nombre", "NEGOCIO"),
+        "clave": business.get("clave", ""),
+        "title": business.get("title", ""),
+        "rfc": business.get("rfc", ""),
+        "direccion": business.get("direccion", ""),
+        "contacto": business.get("contacto", ""),
+        "notas01": business.get("notas01", "¡Gracias por su compra!"),
+        "notas02": business.get("notas02", "¡Gracias por su compra!"),
+        "folio": header.get("folio", ""),
+        "date": header.get("date") or date,
+        "enrollment": header.get("enrollment", ""),
+        "student": header.get("student", "").upper(),
+        "items": items,
+        "subtotal": money(totals["subtotal"]),
+        "tax": money(totals["tax"]),
+        "total": money(totals["total"]),
+        "payment_method": payment_method,
+    }
+
+
+# =========================================
+# COMPILACIÓN
+# =========================================
+class CompiledLayout:
+    """Operaciones listas para un ancho: ("line", style, texto) fijas o con formato."""
+
+    def __init__(self, columns: int, ops: list, item_row):
+        self.columns = columns
+        self.ops = ops
+        self._item_row = item_row
+
+    def render(self, ctx: Dict, writer, logo=None):
+        for op in self.ops:
+            kind = op[0]
+            if kind == "line":
+                writer.line(op[1], op[2], op[3])
+            elif kind == "text":
+                _, style, fmt, when, capacity = op
+                if when and not ctx.get(when):
+                    continue
+                for text in _wrap(fmt.format_map(ctx), capacity):
+                    writer.line(style, text)
+            elif kind == "pair":
+                _, style, left, right = op
+                right = right.format_map(ctx)
+                left = left.format_map(ctx)[:max(0, self.columns - len(right) - 1)]
+                writer.line(style, left.ljust(self.columns - len(right)) + right)
+            elif kind == "items":
+                for item in ctx["items"]:
+                    for text in self._item_row(item):
+                        writer.line(NORMAL, text)
+            elif kind == "logo":
+                if logo:
+                    writer.logo(logo)
+            elif kind == "feed":
+                writer.feed(op[1])
+            elif kind == "cut":
+                writer.cut(op[1])
+        return writer
+
+
+def _capacity(columns: int, style: Style) -> int:
+    return columns // 2 if (style.size or 0) & WIDE else columns
+
+
+def _wrap(text: str, capacity: int) -> List[str]:
+    if len(text) <= capacity:
+        return [text]
+    return textwrap.wrap(text, capacity) or [""]
+
+
+def _static(style: Style, text: str):
+    return ("line", style, text, text.encode(ENCODING, errors="replace"))
+
+
+def _items_ops(columns: int):
+    """Encabezado y formato de renglón de la tabla según el ancho."""
+    if columns >= 40:
+        # Un renglón por concepto: cantidad, descripción, P.U., importe
+        desc_w = columns - 3 - 11 - 12
+        header = f"{'':<3}{'DESCRIPCION':<{desc_w}}{'P.U.':>11}{'IMPORTE':>12}"
+
+        def row(item):
+            qty = str(item["qty"])
+            return [f"{qty:<3}{item['description'][:desc_w - 1]:<{desc_w}}"
+                    f"{money(item['unit_price']):>11}{money(item['qty'] * item['unit_price']):>12}"]
+    else:
+        # Papel angosto: descripción arriba, cantidad x P.U. e importe abajo
+        header = "CANT x P.U.".ljust(columns - len("IMPORTE")) + "IMPORTE"
+
+        def row(item):
+            total = money(item["qty"] * item["unit_price"])
+            detail = f"  {item['qty']} x {money(item['unit_price'])}"
+            return [item["description"][:columns], detail.ljust(columns - len(total)) + total]
+
+    rule = "-" * columns
+    ops = [_static(PLAIN, rule), _static(BOLD, header[:columns])]
+    if columns < 40:
+        ops.insert(1, _static(BOLD, "DESCRIPCION"))
+    ops += [("items",), _static(PLAIN, rule)]
+    return ops, row
+
+
+@lru_cache(maxsize=None)
+def compile_layout(columns: int, template: tuple = TICKET) -> CompiledLayout:
+    """Compila la plantilla para ese número de columnas (una vez por proceso)."""
+    ops, item_row = [], None
+    for element in template:
+        if isinstance(element, Logo):
+            ops.append(("logo",))
+        elif isinstance(element, Text):
+            capacity = _capacity(columns, element.style)
+            if "{" in element.fmt:
+                ops.append(("text", element.style, element.fmt, element.when, capacity))
+            else:
+                ops += [_static(element.style, text) for text in _wrap(element.fmt, capacity)]
+        elif isinstance(element, Pair):
+            ops.append(("pair", element.style, element.left, element.right))
+        elif isinstance(element, Rule):
+            ops.append(_static(PLAIN, element.char * columns))
+        elif isinstance(element, Feed):
+            ops.append(("feed", element.lines))
+        elif isinstance(element, Items):
+            item_ops, item_row = _items_ops(columns)
+            ops += item_ops
+        elif isinstance(element, Cut):
+            ops.append(("cut", element.feed))
+    return CompiledLayout(columns, ops, item_row)
+
+
+# =========================================
+# SALIDAS
+# =========================================
+class EscPosWriter:
+    """ESC/POS en un solo bytearray, con cambios de modo solo cuando hacen falta."""
+
+    def __init__(self):
+        # ESC @: estado conocido al empezar (izquierda, sin negrita, tamaño normal)
+        self.out = bytearray(b"\x1b\x40")
+        self._align, self._bold, self._size = LEFT, False, 0
+
+    def _apply(self, style: Style):
+        align, bold, size = style
+        if align is not None and align != self._align:
+            self.out += b"\x1b\x61" + bytes((align,))
+            self._align = align
+        if bold is not None and bold != self._bold:
+            self.out += b"\x1b\x45" + (b"\x01" if bold else b"\x00")
+            self._bold = bold
+        if size is not None and size != self._size:
+            self.out += b"\x1d\x21" + bytes((size,))
+            self._size = size
+
+    def line(self, style: Style, text: str, encoded: Optional[bytes] = None):
+        self._apply(style)
+        self.out += encoded if encoded is not None else text.encode(ENCODING, errors="replace")
+        self.out += b"\n"
+
+    def logo(self, data: bytes):
+        # Los comandos del logo terminan con la alineación al centro
+        self.out += data
+        self._align = CENTER
+
+    def feed(self, lines: int):
+        self.out += b"\n" * lines
+
+    def cut(self, feed: int):
+        self.out += b"\n" * feed + b"\x1dV\x00"
+
+
+class TextWriter:
+    """Vista previa: mismo acomodo, alineación con espacios."""
+
+    def __init__(self, columns: int):
+        self.columns = columns
+        self.lines: List[str] = []
+
+    def line(self, style: Style, text: str, encoded: Optional[bytes] = None):
+        width = _capacity(self.columns, style)
+        if style.align == CENTER:
+            text = text.center(width).rstrip()
+        elif style.align == RIGHT:
+            text = text.rjust(width)
+        self.lines.append(text)
+
+    def logo(self, data):
+        self.lines.append("[LOGO]".center(self.columns).rstrip())
+
+    def feed(self, lines: int):
+        self.lines += [""] * lines
+
+    def cut(self, feed: int):
+        self.feed(feed)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
@@ -0,0 +1,79 @@
+# printer/nv_logo.py
+"""
+Registro de qué logo quedó guardado en la memoria NV de cada impresora.
+
+Subir el logo (GS ( L fn 67 o FS q) se hace una sola vez por impresora y
+por versión del logo: la memoria NV tiene ciclos de escritura limitados y
+la subida tarda. El registro se guarda en un JSON junto a la caché de
+raster para sobrevivir reinicios; si el logo cambia, su huella cambia y se
+vuelve a subir. La impresora no se consulta (el spooler RAW es de una sola
+vía): si se cambia o se resetea la impresora, usar forget().
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from printer.raster_cache import default_cache_dir
+
+
+def default_registry_path() -> Path:
+    return default_cache_dir().parent / 'nv_logos.json'
+
+
+class NVLogoRegistry:
+    _instances: Dict[str, "NVLogoRegistry"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else default_registry_path()
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @classmethod
+    def shared(cls, path: Optional[Path] = None) -> "NVLogoRegistry":
+        key = str(Path(path) if path else default_registry_path())
+        with cls._instances_lock:
+            registry = cls._instances.get(key)
+            if registry is None:
+                registry = cls._instances[key] = cls(Path(key))
+        return registry
+
+    def is_stored(self, printer: str, protocol: str, digest: str) -> bool:
+        """True si ese logo (huella) ya se subió a esa impresora con ese protocolo."""
+        with self._lock:
+            return self._entries.get(printer) == {"protocol": protocol, "digest": digest}
+
+    def mark_stored(self, printer: str, protocol: str, digest: str):
+        with self._lock:
+            self._entries[printer] = {"protocol": protocol, "digest": digest}
+            self._save()
+
+    def forget(self, printer: Optional[str] = None):
+        """Obliga a volver a subir el logo a printer (o a todas)."""
+        with self._lock:
+            if printer is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(printer, None)
+            self._save()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        # Si no se puede guardar, lo peor es volver a subir el logo
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
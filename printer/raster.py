@@ -0,0 +1,104 @@
+# printer/raster.py
+"""
+Conversión de imágenes a raster ESC/POS (GS v 0) con operaciones en bloque.
+
+Pillow ya guarda el modo '1' empaquetado 8 pixeles por byte, el más
+significativo a la izquierda, que es el orden que espera la impresora.
+Solo cambia el significado del bit (PIL: 1 = blanco, ESC/POS: 1 = negro),
+así que basta con tobytes() y una tabla de inversión. El ancho se rellena
+con blanco hasta múltiplo de 8 para que los bits de relleno salgan en 0.
+"""
+from PIL import Image
+
+# byte -> byte con los bits invertidos (blanco <-> negro)
+_INVERT = bytes(255 - b for b in range(256))
+
+
+def to_monochrome(img: Image.Image) -> Image.Image:
+    """Imagen en modo '1' donde solo el 0 es negro (mismo criterio que getpixel == 0)."""
+    if img.mode == '1':
+        return img
+    if img.mode != 'L':
+        img = img.convert('L')
+    return img.point(lambda v: 255 if v else 0, '1')
+
+
+def pack_raster(img: Image.Image):
+    """
+    Regresa (bytes por renglón, alto, datos) con 1 = negro y los bits de
+    relleno del último byte de cada renglón en 0.
+    """
+    img = to_monochrome(img)
+    width, height = img.size
+    width_bytes = (width + 7) // 8
+
+    if width % 8:
+        padded = Image.new('1', (width_bytes * 8, height), 1)
+        padded.paste(img, (0, 0))
+        img = padded
+
+    return width_bytes, height, img.tobytes().translate(_INVERT)
+
+
+def raster_command(img: Image.Image) -> bytes:
+    """Comando GS v 0 (modo normal) con la imagen empaquetada."""
+    width_bytes, height, data = pack_raster(img)
+    return (b"\x1d\x76\x30\x00"
+            + width_bytes.to_bytes(2, 'little')
+            + height.to_bytes(2, 'little')
+            + data)
+
+
+# =========================================
+# IMÁGENES GUARDADAS EN LA IMPRESORA (NV)
+# =========================================
+def gs_l_define(img: Image.Image, key: bytes = b"LG") -> bytes:
+    """
+    GS ( L fn 67: guarda la imagen en memoria NV con la llave kc1 kc2
+    (dos caracteres 32-126). Formato raster, un color. Si no cabe en el
+    largo de 16 bits usa GS 8 L (largo de 32 bits).
+    """
+    width_bytes, height, data = pack_raster(img)
+    width = width_bytes * 8
+    body = (b"\x30\x43\x30" + key + b"\x01"
+            + width.to_bytes(2, 'little') + height.to_bytes(2, 'little')
+            + b"\x31" + data)
+    if len(body) <= 0xFFFF:
+        return b"\x1d\x28\x4c" + len(body).to_bytes(2, 'little') + body
+    return b"\x1d\x38\x4c" + len(body).to_bytes(4, 'little') + body
+
+
+def gs_l_print(key: bytes = b"LG", scale_x: int = 1, scale_y: int = 1) -> bytes:
+    """GS ( L fn 69: imprime la imagen NV guardada con esa llave."""
+    return b"\x1d\x28\x4c\x06\x00\x30\x45" + key + bytes((scale_x, scale_y))
+
+
+def gs_l_delete(key: bytes = b"LG") -> bytes:
+    """GS ( L fn 66: borra la imagen NV con esa llave."""
+    return b"\x1d\x28\x4c\x04\x00\x30\x42" + key
+
+
+def fs_q_define(img: Image.Image) -> bytes:
+    """
+    FS q (impresoras anteriores): guarda una sola imagen NV, la número 1.
+    Borra todas las imágenes NV anteriores. Los datos van por columnas:
+    cada columna es de arriba abajo, 8 pixeles por byte; ancho y alto se
+    rellenan con blanco a múltiplos de 8.
+    """
+    img = to_monochrome(img)
+    x_bytes = (img.width + 7) // 8
+    y_bytes = (img.height + 7) // 8
+    if (x_bytes * 8, y_bytes * 8) != img.size:
+        padded = Image.new('1', (x_bytes * 8, y_bytes * 8), 1)
+        padded.paste(img, (0, 0))
+        img = padded
+    # Transponer: cada columna queda como renglón, ya empaquetado de arriba abajo
+    _, _, data = pack_raster(img.transpose(Image.Transpose.TRANSPOSE))
+    return (b"\x1c\x71\x01"
+            + x_bytes.to_bytes(2, 'little') + y_bytes.to_bytes(2, 'little')
+            + data)
+
+
+def fs_p_print(number: int = 1, mode: int = 0) -> bytes:
+    """FS p: imprime la imagen NV número n (mode 0 = normal)."""
+    return b"\x1c\x70" + bytes((number, mode))
@@ -0,0 +1,156 @@
+# printer/raster_cache.py
+"""
+Caché del logo ya convertido a comandos ESC/POS.
+
+Abrir, convertir, redimensionar (LANCZOS) y rasterizar el logo cuesta
+mucho más que imprimir el ticket. El resultado depende solo del archivo,
+del ancho destino y del perfil de papel, así que se guarda:
+
+- en memoria, para todo el proceso, con llave (ruta, mtime, tamaño,
+  ancho, perfil): un ticket solo hace un os.stat y copia bytes;
+- en disco (carpeta de datos de la app), con llave por contenido (SHA-256
+  del archivo): al reiniciar la app no se vuelve a rasterizar, y tocar el
+  archivo sin cambiarlo no invalida nada.
+
+Si la escuela cambia de logo, el mtime/hash cambia solo; invalidate()
+borra además lo guardado para esa ruta (o todo).
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# Subir al cambiar cómo se genera el raster: invalida lo guardado en disco
+FORMAT_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    """Misma carpeta de datos que DatabaseManager.get_default_db_path"""
+    if os.name == 'nt':  # Windows
+        app_data = Path(os.environ['APPDATA']) / 'SistemaJardin'
+    else:  # Linux/Mac
+        app_data = Path.home() / '.pos_kingard'
+    return app_data / 'cache' / 'raster'
+
+
+class RasterCache:
+    _instances: Dict[str, "RasterCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self._lock = threading.Lock()
+        self._memory: Dict[Tuple, bytes] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls, cache_dir: Optional[Path] = None) -> "RasterCache":
+        """Caché del proceso para cache_dir (por defecto la carpeta de la app)."""
+        key = str(Path(cache_dir) if cache_dir else default_cache_dir())
+        with cls._instances_lock:
+            cache = cls._instances.get(key)
+            if cache is None:
+                cache = cls._instances[key] = cls(Path(key))
+        return cache
+
+    # =========================================
+    # CONSULTA
+    # =========================================
+    def get(self, path, width: int, profile: str, render: Callable[[str], bytes]) -> bytes:
+        """
+        Comandos del logo en path para (width, profile). render(path) solo se
+        llama si no hay nada en memoria ni en disco; un resultado vacío
+        (error, archivo faltante) no se guarda.
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return b""
+
+        memory_key = (path, st.st_mtime_ns, st.st_size, width, profile)
+        with self._lock:
+            data = self._memory.get(memory_key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        try:
+            with open(path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return b""
+        disk_path = self._disk_path(path, content_hash, width, profile)
+
+        data = self._read(disk_path)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            data = render(path)
+            if not data:
+                return b""
+            self._write(disk_path, data)
+
+        with self._lock:
+            # Una sola versión por ruta en memoria
+            for key in [k for k in self._memory if k[0] == path]:
+                del self._memory[key]
+            self._memory[memory_key] = data
+        return data
+
+    def invalidate(self, path=None):
+        """Olvida el raster de path (memoria y disco); sin path, todo."""
+        prefix = self._path_digest(os.path.abspath(path)) if path else ""
+        with self._lock:
+            if path:
+                path = os.path.abspath(path)
+                for key in [k for k in self._memory if k[0] == path]:
+                    del self._memory[key]
+            else:
+                self._memory.clear()
+
+        if self.cache_dir.is_dir():
+            for file in self.cache_dir.glob(f"{prefix}*.bin"):
+                try:
+                    file.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "entries": len(self._memory)}
+
+    # =========================================
+    # DISCO
+    # =========================================
+    @staticmethod
+    def _path_digest(path: str) -> str:
+        return hashlib.sha1(os.path.normcase(path).encode("utf-8")).hexdigest()[:12]
+
+    def _disk_path(self, path: str, content_hash: str, width: int, profile: str) -> Path:
+        name = f"{self._path_digest(path)}-{content_hash[:24]}-{width}-{profile}-v{FORMAT_VERSION}.bin"
+        return self.cache_dir / name
+
+    @staticmethod
+    def _read(disk_path: Path) -> Optional[bytes]:
+        try:
+            return disk_path.read_bytes() or None
+        except OSError:
+            return None
+
+    def _write(self, disk_path: Path, data: bytes):
+        # La caché en disco es opcional: si no se puede escribir, solo queda en memoria
+        tmp = disk_path.with_name(f"{disk_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, disk_path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
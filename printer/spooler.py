@@ -0,0 +1,285 @@
+# printer/spooler.py
+"""
+Cola de impresión de tickets con hilo propio.
+
+El cobro nunca espera a la impresora: POSFrame encola el ticket y sigue.
+El hilo de impresión reintenta con espera creciente (impresora apagada,
+sin papel, spooler ocupado) y reporta el estado al hilo de Tk por una cola
+que se vacía con after(), igual que services.db_worker.
+
+Cada trabajo queda en una bitácora JSON lines (queued / retry / done /
+failed). Al arrancar, lo que quedó pendiente (p. ej. la app se cerró o se
+cayó con la impresora apagada) se vuelve a encolar. La entrega es "al menos
+una vez": si la app se cae justo después de imprimir, el ticket puede salir
+dos veces.
+
+    spooler = PrintSpooler.shared()
+    spooler.submit(folio, ticket, widget=self, on_status=self._on_print_status)
+    spooler.reprint(sale_repo, "F0042", business, widget=self, on_status=...)
+
+ticket son los argumentos de TicketPrinter.print_ticket.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from printer.raster_cache import default_cache_dir
+
+# Estados de un trabajo
+QUEUED = "queued"
+PRINTING = "printing"
+RETRYING = "retrying"
+DONE = "done"
+FAILED = "failed"
+FINAL_STATES = (DONE, FAILED)
+
+
+def default_journal_path() -> Path:
+    return default_cache_dir().parent / 'print_journal.jsonl'
+
+
+def default_printer():
+    # Import tardío: el módulo de la impresora depende del sistema
+    from printer.printer import TicketPrinter
+    return TicketPrinter()
+
+
+@dataclass
+class PrintJob:
+    job_id: str
+    folio: str
+    ticket: Dict
+    status: str = QUEUED
+    attempts: int = 0
+    error: Optional[str] = None
+    stats: Optional[Dict] = None
+    created_at: float = field(default_factory=time.time)
+
+
+class PrintSpooler:
+    _instances: Dict[str, "PrintSpooler"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, printer_factory: Callable = default_printer, journal_path: Optional[Path] = None,
+                 max_attempts: int = 4, backoff_s=(2, 5, 15), poll_ms: int = 100):
+        self.printer_factory = printer_factory
+        self.journal_path = Path(journal_path) if journal_path else default_journal_path()
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.poll_ms = poll_ms
+
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._watchers = {}            # job_id -> (widget, on_status); solo hilo de Tk
+        self._poll_root = None
+        self._polling = False
+
+    @classmethod
+    def shared(cls, journal_path: Optional[Path] = None) -> "PrintSpooler":
+        """Cola del proceso para esa bitácora (por defecto la carpeta de la app)."""
+        key = str(Path(journal_path) if journal_path else default_journal_path())
+        with cls._instances_lock:
+            spooler = cls._instances.get(key)
+            if spooler is None:
+                spooler = cls._instances[key] = cls(journal_path=Path(key))
+        return spooler
+
+    @classmethod
+    def close_all(cls):
+        with cls._instances_lock:
+            spoolers = list(cls._instances.values())
+            cls._instances.clear()
+        for spooler in spoolers:
+            spooler.close()
+
+    # =========================================
+    # HILO DE TK
+    # =========================================
+    def submit(self, folio: str, ticket: Dict, widget=None, on_status=None) -> PrintJob:
+        """
+        Encola un ticket. on_status(job) se llama en el hilo de Tk en cada
+        cambio de estado (printing, retrying, done, failed).
+        """
+        # Primero lo pendiente de la bitácora, antes de anotar este trabajo
+        self._ensure_started()
+        job = PrintJob(job_id=uuid.uuid4().hex, folio=folio, ticket=ticket)
+        self._journal({"event": QUEUED, "job": job.job_id, "folio": folio,
+                       "ticket": ticket, "created_at": job.created_at}, sync=True)
+        if widget is not None and on_status is not None:
+            self._watchers[job.job_id] = (widget, on_status)
+            self._ensure_polling(widget)
+        self._jobs.put(job)
+        return job
+
+    def reprint(self, sale_repo, folio: str, business: Dict, widget=None, on_status=None) -> PrintJob:
+        """Reimprime una venta con lo guardado en la BD (SaleRepository.get_ticket_data)."""
+        data = sale_repo.get_ticket_data(folio)
+        if not data:
+            raise ValueError(f"No existe la venta con folio {folio}")
+        return self.submit(data["header"]["folio"], {**data, "business": business},
+                           widget=widget, on_status=on_status)
+
+    def _ensure_polling(self, widget):
+        if not self._polling:
+            self._polling = True
+            self._poll_root = widget.winfo_toplevel()
+            self._poll_root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        while True:
+            try:
+                job = self._events.get_nowait()
+            except queue.Empty:
+                break
+            watcher = self._watchers.get(job.job_id)
+            if job.status in FINAL_STATES:
+                self._watchers.pop(job.job_id, None)
+            if watcher is None or not self._alive(watcher[0]):
+                continue
+            try:
+                watcher[1](job)
+            except Exception:
+                traceback.print_exc()
+
+        if self._watchers and self._alive(self._poll_root):
+            self._poll_root.after(self.poll_ms, self._drain)
+        else:
+            self._polling = False
+
+    @staticmethod
+    def _alive(widget) -> bool:
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    # =========================================
+    # HILO DE IMPRESIÓN
+    # =========================================
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                # Lo pendiente de una sesión anterior va primero, en su orden
+                for job in self._recover():
+                    self._jobs.put(job)
+                self._thread = threading.Thread(target=self._loop, name="print-spooler", daemon=True)
+                self._thread.start()
+
+    def start(self):
+        """Arranca el hilo y reencola lo pendiente sin esperar a un ticket nuevo."""
+        self._ensure_started()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            job = self._jobs.get()
+            if job is None:
+                break
+            self._run(job)
+
+    def _run(self, job: PrintJob):
+        while not self._stop.is_set():
+            job.attempts += 1
+            self._set_status(job, PRINTING)
+            try:
+                printer = self.printer_factory()
+                job.stats = printer.print_ticket(**job.ticket)
+                job.error = None
+                self._journal({"event": DONE, "job": job.job_id, "attempts": job.attempts, "stats": job.stats})
+                self._set_status(job, DONE)
+                return
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+
+            if job.attempts >= self.max_attempts:
+                self._journal({"event": FAILED, "job": job.job_id, "attempts": job.attempts, "error": job.error})
+                self._set_status(job, FAILED)
+                return
+
+            self._journal({"event": RETRYING, "job": job.job_id, "attempts": job.attempts, "error": job.error})
+            self._set_status(job, RETRYING)
+            delay = self.backoff_s[min(job.attempts - 1, len(self.backoff_s) - 1)]
+            # close() interrumpe la espera; el trabajo sigue pendiente en la bitácora
+            self._stop.wait(delay)
+
+    def _set_status(self, job: PrintJob, status: str):
+        job.status = status
+        self._events.put(replace(job))
+
+    # =========================================
+    # BITÁCORA
+    # =========================================
+    def _journal(self, record: Dict, sync: bool = False):
+        record["ts"] = time.time()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._journal_lock:
+            try:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError:
+                traceback.print_exc()
+
+    def _read_journal(self) -> Dict[str, PrintJob]:
+        jobs = {}
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # renglón a medias de una caída
+                    job_id = record.get("job")
+                    if record.get("event") == QUEUED:
+                        jobs[job_id] = PrintJob(job_id=job_id, folio=record["folio"], ticket=record["ticket"],
+                                                created_at=record.get("created_at", record["ts"]))
+                    elif job_id in jobs:
+                        jobs[job_id].status = record["event"]
+                        jobs[job_id].attempts = record.get("attempts", jobs[job_id].attempts)
+                        jobs[job_id].error = record.get("error")
+        except OSError:
+            pass
+        return jobs
+
+    def _recover(self) -> List[PrintJob]:
+        """Trabajos sin terminar; la bitácora se compacta dejando solo esos."""
+        pending = [job for job in self._read_journal().values() if job.status not in FINAL_STATES]
+        for job in pending:
+            job.status, job.attempts = QUEUED, 0
+
+        with self._journal_lock:
+            tmp = self.journal_path.with_name(f"{self.journal_path.name}.tmp")
+            try:
+                if self.journal_path.exists():
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        for job in pending:
+                            f.write(json.dumps({"event": QUEUED, "job": job.job_id, "folio": job.folio,
+                                                "ticket": job.ticket, "created_at": job.created_at,
+                                                "ts": time.time()}, ensure_ascii=False) + "\n")
+                    os.replace(tmp, self.journal_path)
+            except OSError:
+                traceback.print_exc()
+        return pending
+
+    def pending(self) -> List[PrintJob]:
+        """Trabajos de la bitácora que no han terminado (impresos o fallidos)."""
+        return [job for job in self._read_journal().values() if job.status not in FINAL_STATES]
+
+    def close(self, timeout: float = 2.0):
+        self._stop.set()
+        self._jobs.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
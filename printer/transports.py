@@ -0,0 +1,223 @@
+# printer/transports.py
+"""
+Transportes para mandar bytes ESC/POS a la impresora.
+
+Todos tienen send(data) y close(); name identifica a la impresora (lo usa
+el registro del logo NV). open_transport() arma uno desde un texto:
+
+    win32                   impresora predeterminada de Windows
+    win32:EPSON TM-T20      impresora de Windows por nombre
+    tcp://192.168.1.50:9100 impresora de red (RAW 9100), conexión persistente
+    device:/dev/usb/lp0     archivo de dispositivo (USB/serial/paralelo)
+    cups / cups:TM-T20      CUPS vía `lp -o raw`
+    file:/tmp/tickets.bin   agrega los bytes a un archivo
+    memory:                 guarda los bytes en memoria (pruebas)
+
+win32print se importa solo al usar el transporte de Windows, así el resto
+de la app se puede importar y probar en Linux.
+"""
+import os
+import select
+import socket
+import subprocess
+import threading
+from typing import Dict, List, Optional
+
+
+class Transport:
+    name = "transport"
+
+    def send(self, data: bytes):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class Win32Transport(Transport):
+    """Spooler de Windows en modo RAW."""
+
+    def __init__(self, printer_name: Optional[str] = None):
+        import win32print
+        self._win32print = win32print
+        self.printer_name = printer_name or win32print.GetDefaultPrinter()
+        self.name = self.printer_name
+
+    def send(self, data: bytes):
+        win32print = self._win32print
+        hPrinter = win32print.OpenPrinter(self.printer_name)
+        try:
+            win32print.StartDocPrinter(hPrinter, 1, ("POS Ticket", None, "RAW"))
+            win32print.StartPagePrinter(hPrinter)
+            win32print.WritePrinter(hPrinter, data)
+            win32print.EndPagePrinter(hPrinter)
+            win32print.EndDocPrinter(hPrinter)
+        finally:
+            win32print.ClosePrinter(hPrinter)
+
+
+class TcpTransport(Transport):
+    """
+    RAW por TCP (puerto 9100). La conexión queda abierta entre tickets.
+
+    Antes de reusarla se revisa si la impresora ya cerró su lado (reinicio,
+    inactividad o impresoras que cierran después de cada trabajo): un
+    sendall sobre esa conexión "funciona" (queda en el buffer local) y el
+    ticket se pierde sin error. Si aun así falla el envío, se reconecta una vez.
+    """
+
+    def __init__(self, host: str, port: int = 9100, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.name = f"tcp://{host}:{port}"
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def send(self, data: bytes):
+        with self._lock:
+            if self._sock is not None and self._peer_closed(self._sock):
+                self._drop()
+            for attempt in (1, 2):
+                if self._sock is None:
+                    self._sock = self._connect()
+                try:
+                    self._sock.sendall(data)
+                    return
+                except OSError:
+                    self._drop()
+                    if attempt == 2:
+                        raise
+
+    @staticmethod
+    def _peer_closed(sock: socket.socket) -> bool:
+        """True si la impresora cerró o reinició la conexión; descarta bytes de estado pendientes."""
+        try:
+            while select.select([sock], [], [], 0)[0]:
+                if not sock.recv(4096):
+                    return True
+        except (OSError, ValueError):
+            return True
+        return False
+
+    def _drop(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+
+class DeviceTransport(Transport):
+    """Archivo de dispositivo (/dev/usb/lp0, /dev/ttyUSB0...)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"device:{path}"
+
+    def send(self, data: bytes):
+        with open(self.path, "wb", buffering=0) as f:
+            f.write(data)
+
+
+class CupsTransport(Transport):
+    """Cola de CUPS en modo raw (sin filtros)."""
+
+    def __init__(self, printer_name: Optional[str] = None, timeout: float = 30.0):
+        self.printer_name = printer_name
+        self.timeout = timeout
+        self.name = f"cups:{printer_name or 'default'}"
+
+    def send(self, data: bytes):
+        cmd = ["lp", "-o", "raw", "-t", "POS Ticket"]
+        if self.printer_name:
+            cmd += ["-d", self.printer_name]
+        result = subprocess.run(cmd, input=data, capture_output=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise OSError(f"lp: {result.stderr.decode(errors='replace').strip()}")
+
+
+class FileTransport(Transport):
+    """Agrega cada envío a un archivo (vista previa, depuración)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"file:{path}"
+
+    def send(self, data: bytes):
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+class MemoryTransport(Transport):
+    """Guarda cada envío en jobs (pruebas y emulador)."""
+
+    def __init__(self, name: str = "memory"):
+        self.name = name
+        self.jobs: List[bytes] = []
+
+    def send(self, data: bytes):
+        self.jobs.append(bytes(data))
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self.jobs)
+
+
+# Transportes abiertos por texto: TCP conserva su conexión entre tickets
+_transports: Dict[str, Transport] = {}
+_transports_lock = threading.Lock()
+
+
+def default_spec() -> str:
+    """POS_PRINTER si está definida; si no, el spooler en Windows y CUPS en los demás."""
+    return os.environ.get("POS_PRINTER") or ("win32" if os.name == "nt" else "cups")
+
+
+def open_transport(spec: Optional[str] = None) -> Transport:
+    """Transporte del proceso para spec (ver el docstring del módulo)."""
+    spec = spec or default_spec()
+    with _transports_lock:
+        transport = _transports.get(spec)
+        if transport is None:
+            transport = _transports[spec] = _build(spec)
+        return transport
+
+
+def close_all():
+    with _transports_lock:
+        transports = list(_transports.values())
+        _transports.clear()
+    for transport in transports:
+        transport.close()
+
+
+def _build(spec: str) -> Transport:
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind == "win32":
+        return Win32Transport(arg or None)
+    if kind == "tcp":
+        host, _, port = arg.lstrip("/").rpartition(":")
+        if not host:
+            host, port = port, "9100"
+        return TcpTransport(host, int(port or 9100))
+    if kind == "device":
+        return DeviceTransport(arg)
+    if kind == "cups":
+        return CupsTransport(arg or None)
+    if kind == "file":
+        return FileTransport(arg)
+    if kind == "memory":
+        return MemoryTransport(spec)
+    raise ValueError(f"Transporte de impresora desconocido: {spec}")
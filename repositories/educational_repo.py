@@ -1,38 +1,88 @@
 # repositories/educational_repo.py
 import sqlite3
-from typing import List, Optional
+import threading
+from dataclasses import replace
+from typing import Dict, List, Optional
+from database.database import database_key
 from models.educational import Grade, Group, Shift
 
 class EducationalRepository:
+    # Catálogos en memoria por base de datos: son pocos renglones, casi no
+    # cambian y las tarjetas/formularios de alumnos los consultan a cada rato.
+    # Se cargan completos en la primera lectura y se invalidan en cada
+    # create/delete confirmado.
+    _cache: Dict[str, Dict[str, Dict[int, object]]] = {}
+    _cache_lock = threading.Lock()
+
+    _TABLES = (('grade', 'grades', Grade), ('group', 'groups', Group), ('shift', 'shifts', Shift))
+
     def __init__(self, db_connection):
         self.conn = db_connection
+        self._key = database_key(db_connection)
+
+    # ---------- CACHE ----------
+    def catalogs(self) -> Dict[str, Dict[int, object]]:
+        """{'grade'|'group'|'shift': {id: objeto}} en orden de código (no modificar)."""
+        with self._cache_lock:
+            catalogs = self._cache.get(self._key)
+            if catalogs is None:
+                catalogs = self._cache[self._key] = {
+                    kind: self._fetch_all(table, cls) for kind, table, cls in self._TABLES
+                }
+            return catalogs
+
+    def invalidate(self):
+        """Descarta los catálogos en memoria (p. ej. tras escribir con SQL directo)."""
+        with self._cache_lock:
+            self._cache.pop(self._key, None)
+
+    def get_name(self, educational_type: str, educational_id: Optional[int]) -> str:
+        """Nombre de un grado, grupo o turno; "" si no existe"""
+        item = self.catalogs().get(educational_type, {}).get(educational_id)
+        return item.name if item else ""
+
+    def _fetch_all(self, table: str, cls) -> Dict[int, object]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT id, code, name FROM {table} ORDER BY code")
+        return {row[0]: cls(id=row[0], code=row[1], name=row[2]) for row in cursor.fetchall()}
+
+    def _list(self, educational_type: str) -> list:
+        return [replace(item) for item in self.catalogs()[educational_type].values()]
+
+    def _get(self, educational_type: str, educational_id: int):
+        item = self.catalogs()[educational_type].get(educational_id)
+        return replace(item) if item else None
+
+    def _write(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        # La conexión es compartida: un error no deja la transacción abierta
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        self.invalidate()
+        return cursor
 
     # ---------- GRADES ----------
     def get_all_grades(self) -> List[Grade]:
         """Obtiene todos los grados ordenados por código"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, code, name FROM grades ORDER BY code")
-        rows = cursor.fetchall()
-        return [Grade(id=row[0], code=row[1], name=row[2]) for row in rows]
+        return self._list('grade')
 
     def get_grade_by_id(self, grade_id: int) -> Optional[Grade]:
         """Obtiene un grado por ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, code, name FROM grades WHERE id = ?", (grade_id,))
-        row = cursor.fetchone()
-        return Grade(id=row[0], code=row[1], name=row[2]) if row else None
+        return self._get('grade', grade_id)
 
     def create_grade(self, grade: Grade) -> bool:
         """Crea un nuevo grado"""
         errors = grade.validate()
         if errors:
             raise ValueError(", ".join(errors))
-            
+
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO grades (code, name) VALUES (?, ?)", 
-                          (grade.code, grade.name))
-            self.conn.commit()
+            self._write("INSERT INTO grades (code, name) VALUES (?, ?)",
+                        (grade.code, grade.name))
             return True
         except sqlite3.IntegrityError:
             return False
@@ -40,9 +90,7 @@ class EducationalRepository:
     def delete_grade(self, grade_id: int) -> bool:
         """Elimina un grado"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM grades WHERE id = ?", (grade_id,))
-            self.conn.commit()
+            cursor = self._write("DELETE FROM grades WHERE id = ?", (grade_id,))
             return cursor.rowcount > 0
         except sqlite3.Error:
             return False
@@ -50,29 +98,21 @@ class EducationalRepository:
     # ---------- GROUPS ----------
     def get_all_groups(self) -> List[Group]:
         """Obtiene todos los grupos ordenados por código"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, code, name FROM groups ORDER BY code")
-        rows = cursor.fetchall()
-        return [Group(id=row[0], code=row[1], name=row[2]) for row in rows]
+        return self._list('group')
 
     def get_group_by_id(self, group_id: int) -> Optional[Group]:
         """Obtiene un grupo por ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, code, name FROM groups WHERE id = ?", (group_id,))
-        row = cursor.fetchone()
-        return Group(id=row[0], code=row[1], name=row[2]) if row else None
+        return self._get('group', group_id)
 
     def create_group(self, group: Group) -> bool:
         """Crea un nuevo grupo"""
         errors = group.validate()
         if errors:
             raise ValueError(", ".join(errors))
-            
+
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO groups (code, name) VALUES (?, ?)", 
-                          (group.code, group.name))
-            self.conn.commit()
+            self._write("INSERT INTO groups (code, name) VALUES (?, ?)",
+                        (group.code, group.name))
             return True
         except sqlite3.IntegrityError:
             return False
@@ -80,9 +120,7 @@ class EducationalRepository:
     def delete_group(self, group_id: int) -> bool:
         """Elimina un grupo"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM groups WHERE id = ?", (group_id,))
-            self.conn.commit()
+            cursor = self._write("DELETE FROM groups WHERE id = ?", (group_id,))
             return cursor.rowcount > 0
         except sqlite3.Error:
             return False
@@ -90,29 +128,21 @@ class EducationalRepository:
     # ---------- SHIFTS ----------
     def get_all_shifts(self) -> List[Shift]:
         """Obtiene todos los turnos ordenados por código"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, code, name FROM shifts ORDER BY code")
-        rows = cursor.fetchall()
-        return [Shift(id=row[0], code=row[1], name=row[2]) for row in rows]
+        return self._list('shift')
 
     def get_shift_by_id(self, shift_id: int) -> Optional[Shift]:
         """Obtiene un turno por ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, code, name FROM shifts WHERE id = ?", (shift_id,))
-        row = cursor.fetchone()
-        return Shift(id=row[0], code=row[1], name=row[2]) if row else None
+        return self._get('shift', shift_id)
 
     def create_shift(self, shift: Shift) -> bool:
         """Crea un nuevo turno"""
         errors = shift.validate()
         if errors:
             raise ValueError(", ".join(errors))
-            
+
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO shifts (code, name) VALUES (?, ?)", 
-                          (shift.code, shift.name))
-            self.conn.commit()
+            self._write("INSERT INTO shifts (code, name) VALUES (?, ?)",
+                        (shift.code, shift.name))
             return True
         except sqlite3.IntegrityError:
             return False
@@ -120,9 +150,7 @@ class EducationalRepository:
     def delete_shift(self, shift_id: int) -> bool:
         """Elimina un turno"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM shifts WHERE id = ?", (shift_id,))
-            self.conn.commit()
+            cursor = self._write("DELETE FROM shifts WHERE id = ?", (shift_id,))
             return cursor.rowcount > 0
         except sqlite3.Error:
-            return False
\ No newline at end of file
+            return False
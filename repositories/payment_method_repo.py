@@ -20,20 +20,21 @@ class PaymentMethodRepository:
         return dict(row) if row else None
 
     def create(self, name: str, code: str):
+        # with: commit si todo sale bien, rollback si falla (conexión compartida)
         cur = self.db.cursor()
-        cur.execute("INSERT INTO payment_methods (name, code, active) VALUES (?, ?, 1)", (name, code))
-        self.db.commit()
+        with self.db:
+            cur.execute("INSERT INTO payment_methods (name, code, active) VALUES (?, ?, 1)", (name, code))
         return cur.lastrowid
 
     def update(self, pm_id: int, name: str, code: str, active: bool):
         cur = self.db.cursor()
-        cur.execute(
-            "UPDATE payment_methods SET name = ?, code = ?, active = ? WHERE id = ?",
-            (name, code, 1 if active else 0, pm_id)
-        )
-        self.db.commit()
+        with self.db:
+            cur.execute(
+                "UPDATE payment_methods SET name = ?, code = ?, active = ? WHERE id = ?",
+                (name, code, 1 if active else 0, pm_id)
+            )
 
     def deactivate(self, pm_id: int):
         cur = self.db.cursor()
-        cur.execute("UPDATE payment_methods SET active = 0 WHERE id = ?", (pm_id,))
-        self.db.commit()
+        with self.db:
+            cur.execute("UPDATE payment_methods SET active = 0 WHERE id = ?", (pm_id,))
@@ -0,0 +1,132 @@
+# repositories/product_catalog.py
+"""
+Caché de proceso del catálogo de productos.
+
+Guarda cada Product por SKU (búsqueda O(1)) y un índice ordenado de
+palabras (SKU y descripción, sin acentos) para resolver prefijos con
+bisect, igual que products_fts pero sin ir a disco. ProductRepository lo
+llena una vez y lo mantiene al día (write-through) después de cada commit.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from models.product import Product
+from shared.utils import fold_text, search_tokens
+
+
+class ProductCatalog:
+    _instances: Dict[str, "ProductCatalog"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_sku: Dict[str, Product] = {}
+        self._words: List[Tuple[str, str]] = []   # (palabra, sku) ordenado
+        self._folded_skus: Dict[str, str] = {}
+        self._skus_by_code: Dict[str, str] = {}   # SKU en casefold -> SKU
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls, key: str) -> "ProductCatalog":
+        """Catálogo del proceso para una BD (ver database.database_key)."""
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls._instances[key] = cls()
+        return catalog
+
+    # =========================================
+    # ESCRITURA
+    # =========================================
+    def replace_all(self, products: List[Product]):
+        with self._lock:
+            self._by_sku = {p.sku: p for p in products}
+            self._folded_skus = {p.sku: fold_text(p.sku) for p in products}
+            self._skus_by_code = {p.sku.casefold(): p.sku for p in products}
+            self._words = sorted(
+                (word, p.sku) for p in products for word in self._index_words(p)
+            )
+            self.loaded = True
+
+    def put(self, product: Product):
+        with self._lock:
+            self.discard(product.sku)
+            self._by_sku[product.sku] = product
+            self._folded_skus[product.sku] = fold_text(product.sku)
+            self._skus_by_code[product.sku.casefold()] = product.sku
+            for word in self._index_words(product):
+                insort(self._words, (word, product.sku))
+
+    def discard(self, sku: str):
+        with self._lock:
+            product = self._by_sku.pop(sku, None)
+            if product is None:
+                return
+            del self._folded_skus[sku]
+            if self._skus_by_code.get(sku.casefold()) == sku:
+                del self._skus_by_code[sku.casefold()]
+            for word in self._index_words(product):
+                i = bisect_left(self._words, (word, sku))
+                if i < len(self._words) and self._words[i] == (word, sku):
+                    del self._words[i]
+
+    @staticmethod
+    def _index_words(product: Product) -> set:
+        return set(search_tokens(product.sku, product.description))
+
+    # =========================================
+    # LECTURA (se entregan copias: la UI edita los objetos)
+    # =========================================
+    def get(self, sku: str) -> Optional[Product]:
+        with self._lock:
+            product = self._by_sku.get(sku)
+            if product is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return replace(product)
+
+    def get_code(self, code: str) -> Optional[Product]:
+        """Código escaneado: SKU exacto o, si no, el mismo SKU sin distinguir mayúsculas."""
+        with self._lock:
+            sku = code if code in self._by_sku else self._skus_by_code.get(code.casefold())
+        return self.get(sku if sku is not None else code)
+
+    def search(self, query: str, active_only: bool = True, limit: Optional[int] = None) -> List[Product]:
+        """Prefijo por palabra ("cam azu" → CAMISA AZUL); SKU que empieza con la primera palabra va primero."""
+        words = search_tokens(query)
+        if not words:
+            return []
+        with self._lock:
+            skus = None
+            for word in words:
+                lo = bisect_left(self._words, (word,))
+                hi = bisect_left(self._words, (word + "\U0010ffff",))
+                found = {sku for _, sku in self._words[lo:hi]}
+                skus = found if skus is None else skus & found
+                if not skus:
+                    return []
+            products = [self._by_sku[sku] for sku in skus]
+            if active_only:
+                products = [p for p in products if p.active]
+            first = words[0]
+            rank = lambda p: (not self._folded_skus[p.sku].startswith(first), p.description)
+            if limit is None:
+                products.sort(key=rank)
+            else:
+                products = heapq.nsmallest(limit, products, key=rank)
+            return [replace(p) for p in products]
+
+    def shortcuts(self, limit: int = 8) -> List[Product]:
+        with self._lock:
+            products = sorted((p for p in self._by_sku.values() if p.is_pos_shortcut),
+                              key=lambda p: p.description)
+            return [replace(p) for p in products[:limit]]
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._by_sku), "hits": self.hits, "misses": self.misses}
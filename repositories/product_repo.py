@@ -1,17 +1,16 @@
 # repositories/product_repo.py
+import re
 import sqlite3
 from typing import List, Optional
+from database.database import database_key
 from models.product import Product
+from repositories.product_catalog import ProductCatalog
 
 class ProductRepository:
     def __init__(self, db_connection):
         self.conn = db_connection
-        self._ensure_catalogs()
-
-    def _ensure_catalogs(self):
-        # Aquí podrías validar que exista la columna is_pos_shortcut, etc.
-        # Por simplicidad lo omitimos (asumimos migración aplicada).
-        pass
+        self._has_fts = None
+        self.catalog = ProductCatalog.shared(database_key(db_connection))
 
     # ---------- CATEGORIES ----------
     def list_categories(self) -> List[tuple]:
@@ -20,9 +19,7 @@ class ProductRepository:
         return cur.fetchall()
 
     def ensure_category(self, name: str) -> int:
-        cur = self.conn.cursor()
-        cur.execute("INSERT OR IGNORE INTO categories(name) VALUES (?)", (name.strip(),))
-        self.conn.commit()
+        cur = self._write("INSERT OR IGNORE INTO categories(name) VALUES (?)", (name.strip(),))
         cur.execute("SELECT id FROM categories WHERE name = ?", (name.strip(),))
         row = cur.fetchone()
         return row[0] if row else None
@@ -46,8 +43,10 @@ class ProductRepository:
                 1 if p.print_logo else 0 
             ))
             self.conn.commit()
+            self._write_through(p.sku)
             return p
         except sqlite3.IntegrityError as e:
+            self.conn.rollback()
             if "UNIQUE constraint failed: products.sku" in str(e):
                 raise ValueError("El SKU ya existe")
             raise
@@ -57,7 +56,7 @@ class ProductRepository:
         if errs:
             raise ValueError(", ".join(errs))
 
-        self.conn.execute("""
+        self._write("""
             UPDATE products
                SET description = ?,
                    price = ?,
@@ -78,10 +77,46 @@ class ProductRepository:
             1 if p.print_logo else 0,   # ✅ aquí también
             p.sku
         ))
-        self.conn.commit()
+        self._write_through(p.sku)
         return p
 
     def get(self, sku: str) -> Optional[Product]:
+        """Desde la caché del catálogo; solo un SKU desconocido va a disco."""
+        product = self._cached().get(sku)
+        if product is None:
+            product = self._fetch(sku)
+            if product:
+                self.catalog.put(product)
+        return product
+
+    def get_by_code(self, code: str) -> Optional[Product]:
+        """
+        Para el lector de código de barras: una búsqueda en la caché sin
+        distinguir mayúsculas; si falla, una sola consulta (índice de sku).
+        """
+        code = code.strip()
+        product = self._cached().get_code(code)
+        if product is None:
+            cur = self.conn.cursor()
+            cur.execute("""
+                SELECT sku, description, price, cost, unit, kind, tax_rate, category_id, active,
+                       is_pos_shortcut, print_logo, created_at, updated_at
+                  FROM products
+                 WHERE sku IN (?, ?)
+                 ORDER BY sku = ? DESC
+                 LIMIT 1
+            """, (code, code.upper(), code))
+            row = cur.fetchone()
+            if row:
+                product = self._row_to_product(row)
+                self.catalog.put(product)
+        return product
+
+    def find(self, q: str, active_only: bool = True, limit: Optional[int] = None) -> List[Product]:
+        """Como search, pero en memoria (caché del catálogo). Para el POS."""
+        return self._cached().search(q, active_only, limit)
+
+    def _fetch(self, sku: str) -> Optional[Product]:
         cur = self.conn.cursor()
         # 🔧 Unificamos el orden de columnas en TODOS los SELECTs
         cur.execute("""
@@ -93,7 +128,68 @@ class ProductRepository:
         row = cur.fetchone()
         return self._row_to_product(row) if row else None
 
-    def search(self, q: str, active_only: bool = True) -> List[Product]:
+    def _cached(self) -> ProductCatalog:
+        if not self.catalog.loaded:
+            self.catalog.replace_all(self.list_all(active_only=False))
+        return self.catalog
+
+    def _write(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        # La conexión es compartida: un error no deja la transacción abierta
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql, params)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return cur
+
+    def _write_through(self, sku: str):
+        # Después del commit: la caché refleja exactamente la fila guardada
+        if not self.catalog.loaded:
+            return
+        product = self._fetch(sku)
+        if product:
+            self.catalog.put(product)
+        else:
+            self.catalog.discard(sku)
+
+    def search(self, q: str, active_only: bool = True, limit: Optional[int] = None) -> List[Product]:
+        """
+        Busca por SKU o descripción. Con FTS5 usa prefijos por palabra
+        ("cam azu" → CAMISA AZUL) ordenados por bm25; sin FTS5 cae a LIKE.
+        """
+        tokens = re.findall(r"\w+", q.lower())
+        if tokens and self._fts_enabled():
+            return self._search_fts(tokens, active_only, limit)
+        return self._search_like(q, active_only, limit)
+
+    def _fts_enabled(self) -> bool:
+        if self._has_fts is None:
+            row = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+            ).fetchone()
+            self._has_fts = row is not None
+        return self._has_fts
+
+    def _search_fts(self, tokens: List[str], active_only: bool, limit: Optional[int]) -> List[Product]:
+        match = " ".join(f'"{t}"*' for t in tokens)
+        sql = """
+            SELECT p.sku, p.description, p.price, p.cost, p.unit, p.kind, p.tax_rate, p.category_id, p.active,
+                   p.is_pos_shortcut, p.print_logo, p.created_at, p.updated_at
+              FROM products_fts f
+              JOIN products p ON p.sku = f.sku
+             WHERE products_fts MATCH ?
+        """
+        if active_only:
+            sql += " AND p.active = 1"
+        # El SKU pesa más que la descripción
+        sql += " ORDER BY bm25(products_fts, 4.0, 1.0), p.description LIMIT ?"
+        cur = self.conn.cursor()
+        cur.execute(sql, (match, -1 if limit is None else limit))
+        return [self._row_to_product(r) for r in cur.fetchall()]
+
+    def _search_like(self, q: str, active_only: bool, limit: Optional[int]) -> List[Product]:
         term = f"%{q.lower()}%"
         cur = self.conn.cursor()
         base_sql = """
@@ -101,16 +197,11 @@ class ProductRepository:
                    is_pos_shortcut, print_logo, created_at, updated_at
               FROM products
         """
+        where = " WHERE (LOWER(description) LIKE ? OR LOWER(sku) LIKE ?)"
         if active_only:
-            cur.execute(base_sql + """
-                 WHERE active = 1 AND (LOWER(description) LIKE ? OR LOWER(sku) LIKE ?)
-                 ORDER BY description
-            """, (term, term))
-        else:
-            cur.execute(base_sql + """
-                 WHERE (LOWER(description) LIKE ? OR LOWER(sku) LIKE ?)
-                 ORDER BY description
-            """, (term, term))
+            where += " AND active = 1"
+        cur.execute(base_sql + where + " ORDER BY description LIMIT ?",
+                    (term, term, -1 if limit is None else limit))
         return [self._row_to_product(r) for r in cur.fetchall()]
 
     def list_all(self, active_only: bool = True) -> List[Product]:
@@ -128,41 +219,39 @@ class ProductRepository:
 
     def toggle_shortcut(self, sku: str, shortcut_value: bool):
         new_shortcut = not shortcut_value
-        self.conn.execute("""
+        self._write("""
             UPDATE products
                SET is_pos_shortcut = ?
              WHERE sku = ?
         """, (1 if new_shortcut else 0, sku))
-        self.conn.commit()
+        self._write_through(sku)
 
     def toggle_print_logo(self, sku: str, print_logo_value: bool):
         new_print_value = not print_logo_value
-        self.conn.execute("""
+        self._write("""
             UPDATE products
                SET print_logo = ?
              WHERE sku = ?
         """, (1 if new_print_value else 0, sku))
-        self.conn.commit()        
+        self._write_through(sku)
 
     def deactivate(self, sku: str) -> bool:
-        cur = self.conn.cursor()
-        cur.execute("""
+        cur = self._write("""
             UPDATE products
                SET active = 0, updated_at = datetime('now','localtime')
              WHERE sku = ?
         """, (sku,))
-        self.conn.commit()
+        self._write_through(sku)
         return cur.rowcount > 0
 
     def activate(self, sku: str) -> bool:
         """Activa un producto previamente desactivado"""
-        cur = self.conn.cursor()
-        cur.execute("""
+        cur = self._write("""
             UPDATE products
             SET active = 1, updated_at = datetime('now','localtime')
             WHERE sku = ?
         """, (sku,))
-        self.conn.commit()
+        self._write_through(sku)
         return cur.rowcount > 0
 
     # ---------- Helpers ----------
@@ -177,36 +266,28 @@ class ProductRepository:
 
     # ---------- POS helpers ----------
     def get_pos_shortcuts(self, limit=8):
-        cur = self.conn.cursor()
-        cur.execute("""
-            SELECT sku, description, price, tax_rate, is_pos_shortcut, print_logo
-              FROM products
-             WHERE is_pos_shortcut = 1
-             ORDER BY description ASC
-             LIMIT ?
-        """, (limit,))
-        rows = cur.fetchall()
-        return [self._map_row(r) for r in rows]
+        return [self._map_product(p) for p in self._cached().shortcuts(limit)]
 
     def get_top_sold(self, limit=8):
+        # El ranking sale de sale_items (idx_sale_items_sku); los datos, de la caché
         cur = self.conn.cursor()
         cur.execute("""
-            SELECT p.sku, p.description, p.price, p.tax_rate, p.is_pos_shortcut, p.print_logo
-              FROM products p
-              JOIN sale_items si ON si.sku = p.sku
-             GROUP BY p.sku
-             ORDER BY SUM(si.qty) DESC
+            SELECT sku
+              FROM sale_items
+             GROUP BY sku
+             ORDER BY SUM(qty) DESC
              LIMIT ?
         """, (limit,))
-        rows = cur.fetchall()
-        return [self._map_row(r) for r in rows]
+        catalog = self._cached()
+        products = [catalog.get(row[0]) for row in cur.fetchall()]
+        return [self._map_product(p) for p in products if p]
 
-    def _map_row(self, row):
+    def _map_product(self, p: Product):
         return {
-            "sku": row[0],
-            "description": row[1],
-            "price": float(row[2]),
-            "tax_rate": float(row[3]),
-            "is_pos_shortcut": bool(row[4]),
-            "print_logo": bool(row[5]),
+            "sku": p.sku,
+            "description": p.description,
+            "price": p.price,
+            "tax_rate": p.tax_rate,
+            "is_pos_shortcut": p.is_pos_shortcut,
+            "print_logo": p.print_logo,
         }
@@ -1,58 +1,76 @@
 # repositories/sale_repo.py
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 
 class SaleRepository:
     def __init__(self, db):
         self.db = db
 
-    def create_sale(self, student, cart: List[Dict], seller, payment_method_id: int, amount: float):
+    def create_sale(self, student, cart: List[Dict], seller, payment_method_id: int, amount: float) -> Tuple[int, str]:
         """
-        Crea una venta completa con items y pago.
+        Crea una venta completa con items y pago en una sola transacción.
+        Los totales se calculan aquí una vez y se escriben en el encabezado;
+        mientras la venta está en status 'posting' el trigger de renglones no
+        acumula. Regresa (sale_id, folio).
         """
-        cur = self.db.cursor()
-
-        # 1. Insertar venta
-        cur.execute("""
-            INSERT INTO sales (customer_id, customer, seller_id, seller, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            student.student_id,
-            f"{student.first_name} {student.second_name or ''}".strip(),
-            seller.get("id", 0),
-            f"{seller.get('first_name','')} {seller.get('second_name','')}".strip(),
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ))
-        sale_id = cur.lastrowid
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # 2. Insertar items
+        subtotal = 0.0
+        tax_total = 0.0
+        lines = []
         for item in cart:
+            line_total = item["price"] * item["qty"]
+            subtotal += line_total
+            tax_total += line_total * item["tax_rate"]
+            lines.append((item["sku"], item["description"], item["qty"],
+                          item["price"], item["tax_rate"], line_total))
+        subtotal = round(subtotal, 2)
+        tax_total = round(tax_total, 2)
+        total = round(subtotal + tax_total, 2)
+
+        cur = self.db.cursor()
+        # La conexión es compartida: trabajo pendiente de otro repositorio no
+        # se confirma ni se descarta como efecto secundario de una venta
+        if self.db.in_transaction:
+            raise RuntimeError("Hay una transacción pendiente en la conexión; la venta no se registró")
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # 1. Encabezado con totales (folio lo asigna trg_sales_set_folio)
             cur.execute("""
-                INSERT INTO sale_items (sale_id, sku, description_snapshot, qty, unit_price, tax_rate, line_total)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO sales (customer_id, customer, seller_id, seller,
+                                   subtotal, tax_total, total, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'posting', ?, ?)
             """, (
-                sale_id,
-                item["sku"],
-                item["description"],
-                item["qty"],
-                item["price"],
-                item["tax_rate"],
-                item["price"] * item["qty"]
+                student.student_id,
+                f"{student.first_name} {student.second_name or ''}".strip(),
+                seller.get("id") or None,  # superusuario (id 0) no existe en sellers
+                f"{seller.get('first_name','')} {seller.get('second_name','')}".strip(),
+                subtotal, tax_total, total,
+                now, now
             ))
+            sale_id = cur.lastrowid
 
-        # 3. Insertar pago (ahora con method_id)
-        cur.execute("""
-            INSERT INTO payments (sale_id, method_id, amount, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (
-            sale_id,
-            payment_method_id,
-            amount,
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ))
+            # 2. Renglones en un solo executemany
+            cur.executemany("""
+                INSERT INTO sale_items (sale_id, sku, description_snapshot, qty, unit_price, tax_rate, line_total)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(sale_id, *line) for line in lines])
 
-        self.db.commit()
-        return sale_id
+            # 3. Pago (trg_payments_ai actualiza paid_total y payment_status)
+            cur.execute("""
+                INSERT INTO payments (sale_id, method_id, amount, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (sale_id, payment_method_id, amount, now))
+
+            cur.execute("UPDATE sales SET status = 'paid' WHERE id = ?", (sale_id,))
+            # El folio lo genera el trigger; se lee tal cual quedó guardado
+            folio = cur.execute("SELECT folio FROM sales WHERE id = ?", (sale_id,)).fetchone()[0]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return sale_id, folio
 
     def list_sales(self, limit=20):
         cur = self.db.cursor()
@@ -63,3 +81,42 @@ class SaleRepository:
             LIMIT ?
         """, (limit,))
         return cur.fetchall()
+
+    def get_ticket_data(self, folio: str) -> Optional[Dict]:
+        """
+        Datos de una venta guardada con la forma de TicketPrinter.print_ticket
+        (header, items, totals, payment_method), para reimprimir por folio.
+        """
+        cur = self.db.cursor()
+        cur.execute("""
+            SELECT s.id, s.folio, s.customer, c.enrollment,
+                   s.subtotal, s.tax_total, s.total, s.created_at,
+                   (SELECT pm.name FROM payments p
+                    JOIN payment_methods pm ON pm.id = p.method_id
+                    WHERE p.sale_id = s.id ORDER BY p.id LIMIT 1)
+            FROM sales s
+            LEFT JOIN customers c ON c.id = s.customer_id
+            WHERE s.folio = ?
+        """, (folio.strip().upper(),))
+        sale = cur.fetchone()
+        if not sale:
+            return None
+
+        cur.execute("""
+            SELECT description_snapshot, qty, unit_price, tax_rate
+            FROM sale_items WHERE sale_id = ? ORDER BY id
+        """, (sale[0],))
+        items = [
+            {"description": r[0], "qty": int(r[1]) if float(r[1]).is_integer() else r[1],
+             "unit_price": r[2], "tax_rate": r[3]}
+            for r in cur.fetchall()
+        ]
+
+        created = datetime.strptime(sale[7], "%Y-%m-%d %H:%M:%S")
+        return {
+            "header": {"folio": sale[1], "student": sale[2], "enrollment": sale[3] or "",
+                       "date": created.strftime("%d/%m/%Y %H:%M")},
+            "items": items,
+            "totals": {"subtotal": sale[4], "tax": sale[5], "total": sale[6]},
+            "payment_method": sale[8] or "",
+        }
@@ -1,11 +1,67 @@
 import sqlite3
 from typing import List, Optional, Dict, Any
 from models.student import Student
+from models.tutor import Tutor
+from shared.utils import search_tokens, student_search_tokens
+
+
+def index_student(conn, customer_id: int, enrollment: str, first_name: str, second_name: Optional[str]):
+    """
+    Actualiza search_key y customer_search_tokens de un alumno.
+    No hace commit: corre dentro de la transacción de quien llama
+    (repositorio o importador).
+    """
+    words = student_search_tokens(enrollment, first_name, second_name)
+    conn.execute("UPDATE customers SET search_key = ? WHERE id = ?", (" ".join(words), customer_id))
+    conn.execute("DELETE FROM customer_search_tokens WHERE customer_id = ?", (customer_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO customer_search_tokens (token, customer_id) VALUES (?, ?)",
+        [(word, customer_id) for word in words]
+    )
+
+
+# Listado con nombres de catálogo y tutor principal en una sola consulta.
+# El tutor principal es el primero por nombre entre los activos marcados.
+_LISTING_SELECT = '''
+    SELECT c.*,
+           gr.name AS grade_name, gp.name AS group_name, sh.name AS shift_name,
+           t.tutor_id AS tutor_id, t.first_name AS tutor_first_name,
+           t.second_name AS tutor_second_name, t.relationship AS tutor_relationship,
+           t.phone AS tutor_phone, t.email AS tutor_email
+    FROM customers c
+    LEFT JOIN grades gr ON gr.id = c.grade_id
+    LEFT JOIN groups gp ON gp.id = c.group_id
+    LEFT JOIN shifts sh ON sh.id = c.shift_id
+    LEFT JOIN tutors t ON t.tutor_id = (
+        SELECT tutor_id FROM tutors
+        WHERE student_id = c.id AND active = 1 AND is_primary = 1
+        ORDER BY first_name LIMIT 1
+    )
+'''
+
 
 class StudentRepository:
+    # Suscriptores a cambios confirmados: listener(conn, student_id)
+    _listeners = []
+
     def __init__(self, db_connection):
         self.conn = db_connection
 
+    @classmethod
+    def subscribe(cls, listener):
+        """Registra un callback que se llama después de cada commit de un alumno"""
+        if listener not in cls._listeners:
+            cls._listeners.append(listener)
+
+    @classmethod
+    def unsubscribe(cls, listener):
+        if listener in cls._listeners:
+            cls._listeners.remove(listener)
+
+    def _notify(self, student_id: int):
+        for listener in list(self._listeners):
+            listener(self.conn, student_id)
+
     def create(self, student: Student) -> Optional[Student]:
         errors = student.validate()
         if errors:
@@ -26,15 +82,22 @@ class StudentRepository:
             ))
             
             student.student_id = cursor.lastrowid
+            index_student(self.conn, student.student_id, student.enrollment,
+                          student.first_name, student.second_name)
             self.conn.commit()
+            self._notify(student.student_id)
             return student
             
         except sqlite3.IntegrityError as e:
+            self.conn.rollback()
             if "UNIQUE constraint failed: customers.enrollment" in str(e):
                 raise ValueError("La matrícula ya existe")
             elif "UNIQUE constraint failed: customers.curp" in str(e):
                 raise ValueError("El CURP ya está registrado")
             raise
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
 
     def get_by_id(self, student_id: int) -> Optional[Student]:
         cursor = self.conn.cursor()
@@ -63,26 +126,83 @@ class StudentRepository:
         
         return [Student.from_dict(dict(row)) for row in cursor.fetchall()]
 
-    def search(self, query: str, active_only: bool = True) -> List[Student]:
+    def search(self, query: str, active_only: bool = True, limit: Optional[int] = None) -> List[Student]:
+        """
+        Búsqueda sin acentos ni mayúsculas por prefijo de palabra
+        ("garc ana" → Ana García). Cada palabra de la consulta debe coincidir.
+        Orden: matrícula exacta, palabras exactas, nombre.
+        """
+        words = search_tokens(query)
+        if not words:
+            students = self.get_all(active_only)
+            return students[:limit] if limit else students
+
         cursor = self.conn.cursor()
-        search_term = f"%{query.lower()}%"
-        
-        if active_only:
-            cursor.execute('''
-                SELECT * FROM customers 
-                WHERE active = 1 AND 
-                (LOWER(first_name) LIKE ? OR LOWER(second_name) LIKE ? OR enrollment LIKE ?)
-                ORDER BY first_name, second_name
-            ''', (search_term, search_term, search_term))
-        else:
-            cursor.execute('''
-                SELECT * FROM customers 
-                WHERE LOWER(first_name) LIKE ? OR LOWER(second_name) LIKE ? OR enrollment LIKE ?
-                ORDER BY first_name, second_name
-            ''', (search_term, search_term, search_term))
-        
+        cursor.execute(*self._search_sql("SELECT c.* FROM customers c", query, words, active_only, limit))
         return [Student.from_dict(dict(row)) for row in cursor.fetchall()]
 
+    def get_listing(self, query: str = "", active_only: bool = True, limit: Optional[int] = None) -> List[Student]:
+        """
+        Igual que get_all/search, pero cada alumno trae grade_name, group_name,
+        shift_name y primary_tutor (Tutor o None) resueltos en la misma
+        consulta, para pintar tarjetas sin consultas por renglón.
+        """
+        words = search_tokens(query)
+        if words:
+            sql, params = self._search_sql(_LISTING_SELECT, query, words, active_only, limit)
+        else:
+            sql, params = _LISTING_SELECT, []
+            if active_only:
+                sql += " WHERE c.active = 1"
+            sql += " ORDER BY c.first_name, c.second_name LIMIT ?"
+            params.append(-1 if limit is None else limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return [self._listing_row(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _search_sql(select: str, query: str, words: List[str], active_only: bool, limit: Optional[int]):
+        # Un rango por palabra sobre la PK (token, customer_id): usa el índice
+        branches, params = [], []
+        for i, word in enumerate(words):
+            branches.append(
+                f"SELECT {i} AS qi, customer_id, token = ? AS exact "
+                "FROM customer_search_tokens WHERE token >= ? AND token < ?"
+            )
+            params += [word, word, word + "\U0010ffff"]
+
+        sql = f'''
+            {select}
+            JOIN (
+                SELECT customer_id, SUM(exact) AS exact
+                FROM ({" UNION ALL ".join(branches)})
+                GROUP BY customer_id
+                HAVING COUNT(DISTINCT qi) = ?
+            ) m ON m.customer_id = c.id
+        '''
+        params.append(len(words))
+        if active_only:
+            sql += " WHERE c.active = 1"
+        sql += " ORDER BY c.enrollment = ? DESC, m.exact DESC, c.first_name, c.second_name LIMIT ?"
+        params += [query.strip().upper(), -1 if limit is None else limit]
+        return sql, params
+
+    @staticmethod
+    def _listing_row(row) -> Student:
+        data = dict(row)
+        student = Student.from_dict(data)
+        student.grade_name = data['grade_name'] or ""
+        student.group_name = data['group_name'] or ""
+        student.shift_name = data['shift_name'] or ""
+        student.primary_tutor = Tutor(
+            tutor_id=data['tutor_id'], student_id=student.student_id,
+            first_name=data['tutor_first_name'], second_name=data['tutor_second_name'],
+            relationship=data['tutor_relationship'], phone=data['tutor_phone'],
+            email=data['tutor_email'], is_primary=True
+        ) if data['tutor_id'] else None
+        return student
+
     def update(self, student: Student) -> Optional[Student]:
         errors = student.validate()
         if errors:
@@ -104,16 +224,23 @@ class StudentRepository:
                 student.curp, student.pay_reference, student.active,
                 student.student_id
             ))
+            index_student(self.conn, student.student_id, student.enrollment,
+                          student.first_name, student.second_name)
             
             self.conn.commit()
+            self._notify(student.student_id)
             return student
             
         except sqlite3.IntegrityError as e:
+            self.conn.rollback()
             if "UNIQUE constraint failed: customers.enrollment" in str(e):
                 raise ValueError("La matrícula ya existe")
             elif "UNIQUE constraint failed: customers.curp" in str(e):
                 raise ValueError("El CURP ya está registrado")
             raise
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
 
     def deactivate(self, student_id: int) -> bool:
         try:
@@ -124,9 +251,11 @@ class StudentRepository:
             ''', (student_id,))
             
             self.conn.commit()
+            self._notify(student_id)
             return cursor.rowcount > 0
             
         except sqlite3.Error:
+            self.conn.rollback()
             return False
 
     def activate(self, student_id: int) -> bool:
@@ -139,9 +268,11 @@ class StudentRepository:
             ''', (student_id,))
             
             self.conn.commit()
+            self._notify(student_id)
             return cursor.rowcount > 0
             
         except sqlite3.Error:
+            self.conn.rollback()
             return False
 
     def get_related_parents(self, student_id: int) -> List[Dict[str, Any]]:
@@ -8,11 +8,12 @@ class TutorRepository:
         self.conn = db_connection        
 
     def create(self, tutor: Tutor) -> Tutor:
-        cursor = self.conn.execute(
-            "INSERT INTO tutors (student_id, first_name, second_name, relationship, phone, email, is_primary) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (tutor.student_id, tutor.first_name, tutor.second_name, tutor.relationship, tutor.phone, tutor.email, 1 if tutor.is_primary else 0)
-        )
-        self.conn.commit()
+        # with: commit si todo sale bien, rollback si falla (conexión compartida)
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO tutors (student_id, first_name, second_name, relationship, phone, email, is_primary) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tutor.student_id, tutor.first_name, tutor.second_name, tutor.relationship, tutor.phone, tutor.email, 1 if tutor.is_primary else 0)
+            )
         tutor.tutor_id = cursor.lastrowid
         return tutor
 
@@ -31,17 +32,17 @@ class TutorRepository:
         return tutors
 
     def update(self, tutor: Tutor):
-        self.conn.execute(
-            "UPDATE tutors SET first_name=?, second_name=?, relationship=?, phone=?, email=?, is_primary=? WHERE tutor_id=?",
-            (tutor.first_name, tutor.second_name, tutor.relationship, tutor.phone, tutor.email, 1 if tutor.is_primary else 0, tutor.tutor_id)
-        )
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tutors SET first_name=?, second_name=?, relationship=?, phone=?, email=?, is_primary=? WHERE tutor_id=?",
+                (tutor.first_name, tutor.second_name, tutor.relationship, tutor.phone, tutor.email, 1 if tutor.is_primary else 0, tutor.tutor_id)
+            )
 
     def delete(self, tutor_id: int):
-        self.conn.execute("UPDATE tutors SET active = 0 WHERE tutor_id = ?", (tutor_id,))
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute("UPDATE tutors SET active = 0 WHERE tutor_id = ?", (tutor_id,))
 
     def set_primary(self, tutor_id: int, student_id: int):
-        self.conn.execute("UPDATE tutors SET is_primary = 0 WHERE student_id = ?", (student_id,))
-        self.conn.execute("UPDATE tutors SET is_primary = 1 WHERE tutor_id = ?", (tutor_id,))
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute("UPDATE tutors SET is_primary = 0 WHERE student_id = ?", (student_id,))
+            self.conn.execute("UPDATE tutors SET is_primary = 1 WHERE tutor_id = ?", (tutor_id,))
@@ -0,0 +1,3 @@
+from .student_directory import StudentDirectory
+
+__all__ = ['StudentDirectory']
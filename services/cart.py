@@ -0,0 +1,184 @@
+# services/cart.py
+"""
+Carrito del POS sin dependencias de Tk.
+
+Cada renglón se identifica por (sku, precio unitario en centavos): el mismo
+SKU con otro precio es otro renglón, como hacía POSFrame. Los importes se
+llevan en centavos enteros y se actualizan en cada operación; el IVA se
+acumula por tasa (base en centavos) y se redondea una sola vez, igual que
+SaleRepository.create_sale, para que el total cobrado coincida con el de
+la venta.
+
+Los cambios se avisan a los suscriptores con listener(event, key, line):
+event es "added", "updated", "removed" o "cleared" (key y line en None).
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+CartKey = Tuple[str, int]
+
+
+def to_cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+@dataclass
+class CartLine:
+    sku: str
+    description: str
+    unit_cents: int
+    tax_rate: float
+    qty: int = 1
+
+    @property
+    def key(self) -> CartKey:
+        return (self.sku, self.unit_cents)
+
+    @property
+    def price(self) -> float:
+        return self.unit_cents / 100
+
+    @property
+    def line_cents(self) -> int:
+        return self.unit_cents * self.qty
+
+
+class Cart:
+    def __init__(self):
+        self._lines: Dict[CartKey, CartLine] = {}
+        self._listeners: List[Callable] = []
+        self.subtotal_cents = 0
+        # Base gravable por tasa de IVA (centavos)
+        self._tax_basis: Dict[float, int] = {}
+
+    # =========================================
+    # EVENTOS
+    # =========================================
+    def subscribe(self, listener: Callable):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, event: str, key: Optional[CartKey], line: Optional[CartLine]):
+        for listener in list(self._listeners):
+            listener(event, key, line)
+
+    # =========================================
+    # OPERACIONES
+    # =========================================
+    def add(self, product, qty: int = 1) -> CartKey:
+        """Agrega un Product o dict con sku/description/price/tax_rate."""
+        if isinstance(product, dict):
+            sku, description = product["sku"], product["description"]
+            price, tax_rate = product["price"], product["tax_rate"]
+        else:
+            sku, description = product.sku, product.description
+            price, tax_rate = product.price, product.tax_rate
+
+        key = (sku, to_cents(price))
+        line = self._lines.get(key)
+        if line is None:
+            line = CartLine(sku, description, key[1], tax_rate, 0)
+            self._lines[key] = line
+            event = "added"
+        else:
+            event = "updated"
+        self._apply(line, qty)
+        self._emit(event, key, line)
+        return key
+
+    def set_qty(self, key: CartKey, qty: int):
+        if qty <= 0:
+            self.remove(key)
+            return
+        line = self._lines[key]
+        self._apply(line, qty - line.qty)
+        self._emit("updated", key, line)
+
+    def set_price(self, key: CartKey, price: float) -> CartKey:
+        """Cambia el precio de un renglón; si ya existe uno con ese precio, se fusionan."""
+        line = self._lines[key]
+        new_key = (line.sku, to_cents(price))
+        if new_key == key:
+            return key
+        qty = line.qty
+        self.remove(key)
+        existing = self._lines.get(new_key)
+        if existing is not None:
+            self._apply(existing, qty)
+            self._emit("updated", new_key, existing)
+        else:
+            moved = CartLine(line.sku, line.description, new_key[1], line.tax_rate, 0)
+            self._lines[new_key] = moved
+            self._apply(moved, qty)
+            self._emit("added", new_key, moved)
+        return new_key
+
+    def remove(self, key: CartKey):
+        line = self._lines.pop(key, None)
+        if line is None:
+            return
+        self._apply(line, -line.qty)
+        self._emit("removed", key, line)
+
+    def clear(self):
+        self._lines.clear()
+        self._tax_basis.clear()
+        self.subtotal_cents = 0
+        self._emit("cleared", None, None)
+
+    def _apply(self, line: CartLine, delta_qty: int):
+        delta = line.unit_cents * delta_qty
+        line.qty += delta_qty
+        self.subtotal_cents += delta
+        basis = self._tax_basis.get(line.tax_rate, 0) + delta
+        if basis:
+            self._tax_basis[line.tax_rate] = basis
+        else:
+            self._tax_basis.pop(line.tax_rate, None)
+
+    # =========================================
+    # CONSULTA
+    # =========================================
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[CartLine]:
+        return iter(self._lines.values())
+
+    def __contains__(self, key) -> bool:
+        return key in self._lines
+
+    def get(self, key: CartKey) -> Optional[CartLine]:
+        return self._lines.get(key)
+
+    @property
+    def tax_cents(self) -> int:
+        # Pocas tasas distintas (0 y 16 %): sigue siendo O(1) en la práctica
+        return int(round(sum(rate * basis for rate, basis in self._tax_basis.items())))
+
+    @property
+    def total_cents(self) -> int:
+        return self.subtotal_cents + self.tax_cents
+
+    @property
+    def subtotal(self) -> float:
+        return self.subtotal_cents / 100
+
+    @property
+    def tax(self) -> float:
+        return self.tax_cents / 100
+
+    @property
+    def total(self) -> float:
+        return self.total_cents / 100
+
+    def as_items(self) -> List[Dict]:
+        """Renglones en el formato que espera SaleRepository.create_sale."""
+        return [
+            {"sku": l.sku, "description": l.description, "price": l.price,
+             "tax_rate": l.tax_rate, "qty": l.qty}
+            for l in self._lines.values()
+        ]
@@ -0,0 +1,221 @@
+# services/db_worker.py
+"""
+Hilo de trabajo para consultas a la BD fuera del hilo de Tk.
+
+Cada DBWorker tiene su propio hilo y su propia conexión SQLite (WAL deja
+leer mientras la conexión de la UI escribe). Los trabajos son
+fn(conn, *args); el resultado regresa al hilo de Tk por una cola que se
+vacía con after(), nunca tocando widgets desde el hilo de trabajo.
+
+    worker = DBWorker.shared(conn)
+    worker.submit(lambda c: StudentRepository(c).get_all(),
+                  callback=self._show, widget=self, name="students.get_all")
+
+Se lleva latencia por nombre de trabajo (espera en cola y ejecución).
+"""
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+from database.database import CONNECTION_PRAGMAS, database_key
+
+
+class Job:
+    __slots__ = ("fn", "args", "callback", "errback", "widget", "name",
+                 "cancelled", "submitted", "started")
+
+    def __init__(self, fn, args, callback, errback, widget, name):
+        self.fn = fn
+        self.args = args
+        self.callback = callback
+        self.errback = errback
+        self.widget = widget
+        self.name = name
+        self.cancelled = False
+        self.submitted = time.perf_counter()
+        self.started = None
+
+    def cancel(self):
+        """El resultado ya no se entrega (ver DBWorker.cancel para interrumpir)."""
+        self.cancelled = True
+
+
+class LatencyStats:
+    __slots__ = ("count", "wait_ms", "run_ms", "max_run_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.wait_ms = 0.0
+        self.run_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def add(self, wait_ms: float, run_ms: float):
+        self.count += 1
+        self.wait_ms += wait_ms
+        self.run_ms += run_ms
+        self.max_run_ms = max(self.max_run_ms, run_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_wait_ms": self.wait_ms / self.count if self.count else 0.0,
+            "avg_run_ms": self.run_ms / self.count if self.count else 0.0,
+            "max_run_ms": self.max_run_ms,
+        }
+
+
+def open_connection(db_path) -> sqlite3.Connection:
+    """Conexión configurada igual que DatabaseManager.get_connection."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class DBWorker:
+    _instances: Dict[str, "DBWorker"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], poll_ms: int = 15):
+        self._connect = connect
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._outstanding = 0          # solo se toca desde el hilo de Tk
+        self._polling = False
+        self._current: Optional[Job] = None
+        self._current_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, LatencyStats] = {}
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="db-worker", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls, conn) -> "DBWorker":
+        """Worker del proceso para la BD de conn (abre su propia conexión)."""
+        key = database_key(conn)
+        with cls._instances_lock:
+            worker = cls._instances.get(key)
+            if worker is None:
+                worker = cls._instances[key] = cls(lambda: open_connection(key))
+        return worker
+
+    @classmethod
+    def close_all(cls):
+        with cls._instances_lock:
+            workers = list(cls._instances.values())
+            cls._instances.clear()
+        for worker in workers:
+            worker.close()
+
+    # =========================================
+    # HILO DE TK
+    # =========================================
+    def submit(self, fn, *args, callback=None, errback=None, widget=None, name=None) -> Job:
+        """
+        Encola fn(conn, *args). callback(resultado) o errback(excepción) corren
+        en el hilo de Tk vía widget.after(); si el widget ya no existe se descartan.
+        """
+        job = Job(fn, args, callback, errback, widget, name or getattr(fn, "__name__", "job"))
+        self._jobs.put(job)
+        if widget is not None:
+            self._outstanding += 1
+            self._ensure_polling(widget)
+        return job
+
+    def cancel(self, job: Job):
+        """Descarta el resultado y, si la consulta está corriendo, la interrumpe."""
+        job.cancel()
+        with self._current_lock:
+            if self._current is job:
+                self._conn.interrupt()
+
+    def _ensure_polling(self, widget):
+        if not self._polling:
+            self._polling = True
+            self._poll_root = widget.winfo_toplevel()
+            self._poll_root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if job.cancelled or not self._alive(job.widget):
+                continue
+            if error is None:
+                if job.callback:
+                    job.callback(result)
+            elif job.errback:
+                job.errback(error)
+            else:
+                traceback.print_exception(type(error), error, error.__traceback__)
+
+        if self._outstanding > 0 and self._alive(self._poll_root):
+            self._poll_root.after(self.poll_ms, self._drain)
+        else:
+            self._polling = False
+
+    @staticmethod
+    def _alive(widget) -> bool:
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    # =========================================
+    # HILO DE TRABAJO
+    # =========================================
+    def _loop(self):
+        self._conn = self._connect()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if job.cancelled:
+                self._finish(job, None, None)
+                continue
+            with self._current_lock:
+                self._current = job
+            job.started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = job.fn(self._conn, *job.args)
+            except Exception as e:
+                error = e
+            finally:
+                with self._current_lock:
+                    self._current = None
+            ended = time.perf_counter()
+            self._record(job.name, (job.started - job.submitted) * 1000, (ended - job.started) * 1000)
+            self._finish(job, result, error)
+        self._conn.close()
+
+    def _finish(self, job: Job, result, error):
+        if job.widget is not None:
+            self._results.put((job, result, error))
+        elif error is not None and not job.cancelled:
+            traceback.print_exception(type(error), error, error.__traceback__)
+
+    def _record(self, name: str, wait_ms: float, run_ms: float):
+        with self._stats_lock:
+            self._stats.setdefault(name, LatencyStats()).add(wait_ms, run_ms)
+
+    # =========================================
+    # ESTADO
+    # =========================================
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Latencia por nombre de trabajo: count, avg_wait_ms, avg_run_ms, max_run_ms."""
+        with self._stats_lock:
+            return {name: s.as_dict() for name, s in self._stats.items()}
+
+    def close(self, timeout: float = 2.0):
+        self._jobs.put(None)
+        self._thread.join(timeout)
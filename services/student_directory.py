@@ -0,0 +1,227 @@
+# services/student_directory.py
+"""
+Directorio en memoria de alumnos activos para la búsqueda del POS.
+
+Carga el padrón una sola vez en tuplas compactas y dos tries (matrícula y
+palabras del nombre). Cada nodo del trie guarda los ids de su subárbol, así
+que un prefijo se resuelve en O(len(prefijo)) y la intersección entre
+palabras es de conjuntos. Solo se construyen objetos Student para los
+resultados que se van a mostrar.
+
+Se mantiene al día con StudentRepository.subscribe: después de cada commit
+de create/update/activate/deactivate se vuelve a leer ese alumno.
+"""
+import heapq
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from database.database import database_key
+from models.student import Student
+from repositories.student_repo import StudentRepository
+from shared.utils import fold_text, search_tokens
+
+
+class PrefixTrie:
+    """Trie de palabras; cada nodo conoce los ids de todas las palabras debajo."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self):
+        # nodo = [hijos: dict, ids del subárbol: set, ids cuya palabra termina aquí: set]
+        self._root = [{}, set(), set()]
+
+    def add(self, word: str, entry_id: int):
+        node = self._root
+        node[1].add(entry_id)
+        for char in word:
+            child = node[0].get(char)
+            if child is None:
+                child = node[0][char] = [{}, set(), set()]
+            node = child
+            node[1].add(entry_id)
+        node[2].add(entry_id)
+
+    def remove(self, word: str, entry_id: int):
+        path = [self._root]
+        for char in word:
+            child = path[-1][0].get(char)
+            if child is None:
+                break
+            path.append(child)
+        for node in path:
+            node[1].discard(entry_id)
+        if len(path) == len(word) + 1:
+            path[-1][2].discard(entry_id)
+        # Podar ramas vacías
+        for depth in range(len(path) - 1, 0, -1):
+            if path[depth][1] or path[depth][0]:
+                break
+            del path[depth - 1][0][word[depth - 1]]
+
+    def _node(self, prefix: str):
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return None
+        return node
+
+    def ids(self, prefix: str) -> set:
+        """Ids con alguna palabra que empieza con prefix."""
+        node = self._node(prefix)
+        return node[1] if node is not None else set()
+
+    def exact(self, word: str) -> set:
+        """Ids con la palabra completa."""
+        node = self._node(word)
+        return node[2] if node is not None else set()
+
+
+# Entrada compacta: (enrollment, first_name, second_name, sort_key, enrollment_keys, name_words)
+_Entry = Tuple[str, str, Optional[str], Tuple[str, str], Tuple[str, ...], Tuple[str, ...]]
+
+# Con muchos candidatos es más barato recorrer el orden alfabético que ordenarlos
+_SCAN_THRESHOLD = 256
+
+
+class StudentDirectory:
+    _instances: Dict[str, "StudentDirectory"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, conn=None):
+        self._lock = threading.RLock()
+        self._entries: Dict[int, _Entry] = {}
+        self._enrollments = PrefixTrie()
+        self._names = PrefixTrie()
+        self._ordered: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self._ordered_dirty = True
+        if conn is not None:
+            self.load(conn)
+
+    # =========================================
+    # INSTANCIA COMPARTIDA
+    # =========================================
+    @classmethod
+    def shared(cls, conn) -> "StudentDirectory":
+        """Directorio del proceso para la BD de conn; se carga la primera vez."""
+        key = database_key(conn)
+        with cls._instances_lock:
+            directory = cls._instances.get(key)
+            if directory is None:
+                directory = cls._instances[key] = cls(conn)
+        return directory
+
+    @classmethod
+    def _on_student_changed(cls, conn, student_id: int):
+        directory = cls._instances.get(database_key(conn))
+        if directory is not None:
+            directory.refresh(conn, student_id)
+
+    # =========================================
+    # CARGA Y ACTUALIZACIÓN
+    # =========================================
+    def load(self, conn):
+        rows = conn.execute('''
+            SELECT id, enrollment, first_name, second_name
+            FROM customers
+            WHERE active = 1
+        ''').fetchall()
+        with self._lock:
+            self._entries.clear()
+            self._enrollments = PrefixTrie()
+            self._names = PrefixTrie()
+            for row in rows:
+                self._put(row[0], row[1], row[2], row[3])
+            self._ordered_dirty = True
+
+    def refresh(self, conn, student_id: int):
+        """Vuelve a leer un alumno; lo quita si ya no existe o está inactivo."""
+        row = conn.execute('''
+            SELECT id, enrollment, first_name, second_name, active
+            FROM customers WHERE id = ?
+        ''', (student_id,)).fetchone()
+        with self._lock:
+            self._drop(student_id)
+            if row is not None and row[4]:
+                self._put(row[0], row[1], row[2], row[3])
+            self._ordered_dirty = True
+
+    def _put(self, student_id: int, enrollment: str, first_name: str, second_name: Optional[str]):
+        folded = fold_text(enrollment)
+        # Matrícula completa y su parte numérica: 'mat2024001' y '2024001'
+        enrollment_keys = tuple(dict.fromkeys([folded] + re.findall(r"\d+", folded)))
+        name_words = tuple(dict.fromkeys(search_tokens(first_name, second_name)))
+        sort_key = (fold_text(first_name), fold_text(second_name))
+        self._entries[student_id] = (enrollment, first_name, second_name, sort_key, enrollment_keys, name_words)
+        for key in enrollment_keys:
+            self._enrollments.add(key, student_id)
+        for word in name_words:
+            self._names.add(word, student_id)
+
+    def _drop(self, student_id: int):
+        entry = self._entries.pop(student_id, None)
+        if entry is None:
+            return
+        for key in entry[4]:
+            self._enrollments.remove(key, student_id)
+        for word in entry[5]:
+            self._names.remove(word, student_id)
+
+    # =========================================
+    # CONSULTA
+    # =========================================
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, query: str, limit: int = 20) -> List[Student]:
+        """Top-k alumnos cuyas palabras empiezan con cada palabra de query."""
+        words = search_tokens(query)
+        with self._lock:
+            if not words:
+                return [self._materialize(i) for i in self._sorted_ids()[:limit]]
+
+            candidates = None
+            for word in words:
+                matches = self._enrollments.ids(word) | self._names.ids(word)
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    return []
+
+            # Primero matrícula exacta, luego más palabras completas, luego nombre
+            ordered = self._sorted_ids()
+            positions = self._positions
+            by_enrollment = self._enrollments.exact(words[0]) & candidates
+            exact_hits: Dict[int, int] = {}
+            for word in words:
+                for student_id in (self._names.exact(word) | self._enrollments.exact(word)) & candidates:
+                    exact_hits[student_id] = exact_hits.get(student_id, 0) + 1
+
+            best = heapq.nsmallest(limit, exact_hits, key=lambda i: (
+                i not in by_enrollment, -exact_hits[i], positions[i]))
+            missing = limit - len(best)
+            if missing > 0:
+                if len(candidates) > _SCAN_THRESHOLD:
+                    rest = (i for i in ordered if i in candidates and i not in exact_hits)
+                    best += [i for _, i in zip(range(missing), rest)]
+                else:
+                    rest = [i for i in candidates if i not in exact_hits]
+                    best += heapq.nsmallest(missing, rest, key=positions.__getitem__)
+            return [self._materialize(i) for i in best]
+
+    def _sorted_ids(self) -> List[int]:
+        if self._ordered_dirty:
+            self._ordered = sorted(self._entries, key=lambda i: self._entries[i][3])
+            self._positions = {student_id: n for n, student_id in enumerate(self._ordered)}
+            self._ordered_dirty = False
+        return self._ordered
+
+    def _materialize(self, student_id: int) -> Student:
+        # Student ligero: solo lo que el POS muestra y guarda en la venta
+        enrollment, first_name, second_name = self._entries[student_id][:3]
+        return Student(enrollment=enrollment, first_name=first_name,
+                       second_name=second_name, student_id=student_id)
+
+
+StudentRepository.subscribe(StudentDirectory._on_student_changed)
@@ -1,4 +1,8 @@
 # utils.py
+import re
+import unicodedata
+
+
 def char_limit_ticks(event, limit: int):
     entry_widget = event.widget
     texto_actual = entry_widget.get()
@@ -14,3 +18,28 @@ def char_limit_validator(limit: int):
     def _validator(P):
         return len(P) <= limit    
     return _validator
+
+
+
+def fold_text(text) -> str:
+    """
+    Normaliza texto para búsqueda: minúsculas y sin acentos/diéresis/tilde.
+    'García Ñúñez' -> 'garcia nunez'
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def search_tokens(*parts) -> list:
+    """Palabras normalizadas (fold_text) de todas las partes, en orden."""
+    return re.findall(r"\w+", fold_text(" ".join(str(p) for p in parts if p)))
+
+
+def student_search_tokens(enrollment, first_name, second_name) -> list:
+    """Palabras de búsqueda de un alumno (nombre, apellidos y matrícula)."""
+    tokens = search_tokens(first_name, second_name, enrollment)
+    # La parte numérica de la matrícula también se busca sola: '2024001' → MAT2024001
+    tokens += re.findall(r"\d+", enrollment or "")
+    return list(dict.fromkeys(tokens))
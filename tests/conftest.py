@@ -0,0 +1,22 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    """BD nueva (schema.sql + migraciones) en un directorio temporal."""
+    manager = DatabaseManager(tmp_path / "school.db")
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def conn(db):
+    return db.connection()
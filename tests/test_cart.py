@@ -0,0 +1,130 @@
+# tests/test_cart.py
+import random
+
+import pytest
+
+from models.product import Product
+from models.student import Student
+from repositories.sale_repo import SaleRepository
+from services.cart import Cart
+
+
+def product(sku, price, tax_rate=0.16, description=None):
+    return Product(sku=sku, description=description or sku, price=price, tax_rate=tax_rate)
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def cart(events):
+    cart = Cart()
+    cart.subscribe(lambda event, key, line: events.append((event, key, line.qty if line else None)))
+    return cart
+
+
+def test_add_same_sku_and_price_accumulates(cart, events):
+    key = cart.add(product("CAM01", 150.0))
+    assert cart.add(product("CAM01", 150.0)) == key == ("CAM01", 15000)
+    assert len(cart) == 1
+    assert cart.get(key).qty == 2
+    assert events == [("added", key, 1), ("updated", key, 2)]
+    assert (cart.subtotal_cents, cart.tax_cents, cart.total_cents) == (30000, 4800, 34800)
+
+
+def test_same_sku_with_other_price_is_another_line(cart):
+    a = cart.add(product("CAM01", 150.0))
+    b = cart.add({"sku": "CAM01", "description": "Camisa", "price": 120.0, "tax_rate": 0.16})
+    assert a != b
+    assert len(cart) == 2
+    assert cart.subtotal_cents == 27000
+
+
+def test_set_qty_and_remove(cart, events):
+    key = cart.add(product("LIB01", 99.9, 0.0))
+    cart.set_qty(key, 3)
+    assert cart.subtotal_cents == 29970
+    cart.set_qty(key, 0)
+    assert key not in cart
+    assert (cart.subtotal_cents, cart.tax_cents) == (0, 0)
+    assert [e[0] for e in events] == ["added", "updated", "removed"]
+
+    cart.remove(key)            # ya no existe: sin evento
+    assert len(events) == 3
+
+
+def test_set_price_merges_into_existing_line(cart, events):
+    a = cart.add(product("CAM01", 150.0))
+    b = cart.add(product("CAM01", 120.0), qty=2)
+    assert cart.set_price(a, 120.0) == b
+    assert len(cart) == 1
+    assert cart.get(b).qty == 3
+    assert cart.subtotal_cents == 36000
+    assert [e[:2] for e in events[-2:]] == [("removed", a), ("updated", b)]
+
+
+def test_clear(cart, events):
+    cart.add(product("CAM01", 150.0))
+    cart.clear()
+    assert len(cart) == 0
+    assert (cart.subtotal_cents, cart.tax_cents, cart.total_cents) == (0, 0, 0)
+    assert events[-1] == ("cleared", None, None)
+
+
+def test_mixed_tax_rates_round_once_per_cart(cart):
+    # 3 x 0.05 al 16 %: por renglón serían 3 x 0.01 (0.008 redondeado); sobre la base, 0.02
+    for sku in ("A", "B", "C"):
+        cart.add(product(sku, 0.05))
+    cart.add(product("EXENTO", 10.0, 0.0))
+    cart.add(product("IEPS", 33.33, 0.08))
+    assert cart.subtotal_cents == 15 + 1000 + 3333
+    assert cart.tax_cents == round(15 * 0.16 + 3333 * 0.08)  # 2 + 267
+    assert cart.total_cents == cart.subtotal_cents + cart.tax_cents
+
+
+def test_totals_return_to_zero_after_removals(cart):
+    keys = [cart.add(product(f"P{i}", 0.1 * i + 0.07, rate))
+            for i, rate in enumerate([0.16, 0.0, 0.08, 0.16, 0.16])]
+    for key in keys:
+        cart.remove(key)
+    assert (cart.subtotal_cents, cart.tax_cents) == (0, 0)
+    assert cart._tax_basis == {}
+
+
+# =========================================
+# PARIDAD CON SaleRepository.create_sale
+# =========================================
+@pytest.fixture
+def sale_repo(conn):
+    conn.execute("INSERT INTO customers (enrollment, first_name, second_name) VALUES ('MAT001', 'Ana', 'García')")
+    conn.commit()
+    return SaleRepository(conn)
+
+
+def register(conn, cart):
+    conn.executemany("INSERT OR IGNORE INTO products (sku, description, price, tax_rate) VALUES (?, ?, ?, ?)",
+                     [(i["sku"], i["description"], i["price"], i["tax_rate"]) for i in cart.as_items()])
+    conn.commit()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_totals_match_create_sale(conn, sale_repo, seed):
+    rng = random.Random(seed)
+    cart = Cart()
+    for _ in range(rng.randint(1, 12)):
+        sku = f"SKU{rng.randint(1, 8)}"
+        price = rng.choice([0.05, 0.99, 12.5, 33.33, 99.9, 150.0, 1234.56]) + rng.randint(0, 99) / 100
+        cart.add(product(sku, price, rng.choice([0.0, 0.08, 0.16])), qty=rng.randint(1, 5))
+    key = next(iter(cart)).key
+    cart.set_qty(key, rng.randint(1, 9))
+    register(conn, cart)
+
+    student = Student(enrollment="MAT001", first_name="Ana", second_name="García", student_id=1)
+    sale_id, _ = sale_repo.create_sale(student, cart.as_items(), {"id": 0}, payment_method_id=1,
+                                       amount=cart.total)
+    row = conn.execute("SELECT subtotal, tax_total, total, payment_status FROM sales WHERE id = ?",
+                       (sale_id,)).fetchone()
+    assert (row["subtotal"], row["tax_total"], row["total"]) == (cart.subtotal, cart.tax, cart.total)
+    assert row["payment_status"] == "paid"
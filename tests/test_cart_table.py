@@ -0,0 +1,67 @@
+# tests/test_cart_table.py
+import tkinter
+
+import pytest
+
+from services.cart import Cart
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        pytest.skip("sin pantalla para Tk")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+@pytest.fixture
+def table(root):
+    from ui.cart_table import CartTable
+    table = CartTable(root, on_edit=lambda key: None, on_remove=lambda key: None)
+    table.pack()
+    return table
+
+
+def grid_rows(table):
+    """(fila del grid, descripción) de los renglones visibles, de arriba abajo."""
+    rows = [(int(r.description.grid_info()["row"]), r.description.cget("text")) for r in table._rows.values()]
+    return sorted(rows)
+
+
+def item(sku, price=10.0):
+    return {"sku": sku, "description": sku, "price": price, "tax_rate": 0.16}
+
+
+def test_removed_rows_are_compacted_and_reused(table):
+    cart = Cart()
+    cart.subscribe(table.apply)
+    keys = [cart.add(item(sku)) for sku in "ABCD"]
+    created = set(map(id, table._order))
+
+    cart.remove(keys[1])
+    cart.remove(keys[0])
+    assert grid_rows(table) == [(1, "C"), (2, "D")]
+
+    for sku in "EFG":
+        cart.add(item(sku))
+    assert grid_rows(table) == [(1, "C"), (2, "D"), (3, "E"), (4, "F"), (5, "G")]
+    # Los dos quitados se reusaron; solo se creó uno nuevo
+    assert len(created & set(map(id, table._order))) == 4
+    assert len(table._pool) == 0
+
+
+def test_set_price_moves_line_to_end_and_clear_empties(table):
+    cart = Cart()
+    cart.subscribe(table.apply)
+    a = cart.add(item("A"))
+    cart.add(item("B"))
+    cart.set_price(a, 12.0)
+    assert grid_rows(table) == [(1, "B"), (2, "A")]
+    assert table._rows[("A", 1200)].price.cget("text") == "$12.00"
+
+    cart.clear()
+    assert table._order == [] and len(table._pool) == 2
+    assert table._empty.winfo_manager() == "grid"
@@ -0,0 +1,73 @@
+# tests/test_emulator.py
+"""
+Regresión del ticket impreso: la plantilla compilada se escribe con
+EscPosWriter, el emulador la dibuja y se compara contra una imagen dorada.
+
+Si un cambio en el ticket es intencional, regenerar las imágenes con:
+    UPDATE_GOLDEN=1 python -m pytest tests/test_emulator.py
+Los glifos salen de la fuente por defecto de Pillow (generadas con Pillow 12);
+otra versión de Pillow puede requerir regenerarlas.
+"""
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+from printer.emulator import EscPosEmulator
+from printer.layout import PAPER_COLUMNS, EscPosWriter, compile_layout, ticket_context
+from printer.raster import raster_command
+
+GOLDEN = Path(__file__).resolve().parent / "golden"
+
+HEADER = {"folio": "F0042", "student": "Ana García López", "enrollment": "A00123", "date": "15/08/2025 09:30"}
+ITEMS = [
+    {"description": "Colegiatura agosto", "qty": 1, "unit_price": 1850.0, "tax_rate": 0.0},
+    {"description": "Playera deportiva talla 8 con logo bordado", "qty": 2, "unit_price": 185.5, "tax_rate": 0.16},
+    {"description": "Libro de inglés", "qty": 1, "unit_price": 420.0, "tax_rate": 0.0},
+]
+TOTALS = {"subtotal": 2641.0, "tax": 59.36, "total": 2700.36}
+BUSINESS = {"nombre": "LIBERTAD Y CREATIVIDAD", "clave": "09PJN1234X", "rfc": "LCR030414IB8",
+            "direccion": "Av. Siempre Viva 742, Col. Centro", "notas01": "Gracias por su compra",
+            "notas02": "Conserve su ticket"}
+
+
+def logo() -> bytes:
+    # Logo sintético (no depende del archivo ni del remuestreo de Pillow)
+    img = Image.new("1", (100, 40), 1)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 99, 39), outline=0, width=3)
+    draw.ellipse((30, 5, 70, 35), fill=0)
+    return b"\x1b\x61\x01" + raster_command(img)
+
+
+def ticket_bytes(paper_mm: int) -> bytes:
+    ctx = ticket_context(HEADER, ITEMS, TOTALS, "Efectivo", BUSINESS)
+    writer = compile_layout(PAPER_COLUMNS[paper_mm]).render(ctx, EscPosWriter(), logo())
+    return bytes(writer.out)
+
+
+@pytest.mark.parametrize("paper_mm", sorted(PAPER_COLUMNS))
+def test_ticket_matches_golden_image(paper_mm, tmp_path):
+    pages = EscPosEmulator(PAPER_COLUMNS[paper_mm]).render(ticket_bytes(paper_mm))
+    assert len(pages) == 1
+    image = pages[0]
+
+    golden = GOLDEN / f"ticket_{paper_mm}mm.png"
+    if os.environ.get("UPDATE_GOLDEN"):
+        image.save(golden)
+    if not golden.exists():
+        pytest.fail(f"falta {golden}; generarla con UPDATE_GOLDEN=1")
+
+    with Image.open(golden) as expected:
+        expected = expected.convert("1")
+        actual_path = tmp_path / golden.name
+        image.save(actual_path)
+        assert image.size == expected.size, f"tamaño distinto; salida en {actual_path}"
+        diff = ImageChops.difference(image.convert("L"), expected.convert("L")).getbbox()
+        assert diff is None, f"el ticket cambió en {diff}; salida en {actual_path}"
+
+
+def test_cut_splits_pages():
+    data = ticket_bytes(80) * 2
+    assert len(EscPosEmulator(48).render(data)) == 2
@@ -0,0 +1,308 @@
+# tests/test_import_customers.py
+import csv
+import hashlib
+import importlib
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from database import migrations
+from database.database import DatabaseManager
+
+COLUMNS = ["MATRICULA", "NOMBRE", "APELLIDO PATERNO", "APELLIDO MATERNO", "GRADO", "GRUPO", "HORARIO",
+           "SEXO", "NOMBRE MAMÁ", "CELULAR 1"]
+ROWS = [
+    ["A001", "Ana", "García", "López", "1", "A", "Matutino", "M", "Rosa López", "5512345678"],
+    ["A002", "Luis", "Pérez", "Ruiz", "2", "B", "Matutino", "H", "Eva Ruiz", "5598765432"],
+]
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parent.parent / "tools"))
+    sys.modules.pop("import_customers", None)
+    return importlib.import_module("import_customers")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "alumnos.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(ROWS)
+    return path
+
+
+def digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def values(column) -> list:
+    # NA de pandas -> None, como los regresaban las funciones por renglón
+    return [None if pd.isna(v) else v for v in column]
+
+
+# Normalización vectorizada contra lo que daban las reglas por valor
+# (numeric_to_str, build_birth_date, make_address, cel1 or tel or cel2)
+NUMERIC_CASES = [
+    (123.0, "123"), ("123.0", "123"), (123, "123"), (" 0045 ", "45"), ("12.7", "12"),
+    (5512345678.0, "5512345678"), ("A-12", "A-12"), (" ref 7 ", "ref 7"),
+    ("nan", None), ("NaN", None), ("", None), ("  ", None), (None, None), (float("nan"), None),
+]
+
+BIRTH_DATE_CASES = [
+    (5, "enero", 2019, "2019-01-05"),
+    (5.0, " Diciembre ", 2018.0, "2018-12-05"),
+    ("7", "MARZO", "2020", "2020-03-07"),
+    (5, "ENE", 2019, None),
+    (5, "FEBRER", 2019, None),
+    (None, "ENERO", 2019, None),
+    (5, None, 2019, None),
+    (5, "ENERO", None, None),
+    ("x", "ENERO", 2019, None),
+    ("", "ENERO", 2019, None),
+]
+
+ADDRESS_CASES = [
+    (("Av. Juárez 10", "Hidalgo", "Morelos", 45000.0), "Av. Juárez 10, Hidalgo, Morelos, CP 45000"),
+    (("Av. Juárez 10", None, "", None), "Av. Juárez 10"),
+    ((None, None, None, "45000"), "CP 45000"),
+    ((" Centro ", "nan", " ", "nan"), "Centro"),
+    ((None, "nan", " ", None), None),
+]
+
+# (TELÉFONO, CELULAR 1, CELULAR 2) -> (phone_mom, phone_dad)
+PHONE_CASES = [
+    ((111, 222, 333), ("222", "333")),
+    ((111, None, 333), ("111", "333")),
+    ((None, None, 333), ("333", "333")),
+    ((111, 222, None), ("222", "111")),
+    ((None, 222.0, ""), ("222", "222")),
+    ((None, "nan", ""), (None, None)),
+]
+
+
+def test_numeric_to_str(importer):
+    raw, expected = zip(*NUMERIC_CASES)
+    assert values(importer.numeric_to_str(pd.Series(raw, dtype="object"))) == list(expected)
+
+
+def test_build_birth_date(importer):
+    dia, mes, anio, expected = (pd.Series(c, dtype="object") for c in zip(*BIRTH_DATE_CASES))
+    assert values(importer.build_birth_date(dia, mes, anio)) == list(expected)
+
+
+def test_make_address(importer):
+    rows, expected = zip(*ADDRESS_CASES)
+    df = pd.DataFrame(list(rows), columns=["DOMICILIO", "E CALLE 1", "E CALLE 2", "CÓDIGO PTAL"], dtype="object")
+    assert importer.make_address(df) == list(expected)
+
+
+def test_make_address_without_columns(importer):
+    assert importer.make_address(pd.DataFrame(index=range(2))) == [None, None]
+
+
+def test_normalize_frame_phone_fallbacks(importer):
+    rows, expected = zip(*PHONE_CASES)
+    df = pd.DataFrame(list(rows), columns=["TELÉFONO", "CELULAR 1", "CELULAR 2"], dtype="object")
+    students = importer.normalize_frame(df)
+    assert list(zip(values(students["phone_mom"]), values(students["phone_dad"]))) == list(expected)
+
+
+def test_dry_run_does_not_write(importer, db, source):
+    db.close()
+    before = digest(db.db_path)
+    importer.import_data(source, str(db.db_path), dry_run=True)
+    assert digest(db.db_path) == before
+
+
+def test_dry_run_refuses_to_migrate_old_database(importer, db, source):
+    conn = db.connection()
+    conn.execute("PRAGMA user_version = 6")
+    conn.commit()
+    db.close()
+    before = digest(db.db_path)
+
+    with pytest.raises(SystemExit, match="versión 6"):
+        importer.import_data(source, str(db.db_path), dry_run=True)
+    assert digest(db.db_path) == before
+    with sqlite3.connect(db.db_path) as conn:
+        assert migrations.get_version(conn) == 6
+
+
+def test_import_then_dry_run_reports_unchanged(importer, db, source, capsys):
+    db.close()
+    importer.import_data(source, str(db.db_path))
+    with sqlite3.connect(db.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 2
+
+    importer.import_data(source, str(db.db_path), dry_run=True)
+    out = capsys.readouterr().out
+    assert "Simulación" in out
+    assert "Alumnos nuevos: 0  actualizados: 0  sin cambios: 2" in out
+
+
+# =======================================================
+# IMPORTACIÓN POR BLOQUES: REANUDAR Y REPETIDOS
+# =======================================================
+
+FIVE = [
+    ["A001", "Ana", "García", "López", "1", "A", "Matutino", "M", "Rosa López", "5512345678"],
+    ["A002", "Luis", "Pérez", "Ruiz", "2", "B", "Matutino", "H", "Eva Ruiz", "5598765432"],
+    ["A003", "Sofía", "Díaz", "Mora", "1", "B", "Vespertino", "M", "Lucía Mora", "5511112222"],
+    ["A004", "Iván", "Soto", "Gil", "3", "A", "Vespertino", "H", "", ""],
+    ["A005", "Mía", "Cruz", "Luna", "2", "C", "Matutino", "M", "Ada Luna", "5533334444"],
+]
+
+
+def write_rows(path: Path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    return path
+
+
+def tables(db_path) -> dict:
+    """Contenido comparable de las tablas que escribe la importación (sin fechas)."""
+    queries = {
+        "customers": "SELECT id, enrollment, first_name, second_name, address, grade_id, group_id, shift_id, "
+                     "gender, pay_reference, import_hash, search_key FROM customers ORDER BY id",
+        "tutors": "SELECT tutor_id, student_id, first_name, relationship, phone, is_primary, active "
+                  "FROM tutors ORDER BY tutor_id",
+        "tokens": "SELECT token, customer_id FROM customer_search_tokens ORDER BY token, customer_id",
+        "grades": "SELECT id, code, name FROM grades ORDER BY id",
+        "groups": "SELECT id, code, name FROM groups ORDER BY id",
+        "shifts": "SELECT id, code, name FROM shifts ORDER BY id",
+        "checkpoints": "SELECT source, rows_done FROM import_checkpoints",
+    }
+    with sqlite3.connect(db_path) as conn:
+        return {name: conn.execute(sql).fetchall() for name, sql in queries.items()}
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    def make(name):
+        manager = DatabaseManager(tmp_path / name)
+        manager.close()
+        return str(tmp_path / name)
+    return make
+
+
+@pytest.fixture
+def failing_apply(importer, monkeypatch):
+    """apply_plan que falla en el bloque n (1 = el primero)."""
+    def fail_on(n):
+        original = importer.apply_plan
+        calls = []
+
+        def apply_plan(conn, plan, timer):
+            calls.append(len(plan.new))
+            if len(calls) == n:
+                raise RuntimeError("falla a la mitad")
+            return original(conn, plan, timer)
+        monkeypatch.setattr(importer, "apply_plan", apply_plan)
+        return lambda: monkeypatch.setattr(importer, "apply_plan", original)
+    return fail_on
+
+
+def test_resume_after_failure_matches_single_run(importer, fresh_db, failing_apply, tmp_path, capsys):
+    path = write_rows(tmp_path / "alumnos.csv", FIVE)
+    single, resumed = fresh_db("single.db"), fresh_db("resumed.db")
+    importer.import_data(path, single, chunk_size=2)
+
+    restore = failing_apply(2)
+    with pytest.raises(RuntimeError, match="falla a la mitad"):
+        importer.import_data(path, resumed, chunk_size=2)
+    # El primer bloque quedó confirmado junto con su punto de control
+    partial = tables(resumed)
+    assert [c[1] for c in partial["customers"]] == ["A001", "A002"]
+    assert partial["checkpoints"] == [(str(path.resolve()), 2)]
+
+    restore()
+    capsys.readouterr()
+    importer.import_data(path, resumed, chunk_size=2)
+    out = capsys.readouterr().out
+    assert "Reanudando después del renglón 2" in out
+    assert "Renglones leídos: 3 " in out
+    assert "en la BD pero no en el archivo: 0" in out
+    assert tables(resumed) == tables(single)
+
+
+def test_checkpoint_deleted_when_import_finishes(importer, fresh_db, tmp_path):
+    path = write_rows(tmp_path / "alumnos.csv", FIVE)
+    db_path = fresh_db("school.db")
+    importer.import_data(path, db_path, chunk_size=2)
+    assert tables(db_path)["checkpoints"] == []
+    assert len(tables(db_path)["customers"]) == 5
+
+
+def test_changed_file_starts_from_first_row(importer, fresh_db, failing_apply, tmp_path, capsys):
+    path = write_rows(tmp_path / "alumnos.csv", FIVE)
+    db_path = fresh_db("school.db")
+    restore = failing_apply(2)
+    with pytest.raises(RuntimeError):
+        importer.import_data(path, db_path, chunk_size=2)
+    restore()
+
+    # Otro archivo en la misma ruta: la huella (tamaño:fecha) ya no coincide
+    write_rows(path, FIVE + [["A006", "Leo", "Ortiz", "Paz", "1", "A", "Matutino", "H", "", ""]])
+    capsys.readouterr()
+    importer.import_data(path, db_path, chunk_size=2)
+    out = capsys.readouterr().out
+    assert "El archivo cambió" in out
+    assert "Reanudando" not in out
+    assert "Renglones leídos: 6 " in out
+    assert "Alumnos nuevos: 4  actualizados: 0  sin cambios: 2" in out
+    assert tables(db_path)["checkpoints"] == []
+
+
+def test_restart_ignores_checkpoint(importer, fresh_db, failing_apply, tmp_path, capsys):
+    path = write_rows(tmp_path / "alumnos.csv", FIVE)
+    db_path = fresh_db("school.db")
+    restore = failing_apply(3)
+    with pytest.raises(RuntimeError):
+        importer.import_data(path, db_path, chunk_size=2)
+    restore()
+    assert tables(db_path)["checkpoints"][0][1] == 4
+
+    capsys.readouterr()
+    importer.import_data(path, db_path, chunk_size=2, restart=True)
+    out = capsys.readouterr().out
+    assert "Reanudando" not in out
+    assert "Renglones leídos: 5 " in out
+    assert "Alumnos nuevos: 1  actualizados: 0  sin cambios: 4" in out
+    assert tables(db_path)["checkpoints"] == []
+
+
+def test_duplicate_enrollment_across_chunks_last_row_wins(importer, fresh_db, tmp_path, capsys):
+    rows = [FIVE[0], FIVE[1], ["A001", "Ana María", "García", "López", "2", "A", "Matutino", "M", "", "5500000000"]]
+    path = write_rows(tmp_path / "alumnos.csv", rows)
+    db_path = fresh_db("school.db")
+
+    importer.import_data(path, db_path, dry_run=True, chunk_size=1)
+    out = capsys.readouterr().out
+    assert "repetidos: 1" in out
+    assert "Alumnos nuevos: 2  actualizados: 0  sin cambios: 0" in out
+
+    importer.import_data(path, db_path, chunk_size=1)
+    out = capsys.readouterr().out
+    assert "repetidos: 1" in out
+    assert "Alumnos nuevos: 2  actualizados: 0  sin cambios: 0" in out
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT c.first_name, g.code FROM customers c JOIN grades g ON g.id = c.grade_id "
+                            "WHERE enrollment = 'A001'").fetchone() == ("Ana María", "2")
+        # La copia ganadora no trae mamá: la primera no dejó tutores
+        assert conn.execute("SELECT COUNT(*) FROM tutors t JOIN customers c ON c.id = t.student_id "
+                            "WHERE c.enrollment = 'A001'").fetchone()[0] == 0
+    before = tables(db_path)
+
+    importer.import_data(path, db_path, chunk_size=1)
+    out = capsys.readouterr().out
+    assert "Alumnos nuevos: 0  actualizados: 0  sin cambios: 2" in out
+    assert tables(db_path) == before
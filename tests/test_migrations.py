@@ -0,0 +1,26 @@
+# tests/test_migrations.py
+from database import migrations
+
+
+def objects(conn, types=("trigger", "index")):
+    rows = conn.execute("SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL").fetchall()
+    return {(t, name): " ".join(sql.split()) for t, name, sql in rows if t in types}
+
+
+def test_replayed_migrations_match_schema_sql(conn):
+    # BD nueva (schema.sql) contra la misma BD con las migraciones 3..N aplicadas otra vez
+    fresh = objects(conn)
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    assert migrations.migrate(conn) == migrations.SCHEMA_VERSION
+    assert objects(conn) == fresh
+
+
+def test_migrations_do_not_read_schema_sql(conn, monkeypatch):
+    def no_open(*args, **kwargs):
+        raise AssertionError("una migración leyó un archivo")
+
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    monkeypatch.setattr("builtins.open", no_open)
+    assert migrations.migrate(conn) == migrations.SCHEMA_VERSION
@@ -0,0 +1,60 @@
+# tests/test_product_repo.py
+import subprocess
+import sys
+from pathlib import Path
+
+from models.product import Product
+from repositories.product_repo import ProductRepository
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def product(sku, description, **kw):
+    return Product(sku=sku, description=description, price=100.0, kind="PRODUCTO", **kw)
+
+
+def test_repository_does_not_import_services():
+    code = "import sys, repositories.product_repo; print('services' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_catalog_write_through(conn):
+    repo = ProductRepository(conn)
+    repo.create(product("CAM01", "Camisa azul"))
+    assert [p.sku for p in repo.find("cam azu")] == ["CAM01"]
+
+    repo.create(product("LIB01", "Libro azul"))
+    repo.update(product("CAM01", "Camisa roja"))
+    assert [p.sku for p in repo.find("azul")] == ["LIB01"]
+    assert repo.get("CAM01").description == "Camisa roja"
+
+
+def test_get_by_code_is_case_insensitive_without_disk(conn):
+    repo = ProductRepository(conn)
+    repo.create(product("CAM01", "Camisa azul"))
+    repo.create(product("lib01", "Libro"))
+    repo.find("x")     # carga la caché
+
+    queries = []
+    conn.set_trace_callback(queries.append)
+    assert repo.get_by_code("cam01").sku == "CAM01"
+    assert repo.get_by_code(" LIB01 ").sku == "lib01"
+    assert repo.get_by_code("CAM01").sku == "CAM01"
+    conn.set_trace_callback(None)
+    assert queries == []
+
+
+def test_get_by_code_miss_runs_one_query(conn):
+    repo = ProductRepository(conn)
+    repo.find("x")
+    # Alta por fuera del repositorio (otro proceso): la caché no la conoce
+    conn.execute("INSERT INTO products (sku, description, price) VALUES ('GOR01', 'Gorra', 80)")
+    conn.commit()
+
+    queries = []
+    conn.set_trace_callback(queries.append)
+    assert repo.get_by_code("gor01").sku == "GOR01"
+    assert repo.get_by_code("NOEXISTE") is None
+    conn.set_trace_callback(None)
+    assert len(queries) == 2
@@ -0,0 +1,69 @@
+# tests/test_products_fts.py
+import pytest
+
+from database import migrations
+
+
+@pytest.fixture
+def fts(conn):
+    if not migrations.fts5_available(conn):
+        pytest.skip("SQLite sin FTS5")
+    conn.executemany("INSERT INTO products (sku, description, price) VALUES (?, ?, 1)",
+                     [("CAM01", "Camisa azul"), ("LIB01", "Libro rojo"), ("LIB02", "Libro azul")])
+    conn.commit()
+    return conn
+
+
+def match(conn, query):
+    return sorted(r[0] for r in conn.execute("SELECT sku FROM products_fts WHERE products_fts MATCH ?", (query,)))
+
+
+def index_matches_products(conn):
+    rows = conn.execute("""
+        SELECT f.sku, f.description FROM products_fts f
+        JOIN products_fts_docs d ON d.docid = f.rowid AND d.sku = f.sku
+    """).fetchall()
+    products = conn.execute("SELECT sku, description FROM products").fetchall()
+    return sorted(map(tuple, rows)) == sorted(map(tuple, products))
+
+
+def test_insert_indexes_with_docid(fts):
+    assert match(fts, '"azul"*') == ["CAM01", "LIB02"]
+    assert index_matches_products(fts)
+
+
+def test_update_description_and_sku(fts):
+    fts.execute("UPDATE products SET description = 'Libro verde' WHERE sku = 'LIB02'")
+    fts.execute("UPDATE products SET sku = 'CAM02' WHERE sku = 'CAM01'")
+    fts.commit()
+    assert match(fts, '"azul"*') == ["CAM02"]
+    assert match(fts, '"verde"*') == ["LIB02"]
+    assert index_matches_products(fts)
+
+
+def test_delete_removes_from_index(fts):
+    fts.execute("DELETE FROM products WHERE sku = 'LIB01'")
+    fts.commit()
+    assert match(fts, '"libro"*') == ["LIB02"]
+    assert fts.execute("SELECT count(*) FROM products_fts_docs").fetchone()[0] == 2
+    assert index_matches_products(fts)
+
+
+def test_migration_rebuilds_index_from_sku_triggers(fts):
+    # BD en versión 8: triggers anteriores que borraban por sku
+    for trigger in ("trg_products_fts_ai", "trg_products_fts_au", "trg_products_fts_ad"):
+        fts.execute(f"DROP TRIGGER {trigger}")
+    fts.execute("DROP TABLE products_fts_docs")
+    fts.execute("""
+        CREATE TRIGGER trg_products_fts_ad AFTER DELETE ON products
+        BEGIN
+          DELETE FROM products_fts WHERE sku = OLD.sku;
+        END
+    """)
+    fts.execute("PRAGMA user_version = 8")
+    fts.commit()
+
+    assert migrations.migrate(fts) == migrations.SCHEMA_VERSION
+    assert index_matches_products(fts)
+    fts.execute("DELETE FROM products WHERE sku = 'CAM01'")
+    assert match(fts, '"azul"*') == ["LIB02"]
@@ -0,0 +1,64 @@
+# tests/test_raster.py
+import random
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from printer.raster import pack_raster, raster_command
+
+LOGO = Path(__file__).resolve().parent.parent / "assets" / "images" / "logo.png"
+
+
+def reference_pack(img: Image.Image):
+    # Empaquetado anterior de TicketPrinter: getpixel por pixel, 0 = negro
+    width, height = img.size
+    width_bytes = (width + 7) // 8
+    data = bytearray()
+    for y in range(height):
+        for x in range(0, width, 8):
+            byte = 0
+            for bit in range(8):
+                if x + bit < width and img.getpixel((x + bit, y)) == 0:
+                    byte |= 1 << (7 - bit)
+            data.append(byte)
+    return width_bytes, height, bytes(data)
+
+
+def random_image(mode: str, width: int, height: int, seed: int) -> Image.Image:
+    rng = random.Random(seed)
+    if mode == "1":
+        pixels = [rng.choice((0, 255)) for _ in range(width * height)]
+    else:
+        # Grises con muchos ceros: solo el 0 cuenta como negro
+        pixels = [rng.choice((0, 0, 1, 127, 254, 255)) for _ in range(width * height)]
+    img = Image.new("L", (width, height))
+    img.putdata(pixels)
+    return img.convert("1", dither=Image.Dither.NONE) if mode == "1" else img
+
+
+@pytest.mark.parametrize("mode", ["1", "L"])
+@pytest.mark.parametrize("width", [1, 7, 8, 9, 13, 16, 31, 255, 256])
+def test_pack_raster_matches_per_pixel_reference(mode, width):
+    img = random_image(mode, width, 5, seed=width)
+    assert pack_raster(img) == reference_pack(img)
+
+
+@pytest.mark.parametrize("width", [1, 7, 9, 13, 255])
+def test_padding_bits_are_zero(width):
+    # Todo negro: los bits de relleno del último byte deben quedar en 0 (blanco)
+    img = Image.new("1", (width, 3), 0)
+    width_bytes, height, data = pack_raster(img)
+    last = (0xFF << (8 - width % 8)) & 0xFF
+    for row in range(height):
+        assert data[row * width_bytes + width_bytes - 1] == last
+
+
+def test_logo_command_matches_reference():
+    with Image.open(LOGO) as img:
+        img = img.convert("1")
+        img = img.resize((250, int(img.height * 250 / img.width)))
+    width_bytes, height, data = reference_pack(img)
+    expected = (b"\x1d\x76\x30\x00" + width_bytes.to_bytes(2, "little")
+                + height.to_bytes(2, "little") + data)
+    assert raster_command(img) == expected
@@ -0,0 +1,59 @@
+# tests/test_sale_repo.py
+import pytest
+
+from models.product import Product
+from models.student import Student
+from repositories.product_repo import ProductRepository
+from repositories.sale_repo import SaleRepository
+
+SELLER = {"id": 0, "first_name": "SUPER", "second_name": "USER"}
+CART = [
+    {"sku": "A1", "description": "Playera", "price": 150.0, "tax_rate": 0.16, "qty": 2},
+    {"sku": "B2", "description": "Libro", "price": 99.9, "tax_rate": 0.0, "qty": 1},
+]
+
+
+def student(conn):
+    conn.executemany("INSERT INTO products (sku, description, price, tax_rate) VALUES (?, ?, ?, ?)",
+                     [(i["sku"], i["description"], i["price"], i["tax_rate"]) for i in CART])
+    conn.execute("INSERT INTO customers (enrollment, first_name, second_name) VALUES ('MAT001', 'Ana', 'García')")
+    conn.commit()
+    return Student(enrollment="MAT001", first_name="Ana", second_name="García", student_id=1)
+
+
+def test_create_sale_returns_stored_folio(conn):
+    repo = SaleRepository(conn)
+    sale_id, folio = repo.create_sale(student(conn), CART, SELLER, payment_method_id=1, amount=447.9)
+
+    row = conn.execute("SELECT folio, subtotal, tax_total, total, payment_status FROM sales WHERE id = ?",
+                       (sale_id,)).fetchone()
+    assert folio == row["folio"] == f"F{sale_id:04d}"
+    assert (row["subtotal"], row["tax_total"], row["total"]) == (399.9, 48.0, 447.9)
+    assert row["payment_status"] == "paid"
+
+
+def test_create_sale_refuses_pending_transaction(conn):
+    repo = SaleRepository(conn)
+    ana = student(conn)
+    # DML previo sin commit en la conexión compartida: no es de la venta
+    conn.execute("UPDATE customers SET address = 'Centro' WHERE id = 1")
+    assert conn.in_transaction
+
+    with pytest.raises(RuntimeError):
+        repo.create_sale(ana, CART, SELLER, payment_method_id=1, amount=447.9)
+    # Ni se confirmó ni se descartó: sigue pendiente para su dueño
+    assert conn.in_transaction
+    assert conn.execute("SELECT address FROM customers WHERE id = 1").fetchone()[0] == "Centro"
+    assert conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0] == 0
+    conn.rollback()
+
+
+def test_failed_repository_write_leaves_no_transaction(conn):
+    products = ProductRepository(conn)
+    ana = student(conn)
+    with pytest.raises(ValueError):
+        products.create(Product(sku="A1", description="Repetido", price=1.0))
+    assert not conn.in_transaction
+
+    sale_id, folio = SaleRepository(conn).create_sale(ana, CART, SELLER, payment_method_id=1, amount=447.9)
+    assert conn.execute("SELECT folio FROM sales WHERE id = ?", (sale_id,)).fetchone()[0] == folio
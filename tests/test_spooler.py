@@ -0,0 +1,132 @@
+# tests/test_spooler.py
+import json
+import queue
+
+import pytest
+
+from printer.spooler import DONE, FAILED, PRINTING, QUEUED, RETRYING, PrintSpooler
+
+
+class FlakyPrinter:
+    """Falla las primeras `failures` impresiones y luego imprime."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.printed = []
+
+    def __call__(self):
+        return self  # printer_factory
+
+    def print_ticket(self, **ticket):
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("impresora apagada")
+        self.printed.append(ticket["folio"])
+        return {"bytes": 10}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return tmp_path / "print_journal.jsonl"
+
+
+@pytest.fixture
+def make_spooler(journal):
+    spoolers = []
+
+    def make(printer, max_attempts=4):
+        spooler = PrintSpooler(printer_factory=printer, journal_path=journal,
+                               max_attempts=max_attempts, backoff_s=(0,))
+        spoolers.append(spooler)
+        return spooler
+    yield make
+    for spooler in spoolers:
+        spooler.close()
+
+
+def statuses(spooler, job_id, timeout=5.0):
+    """Estados reportados de un trabajo hasta que termina."""
+    seen = []
+    while not seen or seen[-1] not in (DONE, FAILED):
+        job = spooler._events.get(timeout=timeout)
+        if job.job_id == job_id:
+            seen.append(job.status)
+    return seen
+
+
+def records(journal):
+    return [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+
+
+def queued(job_id, folio):
+    return {"event": QUEUED, "job": job_id, "folio": folio, "ticket": {"folio": folio},
+            "created_at": 1.0, "ts": 1.0}
+
+
+@pytest.mark.parametrize("failures", [0, 1, 3])
+def test_retries_until_done(make_spooler, journal, failures):
+    printer = FlakyPrinter(failures)
+    spooler = make_spooler(printer)
+    job = spooler.submit("F0001", {"folio": "F0001"})
+
+    assert statuses(spooler, job.job_id) == [PRINTING, RETRYING] * failures + [PRINTING, DONE]
+    assert printer.printed == ["F0001"]
+    assert [r["event"] for r in records(journal)] == [QUEUED] + [RETRYING] * failures + [DONE]
+    assert spooler.pending() == []
+
+
+def test_fails_after_max_attempts(make_spooler, journal):
+    printer = FlakyPrinter(10)
+    spooler = make_spooler(printer, max_attempts=3)
+    job = spooler.submit("F0001", {"folio": "F0001"})
+
+    assert statuses(spooler, job.job_id) == [PRINTING, RETRYING, PRINTING, RETRYING, PRINTING, FAILED]
+    assert printer.printed == []
+    last = records(journal)[-1]
+    assert (last["event"], last["attempts"]) == (FAILED, 3)
+    assert "impresora apagada" in last["error"]
+    assert spooler.pending() == []
+
+
+def test_recover_requeues_crashed_jobs_and_compacts(make_spooler, journal):
+    # Sesión anterior: uno impreso, uno fallido, uno a medio reintentar y
+    # uno encolado sin más (la app se cayó); más un renglón truncado
+    lines = [
+        queued("a", "F0001"), {"event": DONE, "job": "a", "attempts": 1, "ts": 2.0},
+        queued("b", "F0002"), {"event": FAILED, "job": "b", "attempts": 4, "error": "x", "ts": 2.0},
+        queued("c", "F0003"), {"event": RETRYING, "job": "c", "attempts": 2, "error": "x", "ts": 2.0},
+        queued("d", "F0004"),
+    ]
+    journal.write_text("".join(json.dumps(r) + "\n" for r in lines) + '{"event": "do', encoding="utf-8")
+
+    spooler = make_spooler(FlakyPrinter(0))
+    pending = spooler._recover()
+
+    assert [(j.job_id, j.folio, j.status, j.attempts) for j in pending] == [
+        ("c", "F0003", QUEUED, 0), ("d", "F0004", QUEUED, 0)]
+    compacted = records(journal)
+    assert [(r["event"], r["job"], r["ticket"]) for r in compacted] == [
+        (QUEUED, "c", {"folio": "F0003"}), (QUEUED, "d", {"folio": "F0004"})]
+    assert not journal.with_name(journal.name + ".tmp").exists()
+
+
+def test_start_prints_only_unfinished_jobs(make_spooler, journal):
+    lines = [
+        queued("a", "F0001"), {"event": DONE, "job": "a", "attempts": 1, "ts": 2.0},
+        queued("b", "F0002"), {"event": FAILED, "job": "b", "attempts": 4, "error": "x", "ts": 2.0},
+        queued("c", "F0003"),
+    ]
+    journal.write_text("".join(json.dumps(r) + "\n" for r in lines), encoding="utf-8")
+
+    printer = FlakyPrinter(0)
+    spooler = make_spooler(printer)
+    spooler.start()
+    assert statuses(spooler, "c") == [PRINTING, DONE]
+
+    # Un trabajo nuevo confirma que la cola quedó vacía: nada más se reimprime
+    job = spooler.submit("F0005", {"folio": "F0005"})
+    assert statuses(spooler, job.job_id) == [PRINTING, DONE]
+    assert printer.printed == ["F0003", "F0005"]
+    with pytest.raises(queue.Empty):
+        spooler._events.get_nowait()
+    assert spooler.pending() == []
@@ -0,0 +1,112 @@
+# tests/test_transports.py
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from printer import transports
+from printer.transports import FileTransport, MemoryTransport, TcpTransport
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+from fake_printer import FakePrinterServer
+
+CUT = b"\x1dV\x00"
+
+
+def ticket(n: int) -> bytes:
+    return b"\x1b@ticket%d\n" % n + CUT
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def make(**kwargs):
+        out = io.BytesIO()
+        kwargs.setdefault("port", 0)
+        server = FakePrinterServer(out=out, **kwargs)
+        servers.append(server)
+        return server, out
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def test_memory_transport_keeps_jobs():
+    transport = MemoryTransport("memory:test")
+    transport.send(ticket(1))
+    transport.send(bytearray(ticket(2)))
+    assert transport.jobs == [ticket(1), ticket(2)]
+    assert transport.data == ticket(1) + ticket(2)
+
+
+def test_file_transport_appends(tmp_path):
+    path = tmp_path / "tickets.bin"
+    transport = FileTransport(str(path))
+    transport.send(ticket(1))
+    transport.send(ticket(2))
+    assert path.read_bytes() == ticket(1) + ticket(2)
+    assert transport.name == f"file:{path}"
+
+
+def test_open_transport_reuses_instances():
+    try:
+        first = transports.open_transport("memory:shared")
+        assert transports.open_transport("memory:shared") is first
+        tcp = transports.open_transport("tcp://10.0.0.5")
+        assert (tcp.host, tcp.port) == ("10.0.0.5", 9100)
+    finally:
+        transports.close_all()
+    with pytest.raises(ValueError):
+        transports.open_transport("lpt:1")
+
+
+def test_tcp_keeps_connection_between_jobs(server_factory):
+    server, out = server_factory()
+    transport = TcpTransport("127.0.0.1", server.port)
+    for n in range(1, 4):
+        transport.send(ticket(n))
+    assert server.wait_for_cuts(3, timeout=5)
+    transport.close()
+    assert server.connections == 1
+    assert out.getvalue() == ticket(1) + ticket(2) + ticket(3)
+
+
+def test_tcp_reconnects_when_printer_closes_after_each_job(server_factory):
+    server, out = server_factory(close_after_job=True)
+    transport = TcpTransport("127.0.0.1", server.port)
+    for n in range(1, 4):
+        transport.send(ticket(n))
+        assert server.wait_for_cuts(n, timeout=5)
+        # La impresora ya cerró su lado: el siguiente envío no debe perderse
+        assert server.wait_for_closed(n, timeout=5)
+    transport.close()
+    assert out.getvalue() == ticket(1) + ticket(2) + ticket(3)
+    assert server.connections == 3
+
+
+def test_tcp_reconnects_after_printer_restart(server_factory):
+    server, _ = server_factory()
+    transport = TcpTransport("127.0.0.1", server.port)
+    transport.send(ticket(1))
+    assert server.wait_for_cuts(1, timeout=5)
+
+    # Reinicio: se cierran el puerto y la conexión abierta; vuelve en el mismo puerto
+    server.close()
+    assert server.wait_for_closed(1, timeout=5)
+    restarted, out = server_factory(port=server.port)
+    transport.send(ticket(2))
+    assert restarted.wait_for_cuts(1, timeout=5)
+    transport.close()
+    assert out.getvalue() == ticket(2)
+
+
+def test_tcp_raises_when_printer_is_unreachable(server_factory):
+    server, _ = server_factory()
+    port = server.port
+    server.close()
+    transport = TcpTransport("127.0.0.1", port, timeout=1.0)
+    with pytest.raises(OSError):
+        transport.send(ticket(1))
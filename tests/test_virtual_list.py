@@ -0,0 +1,43 @@
+# tests/test_virtual_list.py
+import tkinter
+
+import pytest
+
+SEQUENCES = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        pytest.skip("sin pantalla para Tk")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def wheel_script(root, sequence):
+    return root.tk.call("bind", "all", sequence)
+
+
+def grid(root):
+    from ui.virtual_list import VirtualGrid
+    return VirtualGrid(root, card_factory=lambda parent: None, row_height=40)
+
+
+def test_destroy_removes_only_its_wheel_bindings(root):
+    other = root.bind_all("<MouseWheel>", lambda e: None, add="+")
+    before = {s: wheel_script(root, s) for s in SEQUENCES}
+
+    kept = grid(root)
+    for _ in range(3):
+        grid(root).destroy()
+
+    # Mientras vive, la cuadrícula restante conserva su enlace
+    for sequence, funcid in kept._wheel_bindings:
+        assert funcid in wheel_script(root, sequence)
+
+    kept.destroy()
+    assert {s: wheel_script(root, s) for s in SEQUENCES} == before
+    assert other in wheel_script(root, "<MouseWheel>")
@@ -0,0 +1,78 @@
+"""
+Benchmark: carrito del POS (lista + recálculo) vs. services.cart.Cart.
+
+El camino "legacy" reproduce POSFrame antes del Cart: búsqueda lineal del
+renglón y subtotal/IVA recalculados sobre todo el carrito en cada cambio.
+También verifica que el total de Cart coincida con el que guarda
+SaleRepository.create_sale. No necesita pantalla.
+
+Uso:
+    python tools/bench_cart.py [--lines 50] [--scans 5000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.cart import Cart
+
+
+def catalog(lines: int) -> list:
+    return [
+        {"sku": f"SKU{i:04d}", "description": f"Producto {i}",
+         "price": round(12.5 + i * 3.33, 2), "tax_rate": 0.16 if i % 3 else 0.0}
+        for i in range(lines)
+    ]
+
+
+def legacy_add(cart: list, product: dict):
+    for item in cart:
+        if item["sku"] == product["sku"] and item["price"] == product["price"]:
+            item["qty"] += 1
+            break
+    else:
+        cart.append({**product, "qty": 1})
+    subtotal = sum(i["price"] * i["qty"] for i in cart)
+    tax = sum(i["price"] * i["qty"] * i["tax_rate"] for i in cart)
+    return subtotal, tax, subtotal + tax
+
+
+def sale_total(items: list) -> float:
+    # Mismo cálculo que SaleRepository.create_sale
+    subtotal = round(sum(i["price"] * i["qty"] for i in items), 2)
+    tax = round(sum(i["price"] * i["qty"] * i["tax_rate"] for i in items), 2)
+    return round(subtotal + tax, 2)
+
+
+def run(lines: int, scans: int):
+    products = catalog(lines)
+    sequence = [random.choice(products) for _ in range(scans)]
+
+    legacy_cart = []
+    start = time.perf_counter()
+    for product in sequence:
+        legacy_add(legacy_cart, product)
+    legacy = time.perf_counter() - start
+
+    cart = Cart()
+    start = time.perf_counter()
+    for product in sequence:
+        cart.add(product)
+        cart.total_cents
+    engine = time.perf_counter() - start
+
+    print(f"Renglones distintos: {lines}  escaneos: {scans}")
+    print(f"  legacy : {legacy / scans * 1e6:8.2f} µs/escaneo")
+    print(f"  Cart   : {engine / scans * 1e6:8.2f} µs/escaneo")
+    print(f"  total Cart {cart.total:.2f} / create_sale {sale_total(cart.as_items()):.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=50)
+    parser.add_argument("--scans", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.lines, args.scans)
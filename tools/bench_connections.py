@@ -0,0 +1,91 @@
+"""
+Benchmark: conexión por navegación vs. conexión administrada.
+
+Simula a la recepción navegando entre pantallas (POS, Alumnos, Productos,
+Catálogos). El camino "legacy" abre una conexión nueva con el journal por
+defecto en cada navegación, como hacía main.py; el camino "managed" reutiliza
+la conexión de DatabaseManager.connection() con WAL y caché caliente.
+
+Uso:
+    python tools/bench_connections.py [--navigations 200] [--students 800]
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.database import DatabaseManager
+from repositories.student_repo import StudentRepository
+from repositories.product_repo import ProductRepository
+from repositories.educational_repo import EducationalRepository
+
+
+def seed(db: DatabaseManager, students: int, products: int):
+    conn = db.connection()
+    conn.executemany(
+        "INSERT INTO customers (enrollment, first_name, second_name) VALUES (?, ?, ?)",
+        [(f"MAT{i:05d}", f"Nombre{i}", f"Apellido{i % 97}") for i in range(students)],
+    )
+    conn.executemany(
+        "INSERT INTO products (sku, description, price) VALUES (?, ?, ?)",
+        [(f"SKU{i:04d}", f"Producto {i}", 10.0 + i) for i in range(products)],
+    )
+    conn.commit()
+
+
+def open_screen(conn):
+    """Consultas que dispara cada pantalla al abrirse."""
+    StudentRepository(conn).get_all()
+    ProductRepository(conn).list_all()
+    repo = EducationalRepository(conn)
+    repo.get_all_grades()
+    repo.get_all_groups()
+    repo.get_all_shifts()
+
+
+def legacy_connect(db_path):
+    # Camino anterior: sqlite3.connect + row_factory, sin pragmas
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def run(navigations: int, students: int, products: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / "bench.db")
+        seed(db, students, products)
+
+        opened = []
+        start = time.perf_counter()
+        for _ in range(navigations):
+            conn = legacy_connect(db.db_path)
+            open_screen(conn)
+            opened.append(conn)  # main.py nunca cerraba estas conexiones
+        legacy = time.perf_counter() - start
+        for conn in opened:
+            conn.close()
+
+        start = time.perf_counter()
+        for _ in range(navigations):
+            open_screen(db.connection())
+        managed = time.perf_counter() - start
+        db.close()
+
+    print(f"Navegaciones: {navigations}  (alumnos={students}, productos={products})")
+    print(f"  legacy  : {legacy * 1000:9.1f} ms  ({legacy / navigations * 1000:.3f} ms/nav)")
+    print(f"  managed : {managed * 1000:9.1f} ms  ({managed / navigations * 1000:.3f} ms/nav)")
+    if managed:
+        print(f"  speedup : {legacy / managed:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--navigations", type=int, default=200)
+    parser.add_argument("--students", type=int, default=800)
+    parser.add_argument("--products", type=int, default=120)
+    args = parser.parse_args()
+    run(args.navigations, args.students, args.products)
@@ -0,0 +1,97 @@
+"""
+Benchmark: latencia de SaleRepository.create_sale según renglones del carrito.
+
+Crea una BD temporal, siembra productos y registra ventas de 1..N renglones,
+midiendo el tiempo hasta el commit. Con --legacy-triggers reinstala los
+triggers anteriores (recálculo completo vía v_sales_calc) para comparar.
+
+Uso:
+    python tools/bench_create_sale.py [--sales 200] [--lines 1,5,10,20,50]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.database import DatabaseManager
+from models.student import Student
+from repositories.sale_repo import SaleRepository
+
+SELLER = {"id": 1, "first_name": "SUPER", "second_name": "USER"}
+
+# Triggers previos a la migración 3 (solo para comparar)
+LEGACY_TRIGGERS = """
+DROP TRIGGER IF EXISTS trg_items_ai;
+DROP TRIGGER IF EXISTS trg_payments_ai;
+DROP TRIGGER IF EXISTS trg_sales_payment_status;
+CREATE TRIGGER trg_items_ai AFTER INSERT ON sale_items
+BEGIN
+  UPDATE sales
+  SET subtotal       = (SELECT sub  FROM v_sales_calc WHERE sale_id = NEW.sale_id),
+      discount_total = (SELECT disc FROM v_sales_calc WHERE sale_id = NEW.sale_id),
+      tax_total      = (SELECT iva  FROM v_sales_calc WHERE sale_id = NEW.sale_id),
+      total          = (SELECT tot  FROM v_sales_calc WHERE sale_id = NEW.sale_id)
+  WHERE id = NEW.sale_id;
+END;
+CREATE TRIGGER trg_payments_ai AFTER INSERT ON payments
+BEGIN
+  UPDATE sales
+  SET payment_status = CASE
+    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = NEW.sale_id) >= total THEN 'paid'
+    WHEN (SELECT total_paid FROM v_sales_paid WHERE sale_id = NEW.sale_id) > 0    THEN 'partial'
+    ELSE 'unpaid'
+  END
+  WHERE id = NEW.sale_id;
+END;
+"""
+
+
+def seed(conn, products: int) -> list:
+    rows = [(f"SKU{i:04d}", f"Producto {i}", 50.0 + i, 0.16) for i in range(products)]
+    conn.executemany("INSERT INTO products (sku, description, price, tax_rate) VALUES (?, ?, ?, ?)", rows)
+    conn.execute("INSERT INTO customers (enrollment, first_name, second_name) VALUES ('MAT00001', 'Ana', 'García')")
+    conn.commit()
+    return [
+        {"sku": sku, "description": desc, "price": price, "tax_rate": tax, "qty": 1 + i % 3}
+        for i, (sku, desc, price, tax) in enumerate(rows)
+    ]
+
+
+def run(sales: int, line_counts: list, legacy: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / "bench.db")
+        conn = db.connection()
+        if legacy:
+            conn.executescript(LEGACY_TRIGGERS)
+        catalog = seed(conn, max(line_counts))
+        student = Student(enrollment="MAT00001", first_name="Ana", second_name="García", student_id=1)
+        repo = SaleRepository(conn)
+
+        print(f"Triggers: {'legacy (v_sales_calc)' if legacy else 'incrementales'}  ventas por tamaño: {sales}")
+        print(f"{'renglones':>10} {'media ms':>10} {'p95 ms':>10}")
+        for lines in line_counts:
+            cart = catalog[:lines]
+            amount = sum(i["price"] * i["qty"] * (1 + i["tax_rate"]) for i in cart)
+            samples = []
+            for _ in range(sales):
+                start = time.perf_counter()
+                repo.create_sale(student=student, cart=cart, seller=SELLER,
+                                 payment_method_id=1, amount=amount)
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            print(f"{lines:>10} {statistics.mean(samples):>10.3f} {p95:>10.3f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sales", type=int, default=200)
+    parser.add_argument("--lines", default="1,5,10,20,50")
+    parser.add_argument("--legacy-triggers", action="store_true")
+    args = parser.parse_args()
+    run(args.sales, [int(n) for n in args.lines.split(",")], args.legacy_triggers)
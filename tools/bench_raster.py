@@ -0,0 +1,86 @@
+"""
+Benchmark: conversión del logo a raster ESC/POS (GS v 0).
+
+Compara el ciclo anterior de TicketPrinter._image_to_escpos (getpixel por
+pixel) contra printer.raster (tobytes + tabla de inversión) y verifica que
+la salida sea idéntica byte a byte. Prepara la imagen igual que
+TicketPrinter._print_logo (modo '1', ancho máximo 256). No necesita
+impresora ni win32print.
+
+Uso:
+    python tools/bench_raster.py [--logo assets/images/logo.bmp] [--width 256] [--runs 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image
+
+from printer.raster import raster_command
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LOGO = ROOT / "assets" / "images" / "logo.bmp"
+FALLBACK_LOGO = ROOT / "assets" / "images" / "logo.png"
+
+
+def legacy_raster(img: Image.Image) -> bytes:
+    # Camino anterior: getpixel por cada pixel
+    width, height = img.size
+    width_bytes = (width + 7) // 8
+    header = b"\x1d\x76\x30\x00" + width_bytes.to_bytes(2, 'little') + height.to_bytes(2, 'little')
+    data = bytearray()
+    for y in range(height):
+        for x in range(0, width, 8):
+            byte = 0
+            for bit in range(8):
+                if x + bit < width:
+                    if img.getpixel((x + bit, y)) == 0:
+                        byte |= 1 << (7 - bit)
+            data.append(byte)
+    return header + bytes(data)
+
+
+def load_logo(path: Path, max_width: int) -> Image.Image:
+    with Image.open(path) as img:
+        img = img.convert('1')
+        if img.width > max_width:
+            ratio = max_width / img.width
+            img = img.resize((max_width, int(img.height * ratio)), Image.Resampling.LANCZOS)
+        return img
+
+
+def timed(fn, img, runs: int):
+    start = time.perf_counter()
+    for _ in range(runs):
+        out = fn(img)
+    return (time.perf_counter() - start) / runs * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logo", type=Path, default=DEFAULT_LOGO)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    logo = args.logo
+    if not logo.exists() and logo == DEFAULT_LOGO and FALLBACK_LOGO.exists():
+        print(f"{logo} no existe, se usa {FALLBACK_LOGO}")
+        logo = FALLBACK_LOGO
+
+    img = load_logo(logo, args.width)
+    legacy_ms, legacy_out = timed(legacy_raster, img, args.runs)
+    fast_ms, fast_out = timed(raster_command, img, args.runs)
+
+    print(f"Imagen: {img.width}x{img.height} px, {len(fast_out)} bytes")
+    print(f"getpixel: {legacy_ms:8.3f} ms/conversión")
+    print(f"tobytes:  {fast_ms:8.3f} ms/conversión  ({legacy_ms / fast_ms:.0f}x)")
+    print("Salida idéntica:", "sí" if legacy_out == fast_out else "NO")
+    return 0 if legacy_out == fast_out else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
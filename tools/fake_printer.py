@@ -0,0 +1,205 @@
+"""
+Impresora falsa RAW 9100 para probar sin hardware.
+
+Acepta conexiones TCP, cuenta bytes y separa tickets por el comando de
+corte (GS V). Puede simular la velocidad de una impresora real (--bps) para
+que el envío sienta la contrapresión igual que con el equipo, y guardar lo
+recibido en un archivo. Con --close-after-job cierra la conexión después
+de cada corte, como algunas impresoras de red.
+
+Servidor:
+    python tools/fake_printer.py --port 9100 [--bps 20000] [--out tickets.bin] [--close-after-job]
+    (en otra terminal: POS_PRINTER=tcp://127.0.0.1:9100 python main.py)
+
+Benchmark (servidor y TicketPrinter en el mismo proceso):
+    python tools/fake_printer.py --bench 50 [--bps 20000] [--logo-storage nv]
+"""
+import argparse
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CUT = b"\x1dV"
+
+
+class FakePrinterServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100, bps: int = 0, out=None,
+                 close_after_job: bool = False):
+        self.bps = bps
+        self.out = out
+        self.close_after_job = close_after_job
+        self.bytes_received = 0
+        self.cut_times = []        # perf_counter al recibir cada corte
+        self.connections = 0       # conexiones aceptadas
+        self.closed = 0            # conexiones ya cerradas
+        self._conns = set()
+        self._lock = threading.Lock()
+        self._sock = socket.create_server((host, port))
+        self.port = self._sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.connections += 1
+                self._conns.add(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        if self.bps:
+            # Buffer de recepción chico para que la contrapresión llegue al cliente
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        tail = b""
+        chunk = 512 if self.bps else 65536
+        try:
+            with conn:
+                while True:
+                    data = conn.recv(chunk)
+                    if not data:
+                        return
+                    if self.bps:
+                        time.sleep(len(data) / self.bps)
+                    now = time.perf_counter()
+                    window = tail + data
+                    cuts = window.count(CUT)
+                    with self._lock:
+                        self.bytes_received += len(data)
+                        self.cut_times.extend([now] * cuts)
+                        if self.out:
+                            self.out.write(data)
+                    tail = window[-1:]
+                    if cuts and self.close_after_job:
+                        return
+        except OSError:
+            pass                   # cerrada desde close()
+        finally:
+            with self._lock:
+                self.closed += 1
+                self._conns.discard(conn)
+
+    def wait_for_cuts(self, count: int, timeout: float = 60.0) -> bool:
+        end = time.perf_counter() + timeout
+        while time.perf_counter() < end:
+            with self._lock:
+                if len(self.cut_times) >= count:
+                    return True
+            time.sleep(0.001)
+        return False
+
+    def wait_for_closed(self, count: int, timeout: float = 10.0) -> bool:
+        end = time.perf_counter() + timeout
+        while time.perf_counter() < end:
+            with self._lock:
+                if self.closed >= count:
+                    return True
+            time.sleep(0.001)
+        return False
+
+    def close(self):
+        """Deja de aceptar y corta las conexiones abiertas (como apagar la impresora)."""
+        try:
+            # shutdown despierta al accept() bloqueado; solo close() no libera el puerto
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._thread.join(timeout=1)
+        with self._lock:
+            conns = list(self._conns)
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def sample_ticket():
+    return {
+        "header": {"folio": "F0001", "student": "Ana García López", "enrollment": "A00123"},
+        "items": [{"description": f"Concepto {i}", "qty": 1, "unit_price": 150.0 + i, "tax_rate": 0.0}
+                  for i in range(6)],
+        "totals": {"subtotal": 915.0, "tax": 0.0, "total": 915.0},
+        "payment_method": "Efectivo",
+        "business": {"nombre": "LIBERTAD Y CREATIVIDAD", "rfc": "LCR030414IB8"},
+    }
+
+
+def bench(tickets: int, bps: int, logo_storage: str, logo: str):
+    from printer.nv_logo import NVLogoRegistry
+    from printer.printer import TicketPrinter
+    from printer.transports import TcpTransport
+
+    server = FakePrinterServer(port=0, bps=bps)
+    transport = TcpTransport("127.0.0.1", server.port)
+    printer = TicketPrinter(transport=transport, logo_path=logo, logo_storage=logo_storage)
+
+    latencies, sent = [], 0
+    start = time.perf_counter()
+    for i in range(tickets):
+        t0 = time.perf_counter()
+        stats = printer.print_ticket(**sample_ticket())
+        sent += stats["bytes"] + stats["upload_bytes"]
+        if not server.wait_for_cuts(i + 1):
+            print("La impresora falsa no recibió el ticket a tiempo")
+            return 1
+        latencies.append((server.cut_times[i] - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    # El puerto es aleatorio: no dejar su marca de logo NV registrada
+    NVLogoRegistry.shared().forget(transport.name)
+    transport.close()
+    server.close()
+
+    print(f"Tickets: {tickets}  logo: {logo_storage}  velocidad simulada: {bps or 'sin límite'} B/s")
+    print(f"Bytes enviados: {sent}  ({sent / tickets:.0f} por ticket)")
+    print(f"Throughput: {server.bytes_received / elapsed / 1024:.1f} KiB/s")
+    print(f"Latencia ticket: p50 {statistics.median(latencies):.1f} ms  "
+          f"max {max(latencies):.1f} ms")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--bps", type=int, default=0, help="bytes/s simulados (0 = sin límite)")
+    parser.add_argument("--out", type=Path, help="guardar lo recibido en este archivo")
+    parser.add_argument("--close-after-job", action="store_true", help="cerrar la conexión después de cada corte")
+    parser.add_argument("--bench", type=int, metavar="N", help="imprimir N tickets contra el servidor y medir")
+    parser.add_argument("--logo-storage", default="raster", choices=("raster", "nv", "nv_legacy"))
+    parser.add_argument("--logo", default="assets/images/logo.png")
+    args = parser.parse_args()
+
+    if args.bench:
+        return bench(args.bench, args.bps, args.logo_storage, args.logo)
+
+    out = open(args.out, "ab") if args.out else None
+    server = FakePrinterServer(args.host, args.port, args.bps, out, args.close_after_job)
+    print(f"Impresora falsa en {args.host}:{server.port} (Ctrl+C para salir)")
+    try:
+        last = 0
+        while True:
+            time.sleep(1)
+            if len(server.cut_times) != last:
+                last = len(server.cut_times)
+                print(f"{last} tickets, {server.bytes_received} bytes")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if out:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
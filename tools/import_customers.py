@@ -1,8 +1,23 @@
+import argparse
+import csv
+import hashlib
+import itertools
+import json
 import sqlite3
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+import openpyxl
 import pandas as pd
 from pathlib import Path
 import os
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from database import migrations
+from repositories.student_repo import index_student
+
 # =======================================================
 # CONFIGURACIÓN DE RUTAS
 # =======================================================
@@ -14,9 +29,10 @@ DB_PATH = os.path.join(APPDATA, "SistemaJardin", "school.db")
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
 EXCEL_PATH = "DATOS ALUMNOS.xlsx"  # Ajusta si está en otra carpeta
+CHUNK_SIZE = 2000                  # renglones por bloque (y por transacción)
 
 # =======================================================
-# UTILIDADES
+# UTILIDADES (columnas completas de pandas)
 # =======================================================
 
 month_map = {
@@ -25,38 +41,43 @@ month_map = {
     "SEPTIEMBRE": "09", "OCTUBRE": "10", "NOVIEMBRE": "11", "DICIEMBRE": "12"
 }
 
-def normalize_str(x):
-    if pd.isna(x):
-        return None
-    s = str(x).strip()
-    if s == "" or s.upper() == "NAN":
-        return None
-    return s
-
-def numeric_to_str(x):
-    if pd.isna(x):
-        return None
-    try:
-        v = int(float(x))
-        return str(v)
-    except Exception:
-        return normalize_str(x)
-
-def build_birth_date(dia, mes, anio):
-    if pd.isna(dia) or pd.isna(mes) or pd.isna(anio):
-        return None
-    mes_clean = str(mes).strip().upper()
-    mm = month_map.get(mes_clean)
-    if not mm:
-        return None
-    try:
-        dd = int(dia)
-        yy = int(anio)
-        return f"{yy:04d}-{mm}-{dd:02d}"
-    except Exception:
-        return None
+CUSTOMER_FIELDS = ["first_name", "second_name", "address", "grade_id", "group_id", "shift_id",
+                   "gender", "birth_date", "curp", "pay_reference"]
+
+
+def column(df, name):
+    """Columna del Excel; si no existe, una columna vacía del mismo largo."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(pd.NA, index=df.index, dtype="object")
+
+
+def normalize_str(s: pd.Series) -> pd.Series:
+    """Texto sin espacios a los lados; vacío o 'NAN' queda como NA."""
+    out = s.astype("string").str.strip()
+    return out.mask(out.eq("") | out.str.upper().eq("NAN"))
+
+
+def numeric_to_str(s: pd.Series) -> pd.Series:
+    """Números como entero sin '.0' (matrícula, CP, teléfonos); lo demás como texto."""
+    text = normalize_str(s)
+    num = pd.to_numeric(s, errors="coerce")
+    ints = num.dropna().astype("int64").astype("string")
+    return text.where(num.isna(), ints.reindex(s.index))
 
-def map_gender(sexo):
+
+def build_birth_date(dia: pd.Series, mes: pd.Series, anio: pd.Series) -> pd.Series:
+    mm = normalize_str(mes).str.upper().map(month_map)
+    dd = pd.to_numeric(dia, errors="coerce")
+    yy = pd.to_numeric(anio, errors="coerce")
+    valid = mm.notna() & dd.notna() & yy.notna()
+    out = pd.Series(pd.NA, index=dia.index, dtype="string")
+    out[valid] = (yy[valid].astype("int64").astype("string").str.zfill(4) + "-" + mm[valid] + "-"
+                  + dd[valid].astype("int64").astype("string").str.zfill(2))
+    return out
+
+
+def map_gender(sexo: pd.Series) -> pd.Series:
     """
     Excel: H = Hombre, M = Mujer
     Tabla: gender IN ('M','F')
@@ -65,184 +86,473 @@ def map_gender(sexo):
       M -> 'F' (Female)
     Ajusta si en tu UI usas otra convención.
     """
-    if pd.isna(sexo):
-        return None
-    s = str(sexo).strip().upper()
-    if s == "H":
-        return "M"
-    if s == "M":
-        return "F"
-    return None
-
-def make_address(row):
-    parts = []
-    for col in ["DOMICILIO", "E CALLE 1", "E CALLE 2"]:
-        val = normalize_str(row.get(col))
-        if val:
-            parts.append(val)
-    cp = numeric_to_str(row.get("CÓDIGO PTAL"))
-    if cp:
-        parts.append(f"CP {cp}")
-    return ", ".join(parts) if parts else None
-
-def upsert_catalog(conn, table, code, name):
-    cur = conn.cursor()
-    cur.execute(f"INSERT OR IGNORE INTO {table} (code, name) VALUES (?, ?)", (code, name))
-    conn.commit()
-    cur.execute(f"SELECT id FROM {table} WHERE code = ?", (code,))
-    row = cur.fetchone()
-    return row[0] if row else None
+    return normalize_str(sexo).str.upper().map({"H": "M", "M": "F"})
+
+
+def join_parts(*columns: pd.Series, sep: str = ", ", empty=None) -> list:
+    """Une por renglón las partes no vacías de varias columnas."""
+    return [sep.join(p for p in parts if isinstance(p, str)) or empty
+            for parts in zip(*(c.astype("object") for c in columns))]
+
+
+def make_address(df) -> list:
+    cp = numeric_to_str(column(df, "CÓDIGO PTAL"))
+    parts = [normalize_str(column(df, col)) for col in ["DOMICILIO", "E CALLE 1", "E CALLE 2"]]
+    return join_parts(*parts, "CP " + cp)
+
+
+def resolve_catalog(conn, table, codes: pd.Series, names: pd.Series, create: bool = True) -> pd.Series:
+    """
+    Da de alta los códigos nuevos del catálogo en un solo executemany y
+    regresa la columna de IDs (una consulta por catálogo, no por renglón).
+    Con create=False los códigos que no existen quedan sin ID.
+    """
+    pairs = pd.DataFrame({"code": codes, "name": names}).dropna(subset=["code"]).drop_duplicates("code")
+    if create:
+        conn.executemany(f"INSERT OR IGNORE INTO {table} (code, name) VALUES (?, ?)",
+                         pairs.itertuples(index=False, name=None))
+    ids = dict(conn.execute(f"SELECT code, id FROM {table}").fetchall())
+    return codes.map(ids)
+
+
+def nullable(value):
+    # NA de pandas -> None para sqlite3
+    return None if value is pd.NA or (isinstance(value, float) and value != value) else value
+
+
+def records(df, columns) -> list:
+    return [tuple(nullable(v) for v in row)
+            for row in df[columns].astype("object").itertuples(index=False, name=None)]
+
+
+class Timer:
+    """Tiempos acumulados por etapa (sumando todos los bloques) para el resumen final."""
+
+    def __init__(self):
+        self.steps = {}
+        self._last = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.steps[name] = self.steps.get(name, 0.0) + now - self._last
+        self._last = now
+
+
+# =======================================================
+# NORMALIZACIÓN
+# =======================================================
+
+def normalize_frame(df) -> pd.DataFrame:
+    """Hoja del Excel -> un renglón por alumno con los campos de customers y tutores."""
+    out = pd.DataFrame(index=df.index)
+    out["enrollment"] = numeric_to_str(column(df, "MATRICULA"))
+
+    # Guardamos el nombre propio en first_name y los apellidos en second_name
+    out["first_name"] = normalize_str(column(df, "NOMBRE"))
+    out["second_name"] = join_parts(normalize_str(column(df, "APELLIDO PATERNO")),
+                                    normalize_str(column(df, "APELLIDO MATERNO")), sep=" ", empty="")
+    out["address"] = make_address(df)
+    out["gender"] = map_gender(column(df, "SEXO"))
+    out["birth_date"] = build_birth_date(column(df, "DIA FNAC"), column(df, "MES FNAC"), column(df, "AÑO FNAC"))
+    out["curp"] = normalize_str(column(df, "CURP"))
+    out["pay_reference"] = numeric_to_str(column(df, "REFERENCIA"))
+
+    out["grado"] = normalize_str(column(df, "GRADO"))
+    out["grupo"] = normalize_str(column(df, "GRUPO"))
+    out["turno"] = normalize_str(column(df, "HORARIO"))
+
+    # Tutores (mamá / papá del alumno)
+    tel_casa = numeric_to_str(column(df, "TELÉFONO"))
+    cel1 = numeric_to_str(column(df, "CELULAR 1"))
+    cel2 = numeric_to_str(column(df, "CELULAR 2"))
+    out["mama_name"] = normalize_str(column(df, "NOMBRE MAMÁ"))
+    out["papa_name"] = normalize_str(column(df, "NOMBRE PAPÁ"))
+    out["phone_mom"] = cel1.fillna(tel_casa).fillna(cel2)
+    out["phone_dad"] = cel2.fillna(tel_casa).fillna(cel1)
+    return out
+
+
+def tutor_rows(students: pd.DataFrame) -> list:
+    """(student_id, nombre, relación, teléfono, is_primary) en el orden del Excel."""
+    rows = []
+    for customer_id, mama_name, papa_name, phone_mom, phone_dad in records(
+            students, ["customer_id", "mama_name", "papa_name", "phone_mom", "phone_dad"]):
+        if mama_name:
+            rows.append((customer_id, mama_name, "Madre", phone_mom, 1))
+        if papa_name:
+            # si no hubo mamá, papá será principal
+            rows.append((customer_id, papa_name, "Padre", phone_dad, 0 if mama_name else 1))
+    return rows
+
+
+# =======================================================
+# DETECCIÓN DE CAMBIOS
+# =======================================================
+
+# Campos normalizados que forman la huella del renglón (customers.import_hash).
+# Cambiar HASH_VERSION si cambia la normalización: obliga a comparar todo otra vez.
+HASH_VERSION = "1"
+HASH_FIELDS = ["enrollment", "first_name", "second_name", "address", "grado", "grupo", "turno",
+               "gender", "birth_date", "curp", "pay_reference",
+               "mama_name", "papa_name", "phone_mom", "phone_dad"]
+
+
+def row_hashes(students: pd.DataFrame) -> list:
+    return [
+        hashlib.blake2b("\x1f".join("\x00" if v is None else str(v) for v in (HASH_VERSION,) + row)
+                        .encode("utf-8"), digest_size=16).hexdigest()
+        for row in records(students, HASH_FIELDS)
+    ]
+
+
+@dataclass
+class ImportPlan:
+    new: pd.DataFrame
+    # (campos que cambian) -> [(valores..., import_hash, id)]
+    updates: Dict[Tuple[str, ...], list] = field(default_factory=lambda: defaultdict(list))
+    reindex: list = field(default_factory=list)        # (id, enrollment, first_name, second_name)
+    tutors: Dict[int, list] = field(default_factory=dict)   # id -> renglones de tutor nuevos
+    unchanged: int = 0
+    hash_only: int = 0        # iguales a la BD, pero sin huella guardada (p. ej. recién migrada)
+    field_changes: Counter = field(default_factory=Counter)
+
+    @property
+    def updated(self) -> int:
+        return sum(len(rows) for rows in self.updates.values()) - self.hash_only
+
+
+def plan_changes(conn, students: pd.DataFrame) -> ImportPlan:
+    """Compara un bloque del archivo contra la BD sin escribir nada (solo lee sus alumnos)."""
+    enrollments = json.dumps(students["enrollment"].tolist())
+    stored = {row[0]: row[1:] for row in conn.execute(
+        f"SELECT enrollment, id, import_hash, {', '.join(CUSTOMER_FIELDS)} FROM customers "
+        "WHERE enrollment IN (SELECT value FROM json_each(?))", (enrollments,))}
+    stored_tutors = defaultdict(list)
+    for student_id, *tutor in conn.execute(
+            "SELECT t.student_id, t.first_name, t.relationship, t.phone, t.is_primary FROM tutors t "
+            "JOIN customers c ON c.id = t.student_id "
+            "WHERE c.enrollment IN (SELECT value FROM json_each(?)) ORDER BY t.tutor_id", (enrollments,)):
+        stored_tutors[student_id].append(tuple(tutor))
+
+    is_new = ~students["enrollment"].isin(stored.keys())
+    plan = ImportPlan(new=students[is_new])
+
+    old = students[~is_new].copy()
+    old["customer_id"] = [stored[e][0] for e in old["enrollment"]]
+    same_hash = old["import_hash"].eq([stored[e][1] for e in old["enrollment"]])
+    plan.unchanged = int(same_hash.sum())
+    old = old[~same_hash]
+
+    wanted_tutors = defaultdict(list)
+    for customer_id, *tutor in tutor_rows(old):
+        wanted_tutors[customer_id].append(tuple(tutor))
+
+    for row in records(old, ["enrollment", "customer_id", "import_hash"] + CUSTOMER_FIELDS):
+        enrollment, customer_id, import_hash, values = row[0], row[1], row[2], row[3:]
+        current = stored[enrollment][2:]
+        changed = tuple(name for name, new, cur in zip(CUSTOMER_FIELDS, values, current) if new != cur)
+        plan.field_changes.update(changed)
+        # Sin cambios de campos solo se guarda la huella nueva
+        plan.updates[changed].append(
+            tuple(v for name, v in zip(CUSTOMER_FIELDS, values) if name in changed) + (import_hash, customer_id))
+        if "first_name" in changed or "second_name" in changed:
+            plan.reindex.append((customer_id, enrollment, values[0], values[1]))
+
+        if wanted_tutors[customer_id] != stored_tutors.get(customer_id, []):
+            plan.tutors[customer_id] = wanted_tutors[customer_id]
+        elif not changed:
+            plan.hash_only += 1
+    if plan.tutors:
+        plan.field_changes["tutores"] = len(plan.tutors)
+    return plan
+
+
+INSERT_TUTOR = """
+    INSERT INTO tutors
+    (student_id, first_name, second_name, relationship, phone, email, is_primary, active)
+    VALUES (?, ?, NULL, ?, ?, NULL, ?, 1)
+"""
+
+
+def apply_plan(conn, plan: ImportPlan, timer) -> int:
+    """Escribe el plan en la transacción abierta; regresa los tutores escritos."""
+    # ------------------------
+    # customers: solo los campos que cambiaron
+    # ------------------------
+    for changed, rows in plan.updates.items():
+        assignments = [f"{name} = ?" for name in changed] + ["import_hash = ?"]
+        conn.executemany(f"UPDATE customers SET {', '.join(assignments)} WHERE id = ?", rows)
+    new = records(plan.new, ["enrollment"] + CUSTOMER_FIELDS + ["import_hash"])
+    conn.executemany(f"""
+        INSERT INTO customers (enrollment, {", ".join(CUSTOMER_FIELDS)}, import_hash)
+        VALUES ({", ".join("?" * (len(CUSTOMER_FIELDS) + 2))})
+    """, new)
+
+    new = plan.new.copy()
+    ids = dict(conn.execute("SELECT enrollment, id FROM customers WHERE enrollment IN (SELECT value FROM json_each(?))",
+                            (json.dumps(new["enrollment"].tolist()),)).fetchall())
+    new["customer_id"] = new["enrollment"].map(ids)
+    timer.mark("alumnos")
+
+    # Llaves de búsqueda sin acentos (customers.search_key + tokens)
+    for customer_id, enrollment, first_name, second_name in plan.reindex + records(
+            new, ["customer_id", "enrollment", "first_name", "second_name"]):
+        index_student(conn, customer_id, enrollment, first_name, second_name)
+    timer.mark("búsqueda")
+
+    # ------------------------
+    # tutors: se recrean del archivo solo donde cambiaron
+    # ------------------------
+    conn.executemany("DELETE FROM tutors WHERE student_id = ?", [(sid,) for sid in plan.tutors])
+    tutors = [(sid,) + tutor for sid, rows in plan.tutors.items() for tutor in rows]
+    tutors += tutor_rows(new)
+    conn.executemany(INSERT_TUTOR, tutors)
+    timer.mark("tutores")
+    return len(tutors)
+
+
+# =======================================================
+# LECTURA POR BLOQUES (CSV / XLSX)
+# =======================================================
+
+def _xlsx_rows(path: Path):
+    # Modo solo lectura: openpyxl va leyendo el XML sin cargar la hoja completa
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        # Primera hoja (ajusta si usas otra)
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _csv_rows(path: Path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        try:
+            dialect = csv.Sniffer().sniff(f.read(8192), delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        f.seek(0)
+        yield from csv.reader(f, dialect)
+
+
+def read_chunks(path: Path, chunk_size: int, skip: int = 0):
+    """
+    Bloques de hasta chunk_size renglones de datos como DataFrame, con el
+    índice en el número de renglón (sin encabezado). skip salta renglones
+    ya importados. En memoria solo hay un bloque a la vez.
+    """
+    rows = _csv_rows(path) if path.suffix.lower() in (".csv", ".txt") else _xlsx_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    header = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+    width = len(header)
+
+    for _ in itertools.islice(rows, skip):
+        pass
+    start = skip
+    while True:
+        batch = list(itertools.islice(rows, chunk_size))
+        if not batch:
+            return
+        batch = [tuple(row[:width]) + (None,) * (width - len(row)) for row in batch]
+        df = pd.DataFrame.from_records(batch, columns=header, index=range(start, start + len(batch)))
+        # Renglones vacíos (formato sin datos al final de la hoja) no cuentan como alumnos
+        yield start + len(batch), df[~(df.isna() | df.eq("")).all(axis=1)]
+        start += len(batch)
+
+
+def index_enrollments(conn, path: Path, chunk_size: int):
+    """
+    Primera pasada, solo la matrícula: el último renglón de cada una queda en
+    la tabla temporal import_last. Así se sabe qué copia de una matrícula
+    repetida gana (la última, como al procesar en orden) antes de escribir,
+    aunque las copias caigan en bloques distintos o antes del punto de control.
+    """
+    conn.execute("CREATE TEMP TABLE import_last (enrollment TEXT PRIMARY KEY, row INTEGER NOT NULL) WITHOUT ROWID")
+    with conn:
+        for _, df in read_chunks(path, chunk_size):
+            enrollments = numeric_to_str(column(df, "MATRICULA")).dropna()
+            conn.executemany("""
+                INSERT INTO import_last (enrollment, row) VALUES (?, ?)
+                ON CONFLICT(enrollment) DO UPDATE SET row = excluded.row
+            """, zip(enrollments.tolist(), enrollments.index.tolist()))
+
+
+def last_copies(conn, students: pd.DataFrame) -> pd.Series:
+    """True en los renglones del bloque que son la última copia de su matrícula."""
+    last = dict(conn.execute("SELECT enrollment, row FROM import_last WHERE enrollment IN (SELECT value FROM json_each(?))",
+                             (json.dumps(students["enrollment"].tolist()),)).fetchall())
+    return pd.Series(students["enrollment"].map(last).to_numpy() == students.index.to_numpy(), index=students.index)
+
+
+# =======================================================
+# PUNTOS DE CONTROL
+# =======================================================
+
+def file_fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def load_checkpoint(conn, source: str, fingerprint: str) -> int:
+    """Renglones ya confirmados de ese archivo (0 si no hay o el archivo cambió)."""
+    row = conn.execute("SELECT fingerprint, rows_done FROM import_checkpoints WHERE source = ?",
+                       (source,)).fetchone()
+    if not row:
+        return 0
+    if row[0] != fingerprint:
+        print("El archivo cambió desde la importación interrumpida: se empieza desde el inicio")
+        return 0
+    return row[1]
+
+
+def save_checkpoint(conn, source: str, fingerprint: str, rows_done: int):
+    # Va en la misma transacción que el bloque: si se confirma uno, se confirma el otro
+    conn.execute("""
+        INSERT INTO import_checkpoints (source, fingerprint, rows_done) VALUES (?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET fingerprint = excluded.fingerprint,
+            rows_done = excluded.rows_done, updated_at = datetime('now','localtime')
+    """, (source, fingerprint, rows_done))
+
 
 # =======================================================
 # IMPORTACIÓN PRINCIPAL
 # =======================================================
 
-def import_data():
-    xl_path = Path(EXCEL_PATH)
+def open_database(db_path, dry_run: bool):
+    """
+    Conexión para importar. Normal: aplica las migraciones pendientes
+    (import_hash / import_checkpoints aunque la app no haya abierto la BD).
+    Simulación: solo lectura y sin migrar; si la BD no está al día se rechaza.
+    """
+    if not dry_run:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        migrations.migrate(conn)
+        return conn
+
+    if not Path(db_path).exists():
+        raise SystemExit(f"--dry-run: no existe la base de datos {db_path}")
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    version = migrations.get_version(conn)
+    if version < migrations.SCHEMA_VERSION:
+        conn.close()
+        raise SystemExit(f"--dry-run: la base de datos está en la versión {version} y se necesita la "
+                         f"{migrations.SCHEMA_VERSION}. Corra la importación sin --dry-run o abra la app "
+                         "para aplicar las migraciones.")
+    return conn
+
+
+def import_data(excel_path=EXCEL_PATH, db_path=DB_PATH, dry_run=False, chunk_size=CHUNK_SIZE, restart=False):
+    xl_path = Path(excel_path)
     if not xl_path.exists():
-        raise FileNotFoundError(f"No se encontró el archivo de Excel: {xl_path}")
-
-    print("Usando base de datos:", DB_PATH)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
-
-    # Lee la primera hoja (ajusta sheet_name si usas otra)
-    df = pd.read_excel(xl_path, sheet_name=0)
-
-    for idx, row in df.iterrows():
-        # ------------------------
-        # Datos básicos del alumno
-        # ------------------------
-        enrollment = numeric_to_str(row.get("MATRICULA"))
-        if not enrollment:
-            print(f"Fila {idx}: sin matrícula, se omite")
-            continue
-
-        grado = normalize_str(row.get("GRADO"))
-        grupo = normalize_str(row.get("GRUPO"))
-        turno = normalize_str(row.get("HORARIO"))
-        sexo = map_gender(row.get("SEXO"))
-
-        apellido_p = normalize_str(row.get("APELLIDO PATERNO"))
-        apellido_m = normalize_str(row.get("APELLIDO MATERNO"))
-        nombres = normalize_str(row.get("NOMBRE"))
-
-        # Guardamos el nombre propio en first_name y los apellidos en second_name
-        first_name = nombres
-        second_name = " ".join([p for p in [apellido_p, apellido_m] if p])
-
-        address = make_address(row)
-        birth_date = build_birth_date(row.get("DIA FNAC"), row.get("MES FNAC"), row.get("AÑO FNAC"))
-        curp = normalize_str(row.get("CURP"))
-        pay_ref = numeric_to_str(row.get("REFERENCIA"))
-
-        # ------------------------
-        # Catálogos: grados, grupos, turnos
-        # ------------------------
-        grade_id = group_id = shift_id = None
-        if grado:
-            grade_id = upsert_catalog(conn, "grades", code=str(grado), name=f"Grado {grado}")
-        if grupo:
-            group_id = upsert_catalog(conn, "groups", code=str(grupo), name=f"Grupo {grupo}")
-        if turno:
-            shift_id = upsert_catalog(conn, "shifts", code=turno.upper(), name=turno.strip().title())
-
-        cur = conn.cursor()
-
-        # ------------------------
-        # customers (alumno)
-        # ------------------------
-        cur.execute("SELECT id FROM customers WHERE enrollment = ?", (enrollment,))
-        existing = cur.fetchone()
-
-        if existing:
-            customer_id = existing[0]
-            cur.execute("""
-                UPDATE customers
-                SET first_name = ?, second_name = ?, address = ?,
-                    grade_id = ?, group_id = ?, shift_id = ?,
-                    gender = ?, birth_date = ?, curp = ?, pay_reference = ?
-                WHERE id = ?
-            """, (
-                first_name, second_name, address,
-                grade_id, group_id, shift_id,
-                sexo, birth_date, curp, pay_ref,
-                customer_id
-            ))
-        else:
-            cur.execute("""
-                INSERT INTO customers
-                (enrollment, first_name, second_name, address,
-                 grade_id, group_id, shift_id,
-                 gender, birth_date, curp, pay_reference)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                enrollment, first_name, second_name, address,
-                grade_id, group_id, shift_id,
-                sexo, birth_date, curp, pay_ref
-            ))
-            customer_id = cur.lastrowid
-
-        conn.commit()
-
-        # ------------------------
-        # tutors (mamá / papá del alumno)
-        # ------------------------
-        tel_casa = numeric_to_str(row.get("TELÉFONO"))
-        cel1 = numeric_to_str(row.get("CELULAR 1"))
-        cel2 = numeric_to_str(row.get("CELULAR 2"))
-
-        mama_name = normalize_str(row.get("NOMBRE MAMÁ"))
-        papa_name = normalize_str(row.get("NOMBRE PAPÁ"))
-
-        # Para mantener consistencia con el Excel:
-        # borramos tutores actuales del alumno y los recreamos
-        cur.execute("DELETE FROM tutors WHERE student_id = ?", (customer_id,))
-
-        primary_assigned = False
+        raise FileNotFoundError(f"No se encontró el archivo: {xl_path}")
 
-        if mama_name:
-            phone_mom = cel1 or tel_casa or cel2
-            cur.execute("""
-                INSERT INTO tutors
-                (student_id, first_name, second_name, relationship, phone, email, is_primary, active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1)
-            """, (
-                customer_id,
-                mama_name,  # Usamos el nombre completo en first_name
-                None,       # second_name opcional, si quieres luego lo separamos
-                "Madre",
-                phone_mom,
-                None,
-                1  # is_primary
-            ))
-            primary_assigned = True
-
-        if papa_name:
-            phone_dad = cel2 or tel_casa or cel1
-            cur.execute("""
-                INSERT INTO tutors
-                (student_id, first_name, second_name, relationship, phone, email, is_primary, active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 1)
-            """, (
-                customer_id,
-                papa_name,
-                None,
-                "Padre",
-                phone_dad,
-                None,
-                0 if primary_assigned else 1  # si no hubo mamá, papá será principal
-            ))
+    print("Usando base de datos:", db_path)
+    timer = Timer()
+    totals = Counter()
+    field_changes = Counter()
 
-        conn.commit()
+    conn = open_database(db_path, dry_run)
 
-        print(f"Procesado alumno matrícula {enrollment} (id={customer_id})")
+    source = str(xl_path.resolve())
+    fingerprint = file_fingerprint(xl_path)
+    resumed_from = 0 if (restart or dry_run) else load_checkpoint(conn, source, fingerprint)
+    if resumed_from:
+        print(f"Reanudando después del renglón {resumed_from}")
+    position = committed = resumed_from
+    started = time.perf_counter()
+    timer.mark("inicio")
 
-    conn.close()
-    print("Importación terminada.")
+    try:
+        # Todo el archivo, también lo ya confirmado: repetidos y faltantes
+        # salen igual en una corrida reanudada que en una completa
+        index_enrollments(conn, xl_path, chunk_size)
+        timer.mark("matrículas")
+
+        for position, df in read_chunks(xl_path, chunk_size, skip=resumed_from):
+            timer.mark("lectura")
+            totals["read"] += len(df)
+            students = normalize_frame(df)
+            skipped = students["enrollment"].isna()
+            for idx in students.index[skipped]:
+                print(f"Fila {idx}: sin matrícula, se omite")
+            totals["skipped"] += int(skipped.sum())
+            students = students[~skipped]
+            # Matrícula repetida: solo se escribe su último renglón, esté en este bloque o en otro
+            winners = last_copies(conn, students)
+            totals["duplicates"] += int((~winners).sum())
+            students = students[winners].copy()
+            students["import_hash"] = row_hashes(students)
+            timer.mark("normalización")
+
+            # Una transacción por bloque, con su punto de control
+            with conn:
+                # ------------------------
+                # Catálogos: grados, grupos, turnos (en simulación no se dan de alta)
+                # ------------------------
+                create = not dry_run
+                students["grade_id"] = resolve_catalog(conn, "grades", students["grado"],
+                                                       "Grado " + students["grado"], create)
+                students["group_id"] = resolve_catalog(conn, "groups", students["grupo"],
+                                                       "Grupo " + students["grupo"], create)
+                students["shift_id"] = resolve_catalog(conn, "shifts", students["turno"].str.upper(),
+                                                       students["turno"].str.title(), create)
+                timer.mark("catálogos")
+
+                plan = plan_changes(conn, students)
+                timer.mark("comparación")
+                totals.update(new=len(plan.new), updated=plan.updated, unchanged=plan.unchanged,
+                              hash_only=plan.hash_only)
+                field_changes.update(plan.field_changes)
+
+                if not dry_run:
+                    totals["tutors"] += apply_plan(conn, plan, timer)
+                    save_checkpoint(conn, source, fingerprint, position)
+            committed = position
+            timer.mark("commit")
+
+            rate = (position - resumed_from) / max(time.perf_counter() - started, 1e-9)
+            print(f"  {position} renglones  ({rate:.0f} renglones/s)", flush=True)
+
+        if not dry_run:
+            # Terminado: la próxima corrida del mismo archivo empieza desde el inicio
+            with conn:
+                conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (source,))
+        missing = conn.execute("SELECT COUNT(*) FROM customers "
+                               "WHERE enrollment NOT IN (SELECT enrollment FROM import_last)").fetchone()[0]
+    except KeyboardInterrupt:
+        print(f"\nInterrumpido. Confirmados {committed} renglones; vuelva a correr el comando para reanudar.")
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print("Simulación (no se escribió nada)." if dry_run else "Importación terminada.")
+    print(f"Renglones leídos: {totals['read']}  sin matrícula: {totals['skipped']}  repetidos: {totals['duplicates']}")
+    print(f"Alumnos nuevos: {totals['new']}  actualizados: {totals['updated']}  sin cambios: {totals['unchanged']}  "
+          f"en la BD pero no en el archivo: {missing}")
+    if totals["hash_only"]:
+        print(f"Sin cambios pero sin huella previa (solo se guarda la huella): {totals['hash_only']}")
+    if field_changes:
+        print("Cambios por campo: " + "  ".join(f"{name} {count}" for name, count in field_changes.most_common()))
+    if not dry_run:
+        print(f"Tutores escritos: {totals['tutors']}")
+    print(f"Velocidad: {(position - resumed_from) / max(elapsed, 1e-9):.0f} renglones/s")
+    print("Tiempos: " + "  ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timer.steps.items())
+          + f"  | total {elapsed:.2f} s")
 
 # =======================================================
 # PUNTO DE ENTRADA
 # =======================================================
 if __name__ == "__main__":
-    import_data()
+    parser = argparse.ArgumentParser(description="Importa alumnos y tutores desde el Excel (o CSV) de inscripciones.")
+    parser.add_argument("--file", "--excel", dest="path", default=EXCEL_PATH, help="archivo .xlsx o .csv")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="solo contar nuevos / actualizados / sin cambios / faltantes, sin escribir")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="renglones por transacción")
+    parser.add_argument("--restart", action="store_true", help="ignorar el punto de control y empezar desde el inicio")
+    args = parser.parse_args()
+    import_data(args.path, args.db, dry_run=args.dry_run, chunk_size=args.chunk_size, restart=args.restart)
@@ -0,0 +1,69 @@
+"""
+Convierte bytes ESC/POS en PNG con el emulador (printer/emulator.py).
+
+Sirve para ver en Linux lo que salió por un transporte file: o lo que
+guardó la impresora falsa (tools/fake_printer.py --out), y para comparar
+la salida de TicketPrinter entre versiones sin gastar papel. Un PNG por
+ticket (cada corte GS V).
+
+Uso:
+    python tools/render_ticket.py tickets.bin [--columns 48] [--out-dir previews]
+    python tools/render_ticket.py --sample [--paper 58] [--runs 50]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from printer.emulator import EscPosEmulator
+from printer.layout import PAPER_COLUMNS
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def sample_bytes(paper_mm: int) -> bytes:
+    from printer.printer import TicketPrinter
+    from fake_printer import sample_ticket
+
+    printer = TicketPrinter(transport="memory:render", paper_width_mm=paper_mm,
+                            logo_path=str(ROOT / "assets" / "images" / "logo.png"))
+    return bytes(printer.ticket_bytes(**sample_ticket(), logo_data=printer._print_logo()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", type=Path, help="archivo con bytes ESC/POS")
+    parser.add_argument("--sample", action="store_true", help="usar un ticket de ejemplo de TicketPrinter")
+    parser.add_argument("--paper", type=int, default=80, choices=sorted(PAPER_COLUMNS))
+    parser.add_argument("--columns", type=int, help="columnas de Font A (por defecto las del papel)")
+    parser.add_argument("--out-dir", type=Path, default=Path("."))
+    parser.add_argument("--runs", type=int, default=1, help="repeticiones para medir el tiempo de render")
+    args = parser.parse_args()
+
+    if args.sample:
+        data = sample_bytes(args.paper)
+    elif args.input:
+        data = args.input.read_bytes()
+    else:
+        parser.error("indique un archivo o --sample")
+
+    emulator = EscPosEmulator(args.columns or PAPER_COLUMNS[args.paper])
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        pages = emulator.render(data)
+    elapsed = (time.perf_counter() - start) / args.runs
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    stem = args.input.stem if args.input else f"sample_{args.paper}mm"
+    for n, page in enumerate(pages, 1):
+        path = args.out_dir / f"{stem}_{n}.png"
+        page.save(path)
+        print(f"{path}  {page.width}x{page.height}")
+    print(f"{len(data)} bytes, {len(pages)} ticket(s), render {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# ui/barcode.py
+"""
+Lector de código de barras en modo teclado.
+
+Los lectores USB escriben el código como un teclado, a ráfaga (pocos ms
+entre teclas), y terminan con Enter. ScanDetector mira los tiempos de las
+teclas en un Entry: si el Enter llega al final de una ráfaga entrega el
+código completo a on_scan; lo escrito a mano sigue su camino normal.
+"""
+
+
+class ScanDetector:
+    def __init__(self, widget, on_scan, max_gap_ms: int = 50, min_length: int = 3):
+        self.widget = widget
+        self.on_scan = on_scan
+        self.max_gap_ms = max_gap_ms
+        self.min_length = min_length
+        self._buffer = []
+        self._last_time = None
+
+        widget.bind("<KeyPress>", self._on_key, add="+")
+        widget.bind("<Return>", self._on_return, add="+")
+        widget.bind("<KP_Enter>", self._on_return, add="+")
+
+    def _on_key(self, event):
+        if event.keysym in ("Return", "KP_Enter"):
+            return
+        if not event.char or not event.char.isprintable():
+            return
+        # event.time es la hora de la tecla (ms), no la de atenderla
+        if self._last_time is None or event.time - self._last_time > self.max_gap_ms:
+            self._buffer = []
+        self._buffer.append(event.char)
+        self._last_time = event.time
+
+    def _on_return(self, event):
+        code = "".join(self._buffer).strip()
+        in_burst = self._last_time is not None and event.time - self._last_time <= self.max_gap_ms
+        self._buffer = []
+        self._last_time = None
+        if in_burst and len(code) >= self.min_length:
+            self.on_scan(code)
+            return "break"
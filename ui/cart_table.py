@@ -0,0 +1,140 @@
+# ui/cart_table.py
+"""
+Tabla del carrito del POS con renglones reciclados.
+
+Escucha los eventos de services.cart.Cart y solo toca el renglón que
+cambió: los widgets de un renglón quitado vuelven a un pool y se reusan
+en el siguiente "added". Al quitar un renglón, los de abajo suben una fila
+del grid (se compacta), así los números de fila no crecen sin límite y el
+renglón nuevo siempre queda al final, en el orden del carrito. Las fuentes
+se crean una sola vez.
+"""
+import customtkinter as ctk
+
+
+class _CartRow:
+    """Widgets de un renglón; bind() solo reconfigura lo que cambió."""
+
+    def __init__(self, table, fonts):
+        self.key = None
+        self.slot = None
+        self._texts = {}
+        self.description = ctk.CTkLabel(table, font=fonts["cell"], anchor="w")
+        self.qty = ctk.CTkLabel(table, font=fonts["cell"], anchor="center")
+        self.price = ctk.CTkLabel(table, font=fonts["cell"], anchor="center")
+        self.amount = ctk.CTkLabel(table, font=fonts["amount"], anchor="center")
+
+        # Frame para botones (para mejor alineación)
+        self.buttons = ctk.CTkFrame(table, fg_color="transparent", width=120)
+        self.buttons.grid_columnconfigure((0, 1), weight=1)
+        ctk.CTkButton(self.buttons, text="✏️", width=35, height=30, fg_color="gray40",
+                      command=lambda: table.on_edit(self.key)).grid(row=0, column=0, padx=2)
+        ctk.CTkButton(self.buttons, text="❌", width=35, height=30, fg_color="#EF4444",
+                      command=lambda: table.on_remove(self.key)).grid(row=0, column=1, padx=2)
+
+    def bind(self, line):
+        self.key = line.key
+        # Acortar descripción si es muy larga
+        description = line.description
+        if len(description) > 35:
+            description = description[:32] + "..."
+        self._set(self.description, description)
+        self._set(self.qty, f"{line.qty}")
+        self._set(self.price, f"${line.price:,.2f}")
+        self._set(self.amount, f"${line.line_cents / 100:,.2f}")
+
+    def _set(self, label, text):
+        if self._texts.get(label) != text:
+            self._texts[label] = text
+            label.configure(text=text)
+
+    def show(self, row):
+        self.slot = row
+        self.description.grid(row=row, column=0, sticky="ew", padx=5, pady=8)
+        self.qty.grid(row=row, column=1, sticky="ew", padx=5, pady=8)
+        self.price.grid(row=row, column=2, sticky="ew", padx=5, pady=8)
+        self.amount.grid(row=row, column=3, sticky="ew", padx=5, pady=8)
+        self.buttons.grid(row=row, column=4, columnspan=2, sticky="ew", padx=5)
+
+    def hide(self):
+        for widget in (self.description, self.qty, self.price, self.amount, self.buttons):
+            widget.grid_remove()
+        self.key = None
+        self.slot = None
+
+
+class CartTable(ctk.CTkFrame):
+    def __init__(self, parent, on_edit, on_remove):
+        super().__init__(parent, fg_color="transparent")
+        self.on_edit = on_edit
+        self.on_remove = on_remove
+        self._fonts = {
+            "header": ctk.CTkFont(size=13, weight="bold"),
+            "cell": ctk.CTkFont(size=13),
+            "amount": ctk.CTkFont(size=13, weight="bold"),
+        }
+        self._rows = {}      # key -> _CartRow visible
+        self._order = []     # _CartRow visibles en orden; el i-ésimo va en la fila i + 1
+        self._pool = []      # _CartRow ocultos para reusar
+
+        # Configurar columnas con anchos fijos/proporcionales
+        self.grid_columnconfigure(0, weight=4, minsize=200)  # Descripción
+        self.grid_columnconfigure(1, weight=1, minsize=60)   # Cantidad
+        self.grid_columnconfigure(2, weight=1, minsize=80)   # Precio Unitario
+        self.grid_columnconfigure(3, weight=1, minsize=80)   # Importe
+        self.grid_columnconfigure(4, weight=1, minsize=60)   # Editar
+        self.grid_columnconfigure(5, weight=1, minsize=60)   # Eliminar
+
+        # Encabezados - Fila 0
+        self._headers = []
+        for column, (text, anchor) in enumerate((("Descripción", "w"), ("Cant", "center"),
+                                                 ("P.U.", "center"), ("Importe", "center"),
+                                                 ("Acciones", "center"))):
+            label = ctk.CTkLabel(self, text=text, font=self._fonts["header"], anchor=anchor)
+            label.grid(row=0, column=column, columnspan=2 if column == 4 else 1,
+                       sticky="ew", padx=5, pady=(0, 10))
+            self._headers.append(label)
+
+        self._empty = ctk.CTkLabel(self, text="Carrito vacío", text_color="gray70")
+        self._is_empty = None
+        self._show_empty(True)
+
+    def apply(self, event, key, line):
+        """Listener de Cart: aplica un solo cambio."""
+        if event == "added":
+            row = self._pool.pop() if self._pool else _CartRow(self, self._fonts)
+            row.bind(line)
+            self._order.append(row)
+            row.show(len(self._order))
+            self._rows[key] = row
+        elif event == "updated":
+            self._rows[key].bind(line)
+        elif event == "removed":
+            row = self._rows.pop(key)
+            index = row.slot - 1
+            del self._order[index]
+            row.hide()
+            self._pool.append(row)
+            # Compactar: los de abajo suben una fila
+            for slot, below in enumerate(self._order[index:], start=index + 1):
+                below.show(slot)
+        elif event == "cleared":
+            for row in self._order:
+                row.hide()
+                self._pool.append(row)
+            self._rows.clear()
+            self._order.clear()
+        self._show_empty(not self._rows)
+
+    def _show_empty(self, empty: bool):
+        if empty == self._is_empty:
+            return
+        self._is_empty = empty
+        if empty:
+            for label in self._headers:
+                label.grid_remove()
+            self._empty.grid(row=0, column=0, columnspan=6, pady=20)
+        else:
+            self._empty.grid_remove()
+            for label in self._headers:
+                label.grid()
@@ -1,13 +1,34 @@
 # ui/pos.py
 
 import customtkinter as ctk
+import sqlite3
 from datetime import datetime
 from tkinter import messagebox
-from repositories.student_repo import StudentRepository
 from repositories.product_repo import ProductRepository
 from repositories.sale_repo import SaleRepository
 from repositories.payment_method_repo import PaymentMethodRepository
+from printer.spooler import PrintSpooler, DONE, FAILED, RETRYING
 from printer.printer import TicketPrinter
+from ui.barcode import ScanDetector
+from ui.cart_table import CartTable
+from ui.search_controller import SearchController
+from services import StudentDirectory
+from services.cart import Cart
+from services.db_worker import DBWorker
+
+
+# Business config debería venir de repositorio
+TICKET_BUSINESS = {
+    "nombre": "LIBERTAD Y CREATIVIDAD",
+    "title": "PREESCOLAR LIBERTAD Y CREATIVIDAD A.C",
+    "clave": "CCT 11PJN08 39V",
+    "eslogan": "Educar con el corazón para llegar a la razón",
+    "rfc": "LCR030414IB8",
+    "direccion": "EL TUNEL 103-B, LA JOYA EJIDO, LEON, GTO. MX.",
+    "contacto": "TEL(S). 477-449-7752 / 477-290-8432",
+    "notas01": "Conserve su ticket para cualquier aclaración.",
+    "notas02": "Este ticket no es comprobante fiscal."
+}
 
 
 class POSFrame(ctk.CTkFrame):
@@ -16,14 +37,21 @@ class POSFrame(ctk.CTkFrame):
         self.parent = parent
         self.db = db_connection
 
-        self.student_repo = StudentRepository(self.db)
+        self.directory = StudentDirectory.shared(self.db)
+        self.worker = DBWorker.shared(self.db)
         self.product_repo = ProductRepository(self.db)
         self.sale_repo = SaleRepository(self.db)
         self.pm_repo = PaymentMethodRepository(self.db)
+        self.spooler = PrintSpooler.shared()
+        self.spooler.start()  # tickets pendientes de una sesión anterior
 
         self.selected_student = None
-        self.cart = []
+        self.cart = Cart()
+        self.cart.subscribe(self._on_cart_changed)
         self.payment_method = ctk.StringVar(value="")
+        self.payment_method_names = {}
+        self.preview_window = None
+        self.preview_printer = None
 
         self._build_ui()
 
@@ -78,19 +106,20 @@ class POSFrame(ctk.CTkFrame):
         self.search_var = ctk.StringVar()
         search_entry = ctk.CTkEntry(frame, placeholder_text="Buscar alumno...", textvariable=self.search_var)
         search_entry.pack(fill="x", padx=(10, 25), pady=(5, 10))
-        search_entry.bind("<KeyRelease>", self._on_search_student)
+        # Debounce corto: el directorio responde en memoria
+        self.student_search = SearchController(
+            search_entry, search=lambda q, k: self.directory.search(q, limit=k),
+            render=self._show_students, delay_ms=120, limit=20
+        )
 
         # Resultados
         self.students_frame = ctk.CTkScrollableFrame(frame, fg_color="transparent")
         self.students_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
-    def _on_search_student(self, event=None):
+    def _show_students(self, query, results):
         for w in self.students_frame.winfo_children():
             w.destroy()
 
-        query = self.search_var.get().strip()
-        results = self.student_repo.search(query) if query else self.student_repo.get_all()
-
         for student in results:
             btn = ctk.CTkButton(
                 self.students_frame,
@@ -103,6 +132,7 @@ class POSFrame(ctk.CTkFrame):
     def _select_student(self, student):
         self.selected_student = student
         self.student_card_label.configure(text=f"Matrícula: {student.enrollment}\n{student.first_name} {student.second_name or ''}")
+        self._refresh_preview()
 
     # ---------- Panel productos ----------
     def _build_products_panel(self):
@@ -132,19 +162,34 @@ class POSFrame(ctk.CTkFrame):
         self.search_product_var = ctk.StringVar()        
         self.product_entry = ctk.CTkEntry(search_box, placeholder_text="SKU o descripción...", textvariable=self.search_product_var)
         self.product_entry.pack(side="left", fill="x", expand=True, padx=(10, 10))
-        self.product_entry.bind("<KeyRelease>", self._on_search_products)
+        # El lector de códigos escribe en esta misma caja; el debounce evita
+        # pintar resultados durante la ráfaga
+        self.scanner = ScanDetector(self.product_entry, self._on_scan)
+        self.product_search = SearchController(
+            self.product_entry, search=self._find_products,
+            render=self._show_products, delay_ms=150, limit=5
+        )
 
         # Resultados
         self.product_results_frame = ctk.CTkScrollableFrame(frame, fg_color="transparent")
         self.product_results_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
     def _load_quick_products(self):
+        # El agregado sobre sale_items corre en el worker; se pinta al volver
+        self.worker.submit(self._query_quick_products, callback=self._show_quick_products,
+                           widget=self.quick_frame, name="pos.quick_products")
+
+    @staticmethod
+    def _query_quick_products(conn):
+        repo = ProductRepository(conn)
+        return repo.get_top_sold(limit=8) or repo.get_pos_shortcuts(limit=8)
+
+    def _show_quick_products(self, products):
         # limpiar y reconstruir (para evitar duplicados de grids)
         for w in self.quick_frame.winfo_children():
             w.destroy()
         ctk.CTkLabel(self.quick_frame, text="⚡ Frecuentes", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", padx=10, pady=5)
 
-        products = self.product_repo.get_top_sold(limit=8) or self.product_repo.get_pos_shortcuts(limit=8)
         if not products:
             ctk.CTkLabel(self.quick_frame, text="No configurados", text_color="gray70").pack(pady=5)
             return
@@ -164,19 +209,20 @@ class POSFrame(ctk.CTkFrame):
                 height=60, fg_color="#374151", hover_color="#2563EB"
             ).grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
 
-    def _on_search_products(self, event:None):
-        query = self.product_entry.get().strip()
+    def _find_products(self, query, limit):
+        return self.product_repo.find(query, limit=limit) if query else []
+
+    def _show_products(self, query, products):
         for w in self.product_results_frame.winfo_children():
             w.destroy()
         if not query:
             return
 
-        products = self.product_repo.search(query)
         if not products:
             ctk.CTkLabel(self.product_results_frame, text="No se encontraron productos", text_color="gray70").pack()
             return
 
-        for p in products[:5]:
+        for p in products:
             text = f"{p.sku} - {p.description} (${p.price:,.2f})"
             ctk.CTkButton(
                 self.product_results_frame, text=text,
@@ -184,6 +230,18 @@ class POSFrame(ctk.CTkFrame):
                 fg_color="gray30", height=35
             ).pack(fill="x", pady=2)
 
+    def _on_scan(self, code):
+        # Lector: un solo lookup por SKU en la caché del catálogo, sin pintar resultados
+        self.product_search.cancel()
+        self.search_product_var.set("")
+        for w in self.product_results_frame.winfo_children():
+            w.destroy()
+        product = self.product_repo.get_by_code(code)
+        if product and product.active:
+            self._add_to_cart(product)
+        else:
+            ctk.CTkLabel(self.product_results_frame, text=f"Código no encontrado: {code}", text_color="#EF4444").pack()
+
     # ---------- Panel carrito ----------
     def _build_cart_panel(self):
         frame = ctk.CTkFrame(self, fg_color="gray15", corner_radius=10)
@@ -192,6 +250,8 @@ class POSFrame(ctk.CTkFrame):
         ctk.CTkLabel(frame, text="🛒 Carrito", font=ctk.CTkFont(size=18, weight="bold")).pack(anchor="w", padx=10, pady=(10, 5))
         self.cart_frame = ctk.CTkScrollableFrame(frame, fg_color="gray20", corner_radius=8)
         self.cart_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.cart_table = CartTable(self.cart_frame, on_edit=self._edit_price, on_remove=self._remove_item)
+        self.cart_table.pack(fill="both", expand=True)
 
         # Totales
         self.label_totals = ctk.CTkLabel(frame, text="Subtotal: $0.00   IVA: $0.00", font=ctk.CTkFont(size=14))
@@ -209,113 +269,40 @@ class POSFrame(ctk.CTkFrame):
         else:
             self.payment_method.set(str(methods[0]["id"]))
             for pm in methods:
+                self.payment_method_names[str(pm["id"])] = pm["name"]
                 ctk.CTkRadioButton(
                     payment_frame,
                     text=f"{pm['name']} ({pm['code']})",
                     variable=self.payment_method,
-                    value=str(pm["id"])
+                    value=str(pm["id"]),
+                    command=self._refresh_preview
                 ).pack(anchor="w", pady=2)
 
         ctk.CTkButton(frame, text="💳 Cobrar", height=50, fg_color="#2CC985", command=self._on_pay).pack(anchor="e", padx=10, pady=(0, 10))
 
+        # Impresión en segundo plano: estado del último ticket y reimpresión
+        print_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        print_frame.pack(fill="x", padx=10, pady=(0, 10))
+        ctk.CTkButton(print_frame, text="🖨️ Reimprimir", width=110, height=30, fg_color="gray40",
+                      command=self._on_reprint).pack(side="right")
+        ctk.CTkButton(print_frame, text="👁️ Vista previa", width=110, height=30, fg_color="gray40",
+                      command=self._open_preview).pack(side="right", padx=(0, 5))
+        self.print_status_label = ctk.CTkLabel(print_frame, text="", text_color="gray70", font=ctk.CTkFont(size=12))
+        self.print_status_label.pack(side="left")
+
     # ---------- Carrito ----------    
     def _add_to_cart(self, product):
-        sku = product["sku"] if isinstance(product, dict) else product.sku
-        price = product["price"] if isinstance(product, dict) else product.price        
-        found = False
-        for item in self.cart:
-            if item["sku"] == sku and item["price"] == price:
-                item["qty"] += 1
-                found = True
-                break
-        if not found:
-            self.cart.append({
-                "sku": sku,
-                "description": product["description"] if isinstance(product, dict) else product.description,
-                "price": product["price"] if isinstance(product, dict) else product.price,
-                "tax_rate": product["tax_rate"] if isinstance(product, dict) else product.tax_rate,
-                "qty": 1
-            })
-        self._refresh_cart()
-
-    def _refresh_cart(self):
-        for w in self.cart_frame.winfo_children():
-            w.destroy()
-
-        if not self.cart:
-            ctk.CTkLabel(self.cart_frame, text="Carrito vacío", text_color="gray70").pack(pady=20)
-            self.label_totals.configure(text="Subtotal: $0.00   IVA: $0.00")
-            self.label_total_final.configure(text="Total: $0.00")
-            return
-
-        subtotal = 0
-        tax = 0
+        self.cart.add(product)
 
-        # Crear contenedor principal con grid
-        table_container = ctk.CTkFrame(self.cart_frame, fg_color="transparent")
-        table_container.pack(fill="both", expand=True)
-        
-        # Configurar columnas con anchos fijos/proporcionales
-        table_container.grid_columnconfigure(0, weight=4, minsize=200)  # Descripción
-        table_container.grid_columnconfigure(1, weight=1, minsize=60)   # Cantidad
-        table_container.grid_columnconfigure(2, weight=1, minsize=80)   # Precio Unitario
-        table_container.grid_columnconfigure(3, weight=1, minsize=80)   # Importe
-        table_container.grid_columnconfigure(4, weight=1, minsize=60)   # Editar
-        table_container.grid_columnconfigure(5, weight=1, minsize=60)   # Eliminar
-
-        # Encabezados - Fila 0
-        row = 0
-        ctk.CTkLabel(table_container, text="Descripción", font=ctk.CTkFont(size=13, weight="bold"), 
-                    anchor="w").grid(row=row, column=0, sticky="ew", padx=5, pady=(0, 10))
-        ctk.CTkLabel(table_container, text="Cant", font=ctk.CTkFont(size=13, weight="bold"), 
-                    anchor="center").grid(row=row, column=1, sticky="ew", padx=5, pady=(0, 10))
-        ctk.CTkLabel(table_container, text="P.U.", font=ctk.CTkFont(size=13, weight="bold"), 
-                    anchor="center").grid(row=row, column=2, sticky="ew", padx=5, pady=(0, 10))
-        ctk.CTkLabel(table_container, text="Importe", font=ctk.CTkFont(size=13, weight="bold"), 
-                    anchor="center").grid(row=row, column=3, sticky="ew", padx=5, pady=(0, 10))
-        ctk.CTkLabel(table_container, text="Acciones", font=ctk.CTkFont(size=13, weight="bold"), 
-                    anchor="center").grid(row=row, column=4, columnspan=2, sticky="ew", padx=5, pady=(0, 10))
+    def _on_cart_changed(self, event, key, line):
+        # Solo se reconfigura el renglón afectado; los totales ya vienen corridos
+        self.cart_table.apply(event, key, line)
+        self.label_totals.configure(text=f"Subtotal: ${self.cart.subtotal:,.2f}   IVA: ${self.cart.tax:,.2f}")
+        self.label_total_final.configure(text=f"Total: ${self.cart.total:,.2f}")
+        self._refresh_preview()
 
-        
-        row += 1
-
-        for idx, item in enumerate(self.cart):
-            # Acortar descripción si es muy larga
-            description = item["description"]
-            if len(description) > 35:
-                description = description[:32] + "..."
-
-            # Fila de producto
-            ctk.CTkLabel(table_container, text=description, font=ctk.CTkFont(size=13), 
-                        anchor="w").grid(row=row, column=0, sticky="ew", padx=5, pady=8)
-            ctk.CTkLabel(table_container, text=f"{item['qty']}", font=ctk.CTkFont(size=13), 
-                        anchor="center").grid(row=row, column=1, sticky="ew", padx=5, pady=8)
-            ctk.CTkLabel(table_container, text=f"${item['price']:,.2f}", font=ctk.CTkFont(size=13), 
-                        anchor="center").grid(row=row, column=2, sticky="ew", padx=5, pady=8)
-            ctk.CTkLabel(table_container, text=f"${item['qty'] * item['price']:,.2f}", 
-                        font=ctk.CTkFont(size=13, weight="bold"), anchor="center").grid(row=row, column=3, sticky="ew", padx=5, pady=8)
-
-            # Frame para botones (para mejor alineación)
-            btn_frame = ctk.CTkFrame(table_container, fg_color="transparent", width=120)
-            btn_frame.grid(row=row, column=4, columnspan=2, sticky="ew", padx=5)
-            btn_frame.grid_columnconfigure((0, 1), weight=1)
-            
-            ctk.CTkButton(btn_frame, text="✏️", width=35, height=30, fg_color="gray40",
-                        command=lambda i=idx: self._edit_price(i)).grid(row=0, column=0, padx=2)
-            ctk.CTkButton(btn_frame, text="❌", width=35, height=30, fg_color="#EF4444",
-                        command=lambda i=idx: self._remove_item(i)).grid(row=0, column=1, padx=2)
-            
-            row += 1
-
-            subtotal += item["price"] * item["qty"]
-            tax += item["price"] * item["qty"] * item["tax_rate"]
-
-        total = subtotal + tax
-        self.label_totals.configure(text=f"Subtotal: ${subtotal:,.2f}   IVA: ${tax:,.2f}")
-        self.label_total_final.configure(text=f"Total: ${total:,.2f}")
-
-    def _edit_price(self, index):
-        item = self.cart[index]
+    def _edit_price(self, key):
+        item = self.cart.get(key)
 
         popup = ctk.CTkToplevel(self)
         popup.title("Editar precio")
@@ -324,8 +311,8 @@ class POSFrame(ctk.CTkFrame):
         popup.grab_set()
         popup.focus()
 
-        ctk.CTkLabel(popup, text=f"{item['description']}", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=10)
-        new_price_var = ctk.StringVar(value=f"{item['price']:,.2f}")
+        ctk.CTkLabel(popup, text=f"{item.description}", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=10)
+        new_price_var = ctk.StringVar(value=f"{item.price:,.2f}")
         entry = ctk.CTkEntry(popup, textvariable=new_price_var, justify="center")
         entry.pack(pady=5)
         entry.focus()
@@ -335,18 +322,15 @@ class POSFrame(ctk.CTkFrame):
                 new_price = float(new_price_var.get())
                 if new_price <= 0:
                     raise ValueError
-                self.cart[index]["price"] = new_price
-                self._refresh_cart()
                 popup.destroy()
+                self.cart.set_price(key, new_price)
             except ValueError:
                 messagebox.showerror("Error", "Ingrese un precio válido")
 
         ctk.CTkButton(popup, text="Guardar", fg_color="#2CC985", command=save_price).pack(pady=10)
 
-    def _remove_item(self, index):
-        if 0 <= index < len(self.cart):
-            del self.cart[index]
-        self._refresh_cart()
+    def _remove_item(self, key):
+        self.cart.remove(key)
 
     # ---------- Pago ----------
     def _on_pay(self):
@@ -357,54 +341,120 @@ class POSFrame(ctk.CTkFrame):
             messagebox.showwarning("POS", "Debe seleccionar un alumno")
             return
 
-        subtotal = sum(i["price"] * i["qty"] for i in self.cart)
-        tax = sum(i["price"] * i["qty"] * i["tax_rate"] for i in self.cart)
-        total = subtotal + tax
+        subtotal, tax, total = self.cart.subtotal, self.cart.tax, self.cart.total
+        cart_items = self.cart.as_items()
 
         payment_method_id = int(self.payment_method.get())
-        sale_id = self.sale_repo.create_sale(
-            student=self.selected_student,
-            cart=self.cart,
-            seller=self.parent.current_user,
-            payment_method_id=payment_method_id,
-            amount=total
-        )
+        try:
+            sale_id, folio = self.sale_repo.create_sale(
+                student=self.selected_student,
+                cart=cart_items,
+                seller=self.parent.current_user,
+                payment_method_id=payment_method_id,
+                amount=total
+            )
+        except (sqlite3.Error, RuntimeError) as e:
+            # El carrito se conserva para reintentar el cobro
+            messagebox.showerror("POS", f"No se pudo registrar la venta:\n{e}")
+            return
 
         pm = self.pm_repo.get(payment_method_id)
         payment_method_name = pm["name"] if pm else f"ID {payment_method_id}"
-        folio = f"F{sale_id:04d}"
 
         if messagebox.askyesno("Venta procesada", f"Venta procesada con el folio {folio} en {payment_method_name}.\n\n¿Imprimir ticket?"):
-            printer = TicketPrinter()
-            items = [
-                {"description": i["description"], "qty": i["qty"], "unit_price": i["price"], "tax_rate": i["tax_rate"]}
-                for i in self.cart
-            ]
+            items = self._ticket_items(cart_items)
             totals = {"subtotal": subtotal, "tax": tax, "total": total}
 
-            # Business config debería venir de repositorio
-            business = {
-                "nombre": "LIBERTAD Y CREATIVIDAD",
-                "title": "PREESCOLAR LIBERTAD Y CREATIVIDAD A.C",
-                "clave": "CCT 11PJN08 39V",
-                "eslogan": "Educar con el corazón para llegar a la razón",
-                "rfc": "LCR030414IB8",
-                "direccion": "EL TUNEL 103-B, LA JOYA EJIDO, LEON, GTO. MX.",
-                "contacto": "TEL(S). 477-449-7752 / 477-290-8432",
-                "notas01": "Conserve su ticket para cualquier aclaración.",
-                "notas02": "Este ticket no es comprobante fiscal."
+            # El ticket se encola; el cobro no espera a la impresora
+            ticket = {
+                "header": {
+                    "folio": folio,
+                    "student": f"{self.selected_student.first_name} {self.selected_student.second_name or ''}",
+                    "enrollment": self.selected_student.enrollment,
+                    "date": datetime.now().strftime("%d/%m/%Y %H:%M"),
+                },
+                "items": items,
+                "totals": totals,
+                "payment_method": payment_method_name,
+                "business": TICKET_BUSINESS,
             }
+            self.spooler.submit(folio, ticket, widget=self, on_status=self._on_print_status)
 
-            printer.print_ticket(
-                header={"folio": folio, "student": f"{self.selected_student.first_name} {self.selected_student.second_name or ''}", "enrollment": self.selected_student.enrollment},
-                items=items,
-                totals=totals,
-                payment_method=payment_method_name,
-                business=business
+        self.cart.clear()
+
+    @staticmethod
+    def _ticket_items(cart_items):
+        return [
+            {"description": i["description"], "qty": i["qty"], "unit_price": i["price"], "tax_rate": i["tax_rate"]}
+            for i in cart_items
+        ]
+
+    # ---------- Vista previa ----------
+    def _open_preview(self):
+        if self.preview_window is not None and self.preview_window.winfo_exists():
+            self.preview_window.focus()
+            return
+        self.preview_window = ctk.CTkToplevel(self)
+        self.preview_window.title("Vista previa del ticket")
+        self.preview_window.geometry("440x720")
+        self.preview_window.transient(self)
+        frame = ctk.CTkScrollableFrame(self.preview_window, fg_color="white", corner_radius=0)
+        frame.pack(fill="both", expand=True)
+        self.preview_label = ctk.CTkLabel(frame, text="")
+        self.preview_label.pack(pady=10)
+        self._refresh_preview()
+
+    def _refresh_preview(self):
+        # Se rehace en cada cambio del carrito: mismos bytes que la impresora, por el emulador
+        if self.preview_window is None or not self.preview_window.winfo_exists():
+            return
+        if self.preview_printer is None:
+            self.preview_printer = TicketPrinter(transport="memory:preview")
+
+        student = self.selected_student
+        img = self.preview_printer.preview_image(
+            header={
+                "folio": "(vista previa)",
+                "student": f"{student.first_name} {student.second_name or ''}" if student else "",
+                "enrollment": student.enrollment if student else "",
+                "date": datetime.now().strftime("%d/%m/%Y %H:%M"),
+            },
+            items=self._ticket_items(self.cart.as_items()),
+            totals={"subtotal": self.cart.subtotal, "tax": self.cart.tax, "total": self.cart.total},
+            payment_method=self.payment_method_names.get(self.payment_method.get(), ""),
+            business=TICKET_BUSINESS
+        ).convert("L")
+        width = 400
+        size = (width, round(img.height * width / img.width))
+        self.preview_image = ctk.CTkImage(light_image=img, dark_image=img, size=size)
+        self.preview_label.configure(image=self.preview_image)
+
+    # ---------- Impresión ----------
+    def _on_print_status(self, job):
+        if job.status == DONE:
+            self.print_status_label.configure(text=f"🖨️ Ticket {job.folio} impreso", text_color="gray70")
+        elif job.status == RETRYING:
+            self.print_status_label.configure(
+                text=f"⚠️ Reintentando ticket {job.folio} ({job.attempts}/{self.spooler.max_attempts})",
+                text_color="#F59E0B"
             )
+        elif job.status == FAILED:
+            self.print_status_label.configure(text=f"❌ Ticket {job.folio} sin imprimir", text_color="#EF4444")
+            messagebox.showerror(
+                "Impresión",
+                f"No se pudo imprimir el ticket {job.folio}:\n{job.error}\n\nPuede reimprimirlo con el folio."
+            )
+        else:
+            self.print_status_label.configure(text=f"🖨️ Imprimiendo ticket {job.folio}...", text_color="gray70")
 
-        self.cart = []
-        self._refresh_cart()
+    def _on_reprint(self):
+        folio = ctk.CTkInputDialog(text="Folio de la venta:", title="Reimprimir ticket").get_input()
+        if not folio or not folio.strip():
+            return
+        try:
+            self.spooler.reprint(self.sale_repo, folio, TICKET_BUSINESS, widget=self, on_status=self._on_print_status)
+        except ValueError as e:
+            messagebox.showwarning("Reimprimir", str(e))
 
     # ---------- Back ----------
     def _back_to_menu(self):
@@ -3,6 +3,88 @@ import customtkinter as ctk
 from tkinter import messagebox
 from models.product import Product
 from repositories.product_repo import ProductRepository
+from ui.virtual_list import VirtualGrid
+from ui.search_controller import SearchController
+from services.db_worker import DBWorker
+
+# Máximo de resultados por búsqueda en el listado
+SEARCH_LIMIT = 200
+
+
+class ProductCard(ctk.CTkFrame):
+    """Tarjeta reciclable del listado de productos."""
+
+    def __init__(self, parent, screen):
+        super().__init__(parent, corner_radius=10, border_width=1)
+        self.screen = screen
+        self.product = None
+        self._default_colors = (self.cget("border_color"), self.cget("fg_color"))
+
+        inner = ctk.CTkFrame(self, fg_color="transparent")
+        inner.pack(fill="both", expand=True, padx=12, pady=10)
+
+        self.title = ctk.CTkLabel(inner, font=screen.card_font, anchor="w")
+        self.title.pack(fill="x", pady=(0, 5))
+
+        # Info del producto
+        self.info = ctk.CTkLabel(inner, text_color="gray70")
+        self.info.pack(anchor="w", pady=(2, 8))
+
+        # Botones de acción
+        actions = ctk.CTkFrame(inner, fg_color="transparent")
+        actions.pack(fill="x")
+
+        # Botón para fijar/desfijar en POS
+        self.shortcut_btn = ctk.CTkButton(
+            actions, height=28, width=90,
+            fg_color="#F59E0B", command=lambda: screen._toggle_shortcut(self.product)
+        )
+        self.shortcut_btn.pack(side="right", padx=(5, 0))
+
+        # Botón editar
+        ctk.CTkButton(
+            actions, text="✏️ Editar", height=28, width=90,
+            fg_color="gray40", command=lambda: screen._show_form_edit(self.product.sku)
+        ).pack(side="right", padx=(5, 0))
+
+        # Botón activar/desactivar
+        self.toggle_btn = ctk.CTkButton(
+            actions, height=28, width=110,
+            command=lambda: screen._toggle_active(self.product.sku, self.product.active)
+        )
+        self.toggle_btn.pack(side="right", padx=(5, 0))
+
+    def bind_item(self, p: Product):
+        self.product = p
+
+        # Cambiar color de borde para productos inactivos
+        if p.active:
+            self.configure(border_color=self._default_colors[0], fg_color=self._default_colors[1])
+        else:
+            self.configure(border_color="#EF4444", fg_color="#4d4c4c")
+
+        title = f"{p.sku} — {p.description}"
+
+        # Indicadores visuales
+        indicators = []
+        if getattr(p, "is_pos_shortcut", False):
+            indicators.append("📌 POS")
+        if getattr(p, "print_logo", False):
+            indicators.append("🖨️ Logo")
+        if not p.active:
+            indicators.append("❌ INACTIVO")
+
+        if indicators:
+            title += "   " + " • ".join(indicators)
+
+        self.title.configure(text=title)
+        self.info.configure(text=f"💲 {p.price:.2f}  •  IVA {int(p.tax_rate*100)}%  •  {p.unit}  •  {p.kind}")
+        self.shortcut_btn.configure(text="📌 Desfijar" if p.is_pos_shortcut else "📌 Fijar")
+
+        if p.active:
+            self.toggle_btn.configure(text="🚫 Desactivar", fg_color="#EF4444", hover_color="#DC2626")
+        else:
+            self.toggle_btn.configure(text="✅ Activar", fg_color="#10B981", hover_color="#059669")
 
 
 class ProductsFrame(ctk.CTkFrame):
@@ -10,6 +92,7 @@ class ProductsFrame(ctk.CTkFrame):
         super().__init__(parent, fg_color="transparent")
         self.parent = parent
         self.repo = ProductRepository(db_connection)
+        self.worker = DBWorker.shared(db_connection)
         self.current_sku = None
         self.show_inactive = False 
         
@@ -66,7 +149,11 @@ class ProductsFrame(ctk.CTkFrame):
             placeholder_text="Buscar por SKU o descripción..."
         )
         ent.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        ent.bind("<KeyRelease>", self._on_search)
+        self.search_controller = SearchController(
+            ent, search=self._query_products,
+            render=self._show_products, delay_ms=250, limit=SEARCH_LIMIT,
+            worker=self.worker
+        )
 
         ctk.CTkButton(
             self.search_frame, text="🔍 Buscar", height=40,
@@ -89,9 +176,13 @@ class ProductsFrame(ctk.CTkFrame):
         )
         self.count_label.pack(anchor="w", padx=10, pady=(5, 0))
 
-        # Lista
-        self.list_frame = ctk.CTkScrollableFrame(left_panel, fg_color="transparent")
-        self.list_frame.pack(fill="both", expand=True)
+        # Lista virtualizada: solo existen las tarjetas visibles
+        self.card_font = ctk.CTkFont(weight="bold")
+        self.list_view = VirtualGrid(
+            left_panel, card_factory=lambda parent: ProductCard(parent, self),
+            row_height=140, columns=2
+        )
+        self.list_view.pack(fill="both", expand=True)
 
         # Panel derecho (formulario/placeholder)
         self.form_frame = ctk.CTkFrame(self.body, fg_color="transparent")
@@ -145,111 +236,34 @@ class ProductsFrame(ctk.CTkFrame):
     # -------- LISTA --------
     def _load_products(self, query: str = ""):
         """Carga productos con opción de incluir inactivos"""
-        for w in self.list_frame.winfo_children():
-            w.destroy()
-        
+        self.search_controller.submit(query)
+
+    def _query_products(self, conn, query: str, limit):
+        # Corre en el hilo del worker: repositorio sobre su propia conexión
+        repo = ProductRepository(conn)
         # Usar active_only=False cuando show_inactive es True
-        items = self.repo.search(query, active_only=not self.show_inactive) if query else self.repo.list_all(active_only=not self.show_inactive)
+        if query:
+            return repo.search(query, active_only=not self.show_inactive, limit=limit)
+        return repo.list_all(active_only=not self.show_inactive)
 
+    def _show_products(self, query: str, items):
         # Actualizar contador - NUEVO
         active_count = len([p for p in items if p.active])
         inactive_count = len([p for p in items if not p.active])
         
         if self.show_inactive:
-            self.count_label.configure(
-                text=f"Mostrando {len(items)} productos ({active_count} activos, {inactive_count} inactivos)"
-            )
-        else:
-            self.count_label.configure(
-                text=f"Mostrando {len(items)} productos activos"
-            )
-
-        if not items:
-            no_products_text = "Sin productos" if not self.show_inactive else "Sin productos (activos o inactivos)"
-            ctk.CTkLabel(self.list_frame, text=no_products_text, text_color="gray60").pack(pady=40)
-            return
-
-        self.list_frame.grid_columnconfigure((0, 1), weight=1, uniform="col")
-
-        for idx, p in enumerate(items):
-            row = idx // 2
-            col = idx % 2
-            card = self._product_card(p)
-            card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-    def _product_card(self, p: Product):
-        """Crea una tarjeta de producto con indicador de estado"""
-        card = ctk.CTkFrame(self.list_frame, corner_radius=10, border_width=1)
-        
-        # Cambiar color de borde para productos inactivos
-        if not p.active:
-            card.configure(border_color="#EF4444", fg_color="#4d4c4c")
-
-        inner = ctk.CTkFrame(card, fg_color="transparent")
-        inner.pack(fill="both", expand=True, padx=12, pady=10)
-
-        # Header de la tarjeta con indicador de estado
-        header_frame = ctk.CTkFrame(inner, fg_color="transparent")
-        header_frame.pack(fill="x", pady=(0, 5))
-
-        title = f"{p.sku} — {p.description}"
-        
-        # Indicadores visuales
-        indicators = []
-        if getattr(p, "is_pos_shortcut", False):
-            indicators.append("📌 POS")
-        if getattr(p, "print_logo", False):
-            indicators.append("🖨️ Logo")
-        if not p.active:
-            indicators.append("❌ INACTIVO")
-
-        if indicators:
-            title += "   " + " • ".join(indicators)
-
-        ctk.CTkLabel(header_frame, text=title, font=ctk.CTkFont(weight="bold")).pack(side="left")
-        
-        # Info del producto
-        ctk.CTkLabel(
-            inner,
-            text=f"💲 {p.price:.2f}  •  IVA {int(p.tax_rate*100)}%  •  {p.unit}  •  {p.kind}",
-            text_color="gray70"
-        ).pack(anchor="w", pady=(2, 8))
-
-        # Botones de acción
-        actions = ctk.CTkFrame(inner, fg_color="transparent")
-        actions.pack(fill="x")
-
-        # Botón para fijar/desfijar en POS
-        text_shortcut = "📌 Desfijar" if p.is_pos_shortcut else "📌 Fijar"
-        ctk.CTkButton(
-            actions, text=text_shortcut, height=28, width=90,
-            fg_color="#F59E0B", command=lambda: self._toggle_shortcut(p)
-        ).pack(side="right", padx=(5, 0))
-
-        # Botón editar
-        ctk.CTkButton(
-            actions, text="✏️ Editar", height=28, width=90,
-            fg_color="gray40", command=lambda sku=p.sku: self._show_form_edit(sku)
-        ).pack(side="right", padx=(5, 0))
-
-        # Botón activar/desactivar - MEJORADO
-        if p.active:
-            ctk.CTkButton(
-                actions, text="🚫 Desactivar", height=28, width=110,
-                fg_color="#EF4444", hover_color="#DC2626",
-                command=lambda sku=p.sku: self._toggle_active(sku, True)
-            ).pack(side="right", padx=(5, 0))
+            text = f"Mostrando {len(items)} productos ({active_count} activos, {inactive_count} inactivos)"
         else:
-            ctk.CTkButton(
-                actions, text="✅ Activar", height=28, width=110,
-                fg_color="#10B981", hover_color="#059669",
-                command=lambda sku=p.sku: self._toggle_active(sku, False)
-            ).pack(side="right", padx=(5, 0))
+            text = f"Mostrando {len(items)} productos activos"
+        if query and len(items) >= SEARCH_LIMIT:
+            text += f" (primeros {SEARCH_LIMIT})"
+        self.count_label.configure(text=text)
 
-        return card
+        no_products_text = "Sin productos" if not self.show_inactive else "Sin productos (activos o inactivos)"
+        self.list_view.set_items(items, empty_text=no_products_text)
 
     def _on_search(self, event=None):
-        self._load_products(self.q_var.get().strip())
+        self.search_controller.trigger()
 
     def _show_all(self, event=None):
         self._show_all_products()
@@ -0,0 +1,96 @@
+# ui/search_controller.py
+"""
+Controlador común para las cajas de búsqueda.
+
+- Debounce: la consulta corre cuando el usuario deja de teclear delay_ms.
+- Ignora teclas que no editan (flechas, Shift, Ctrl, Tab...) y las que no
+  cambian el texto.
+- Cada consulta lleva un número de generación; un resultado cuya
+  generación ya no es la vigente se descarta, así una respuesta vieja nunca
+  pisa a una más nueva.
+- search(query, limit) recibe el top-k que se va a pintar. Con worker
+  (services.db_worker.DBWorker) corre en el hilo de BD como
+  search(conn, query, limit) y la consulta vieja se interrumpe.
+"""
+
+# Teclas que nunca cambian el texto de la caja
+_NON_EDITING_KEYS = {
+    "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R",
+    "Meta_L", "Meta_R", "Super_L", "Super_R", "Caps_Lock", "Num_Lock",
+    "Left", "Right", "Up", "Down", "Home", "End", "Prior", "Next",
+    "Tab", "ISO_Left_Tab", "Escape", "Return", "KP_Enter", "Insert",
+}
+
+
+class SearchController:
+    def __init__(self, entry, search, render, delay_ms: int = 200, limit=None, worker=None):
+        self.entry = entry
+        self.search = search
+        self.render = render
+        self.delay_ms = delay_ms
+        self.limit = limit
+        self.worker = worker
+        self._generation = 0
+        self._pending = None
+        self._job = None
+        self._last_query = None
+
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+
+    def _query(self) -> str:
+        return self.entry.get().strip()
+
+    def _on_key(self, event):
+        if event.keysym in _NON_EDITING_KEYS:
+            return
+        query = self._query()
+        if query == self._last_query:
+            return
+        self._schedule(self.delay_ms)
+
+    def trigger(self):
+        """Busca ya (botón Buscar), sin esperar el debounce."""
+        self._schedule(0)
+
+    def submit(self, query: str):
+        """Corre una consulta explícita (p. ej. recargar el listado) en la misma secuencia."""
+        self.cancel()
+        self._start(query, self._generation)
+
+    def cancel(self):
+        """Descarta lo pendiente y lo que venga en camino (p. ej. tras un escaneo)."""
+        self._generation += 1
+        self._last_query = None
+        if self._pending is not None:
+            self.entry.after_cancel(self._pending)
+            self._pending = None
+        if self._job is not None:
+            self.worker.cancel(self._job)
+            self._job = None
+
+    def _schedule(self, delay_ms: int):
+        self.cancel()
+        self._last_query = self._query()
+        self._pending = self.entry.after(delay_ms, self._run, self._generation)
+
+    def _run(self, generation: int):
+        self._pending = None
+        if generation != self._generation:
+            return
+        self._start(self._query(), generation)
+
+    def _start(self, query: str, generation: int):
+        if self.worker is None:
+            self.deliver(generation, query, self.search(query, self.limit))
+            return
+        self._job = self.worker.submit(
+            self.search, query, self.limit,
+            callback=lambda results: self.deliver(generation, query, results),
+            widget=self.entry, name=getattr(self.search, "__name__", "search")
+        )
+
+    def deliver(self, generation: int, query: str, results):
+        """Entrega resultados solo si siguen siendo los de la última consulta."""
+        if generation != self._generation:
+            return
+        self.render(query, results)
@@ -3,10 +3,103 @@ import customtkinter as ctk
 from tkinter import messagebox
 from models.student import Student
 from repositories.student_repo import StudentRepository
-from repositories.tutor_repo import TutorRepository 
+from repositories.tutor_repo import TutorRepository
+from repositories.educational_repo import EducationalRepository
 from ui.tutors import TutorsFrame
+from ui.virtual_list import VirtualGrid
+from ui.search_controller import SearchController
+from services.db_worker import DBWorker
 from shared.utils import char_limit_validator
 
+# Máximo de resultados por búsqueda en el listado
+SEARCH_LIMIT = 200
+
+
+class StudentCard(ctk.CTkFrame):
+    """Tarjeta reciclable del listado; bind_item la llena con otro alumno."""
+
+    def __init__(self, parent, screen):
+        super().__init__(parent, corner_radius=10, border_width=1)
+        self.screen = screen
+        self.student = None
+        self._default_colors = (self.cget("border_color"), self.cget("fg_color"))
+
+        info_frame = ctk.CTkFrame(self, fg_color="transparent")
+        info_frame.pack(fill="both", expand=True, padx=15, pady=10)
+
+        self.title = ctk.CTkLabel(info_frame, font=screen.card_fonts["title"])
+        self.title.pack(anchor="w", pady=(0, 5))
+
+        # Renglones opcionales: se vuelven a empacar en orden en cada bind
+        self.educational = ctk.CTkLabel(info_frame, font=screen.card_fonts["small"], text_color="#3B82F6")
+        self.name = ctk.CTkLabel(info_frame, font=screen.card_fonts["name"])
+        self.curp = ctk.CTkLabel(info_frame, font=screen.card_fonts["small"], text_color="gray60")
+        self.tutor = ctk.CTkLabel(info_frame, font=screen.card_fonts["small"], text_color="gray60")
+        self.phone = ctk.CTkLabel(info_frame, font=screen.card_fonts["small"], text_color="gray60")
+        self._lines = (self.educational, self.name, self.curp, self.tutor, self.phone)
+
+        action_frame = ctk.CTkFrame(self, fg_color="transparent")
+        action_frame.pack(fill="x", padx=15, pady=(5, 10))
+
+        ctk.CTkButton(
+            action_frame, text="✏️ Editar",
+            command=lambda: screen.edit_student(self.student),
+            height=30, width=80, fg_color="gray40"
+        ).pack(side="right", padx=(5, 0))
+
+        ctk.CTkButton(
+            action_frame,
+            text="👥 Tutores",
+            command=lambda: screen.manage_tutors(self.student),
+            height=30, width=80, fg_color="#2b3d78"
+        ).pack(side="right", padx=(5, 0))
+
+        # Botón activar/desactivar
+        self.toggle_btn = ctk.CTkButton(
+            action_frame, height=30, width=100,
+            command=lambda: screen._toggle_active(self.student, self.student.active)
+        )
+        self.toggle_btn.pack(side="right", padx=(5, 0))
+
+    def bind_item(self, student):
+        self.student = student
+
+        # Cambiar color de borde para alumnos inactivos
+        if student.active:
+            self.configure(border_color=self._default_colors[0], fg_color=self._default_colors[1])
+        else:
+            self.configure(border_color="#EF4444", fg_color="#FEF2F2")
+
+        title_text = f"{student.enrollment}"
+        if not student.active:
+            title_text += " ❌ INACTIVO"
+        self.title.configure(text=title_text)
+
+        # Información educativa y tutor principal ya vienen en el listado (get_listing)
+        educational_info = [f"{icon} {name}" for name, icon in ((student.grade_name, "🎓"),
+                                                                (student.group_name, "👥"),
+                                                                (student.shift_name, "⏰")) if name]
+        primary_tutor = student.primary_tutor
+
+        texts = (
+            " • ".join(educational_info),
+            f"{student.first_name} {student.second_name or ''}",
+            f"CURP: {student.curp}" if student.curp else "",
+            f"👤 {primary_tutor.full_name()} ({primary_tutor.relationship})" if primary_tutor else "",
+            f"📱{primary_tutor.formart_phonenumber()}" if primary_tutor else "",
+        )
+        for label in self._lines:
+            label.pack_forget()
+        for label, text in zip(self._lines, texts):
+            if text:
+                label.configure(text=text)
+                label.pack(anchor="w", pady=(2, 0))
+
+        if student.active:
+            self.toggle_btn.configure(text="🚫 Desactivar", fg_color="#EF4444", hover_color="#DC2626")
+        else:
+            self.toggle_btn.configure(text="✅ Activar", fg_color="#10B981", hover_color="#059669")
+
 
 class StudentsFrame(ctk.CTkFrame):
     def __init__(self, parent, db_connection):
@@ -15,6 +108,8 @@ class StudentsFrame(ctk.CTkFrame):
         self.db_connection = db_connection
         self.repo = StudentRepository(db_connection)
         self.tutor_repo = TutorRepository(db_connection)
+        self.educational_repo = EducationalRepository(db_connection)
+        self.worker = DBWorker.shared(db_connection)
         self.current_student = None
         self.show_inactive = False  # Nuevo estado para controlar la vista
 
@@ -76,7 +171,11 @@ class StudentsFrame(ctk.CTkFrame):
             width=int(frame_width * 0.5)
         )
         self.search_entry.pack(side="left", fill="x", padx=(0, 10))
-        self.search_entry.bind("<KeyRelease>", self.on_search)
+        self.search_controller = SearchController(
+            self.search_entry, search=self._query_students,
+            render=self._show_students, delay_ms=250, limit=SEARCH_LIMIT,
+            worker=self.worker
+        )
 
         ctk.CTkButton(
             self.search_frame, text="🔍 Buscar",
@@ -99,9 +198,17 @@ class StudentsFrame(ctk.CTkFrame):
         )
         self.count_label.pack(anchor="w", padx=10, pady=(5, 0))
 
-        # Lista
-        self.list_frame = ctk.CTkScrollableFrame(left_panel, fg_color="transparent")
-        self.list_frame.pack(fill="both", expand=True)
+        # Lista virtualizada: solo existen las tarjetas visibles
+        self.card_fonts = {
+            "title": ctk.CTkFont(size=16, weight="bold"),
+            "name": ctk.CTkFont(size=14),
+            "small": ctk.CTkFont(size=12),
+        }
+        self.list_view = VirtualGrid(
+            left_panel, card_factory=lambda parent: StudentCard(parent, self),
+            row_height=220, columns=2
+        )
+        self.list_view.pack(fill="both", expand=True)
 
         # Panel derecho (formulario o placeholder)
         self.form_frame = ctk.CTkFrame(self.body, fg_color="transparent")
@@ -144,81 +251,38 @@ class StudentsFrame(ctk.CTkFrame):
             w.destroy()
 
     def load_students(self):
-        for w in self.list_frame.winfo_children():
-            w.destroy()
+        self.search_controller.submit("")
 
+    def on_search(self, event=None):
+        self.search_controller.trigger()
+
+    def _query_students(self, conn, query: str, limit):
+        # Corre en el hilo del worker: repositorio sobre su propia conexión
+        repo = StudentRepository(conn)
         # Usar active_only=False cuando show_inactive es True
-        students = self.repo.get_all(active_only=not self.show_inactive)
+        return repo.get_listing(query, active_only=not self.show_inactive, limit=limit if query else None)
 
-        # Actualizar contador - NUEVO
+    def _show_students(self, query: str, students):
+        # Actualizar contador
         active_count = len([s for s in students if s.active])
         inactive_count = len([s for s in students if not s.active])
-        
-        if self.show_inactive:
-            self.count_label.configure(
-                text=f"Mostrando {len(students)} alumnos ({active_count} activos, {inactive_count} inactivos)"
-            )
-        else:
-            self.count_label.configure(
-                text=f"Mostrando {len(students)} alumnos activos"
-            )
-
-        if not students:
-            no_students_text = "No hay alumnos registrados" if not self.show_inactive else "No hay alumnos (activos o inactivos)"
-            ctk.CTkLabel(
-                self.list_frame, text=no_students_text,
-                text_color="gray60", font=ctk.CTkFont(size=14)
-            ).pack(pady=50)
-            return
+        verb = "Encontrados" if query else "Mostrando"
 
-        self.list_frame.grid_columnconfigure((0, 1), weight=1, uniform="col")
-
-        for idx, student in enumerate(students):
-            row = idx // 2
-            col = idx % 2
-            card = self.create_student_card(student)
-            card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-    def on_search(self, event=None):
-        query = self.search_var.get().strip()
-        if not query:
-            self.load_students()
-            return
-        
-        for widget in self.list_frame.winfo_children():
-            widget.destroy()
-        
-        # Pasar active_only=False cuando se muestran inactivos
-        students = self.repo.search(query, active_only=not self.show_inactive)
-        
-        # Actualizar contador en búsqueda también
-        active_count = len([s for s in students if s.active])
-        inactive_count = len([s for s in students if not s.active])
-        
         if self.show_inactive:
-            self.count_label.configure(
-                text=f"Encontrados {len(students)} alumnos ({active_count} activos, {inactive_count} inactivos)"
-            )
+            text = f"{verb} {len(students)} alumnos ({active_count} activos, {inactive_count} inactivos)"
         else:
-            self.count_label.configure(
-                text=f"Encontrados {len(students)} alumnos activos"
-            )
-        
-        if not students:
-            ctk.CTkLabel(
-                self.list_frame,
-                text=f"No se encontraron alumnos para '{query}'",
-                text_color="gray60",
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=50)
-            return
-        
-        self.list_frame.grid_columnconfigure((0, 1), weight=1, uniform="col")
-        for idx, student in enumerate(students):
-            row = idx // 2
-            col = idx % 2
-            card = self.create_student_card(student)
-            card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
+            text = f"{verb} {len(students)} alumnos activos"
+        if query and len(students) >= SEARCH_LIMIT:
+            text += f" (primeros {SEARCH_LIMIT})"
+        self.count_label.configure(text=text)
+
+        if query:
+            empty_text = f"No se encontraron alumnos para '{query}'"
+        elif self.show_inactive:
+            empty_text = "No hay alumnos (activos o inactivos)"
+        else:
+            empty_text = "No hay alumnos registrados"
+        self.list_view.set_items(students, empty_text=empty_text)
 
     def go_back_to_menu(self):
         for widget in self.parent.winfo_children():
@@ -230,114 +294,6 @@ class StudentsFrame(ctk.CTkFrame):
         menu_frame = MainMenu(self.parent, self.parent.current_user)
         menu_frame.pack(fill="both", expand=True)
 
-    def create_student_card(self, student):
-        card = ctk.CTkFrame(self.list_frame, corner_radius=10, border_width=1)
-        
-        # Cambiar color de borde para alumnos inactivos
-        if not student.active:
-            card.configure(border_color="#EF4444", fg_color="#FEF2F2")
-
-        info_frame = ctk.CTkFrame(card, fg_color="transparent")
-        info_frame.pack(fill="both", expand=True, padx=15, pady=10)
-
-        # Header con indicadores
-        header_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-        header_frame.pack(fill="x", pady=(0, 5))
-
-        title_text = f"{student.enrollment}"
-        if not student.active:
-            title_text += " ❌ INACTIVO"
-
-        ctk.CTkLabel(
-            header_frame,
-            text=title_text,
-            font=ctk.CTkFont(size=16, weight="bold")
-        ).pack(anchor="w")
-
-        # Información educativa si está disponible
-        educational_info = []
-        if student.grade_id:
-            grade_name = self._get_educational_name(student.grade_id, 'grade')
-            if grade_name:
-                educational_info.append(f"🎓 {grade_name}")
-        
-        if student.group_id:
-            group_name = self._get_educational_name(student.group_id, 'group')
-            if group_name:
-                educational_info.append(f"👥 {group_name}")
-        
-        if student.shift_id:
-            shift_name = self._get_educational_name(student.shift_id, 'shift')
-            if shift_name:
-                educational_info.append(f"⏰ {shift_name}")
-        
-        if educational_info:
-            ctk.CTkLabel(
-                info_frame,
-                text=" • ".join(educational_info),
-                font=ctk.CTkFont(size=12),
-                text_color="#3B82F6"
-            ).pack(anchor="w", pady=(2, 0))
-
-        ctk.CTkLabel(
-            info_frame,
-            text=f"{student.first_name} {student.second_name or ''}",
-            font=ctk.CTkFont(size=14)
-        ).pack(anchor="w")
-
-        if student.curp:
-            ctk.CTkLabel(
-                info_frame, text=f"CURP: {student.curp}",
-                font=ctk.CTkFont(size=12), text_color="gray60"
-            ).pack(anchor="w", pady=(2, 0))
-
-        tutors = self.tutor_repo.get_by_student(student.student_id)
-        primary_tutor = next((t for t in tutors if t.is_primary), None)
-        if primary_tutor:
-            ctk.CTkLabel(
-                info_frame,
-                text=f"👤 {primary_tutor.full_name()} ({primary_tutor.relationship})",
-                font=ctk.CTkFont(size=12), text_color="gray60"
-            ).pack(anchor="w", pady=(2, 0))
-
-            ctk.CTkLabel(
-                info_frame,
-                text=f"📱{primary_tutor.formart_phonenumber()}",
-                font=ctk.CTkFont(size=12), text_color="gray60"
-            ).pack(anchor="w", pady=(2, 0))
-                
-        action_frame = ctk.CTkFrame(card, fg_color="transparent")
-        action_frame.pack(fill="x", padx=15, pady=(5, 10))
-
-        ctk.CTkButton(
-            action_frame, text="✏️ Editar",
-            command=lambda s=student: self.edit_student(s),
-            height=30, width=80, fg_color="gray40"
-        ).pack(side="right", padx=(5, 0))
-
-        ctk.CTkButton(
-            action_frame, 
-            text="👥 Tutores",
-            command=lambda s=student: self.manage_tutors(s),
-            height=30, width=80, fg_color="#2b3d78"
-        ).pack(side="right", padx=(5, 0))
-
-        # Botón activar/desactivar
-        if student.active:
-            ctk.CTkButton(
-                action_frame, text="🚫 Desactivar", height=30, width=100,
-                fg_color="#EF4444", hover_color="#DC2626",
-                command=lambda s=student: self._toggle_active(s, True)
-            ).pack(side="right", padx=(5, 0))
-        else:
-            ctk.CTkButton(
-                action_frame, text="✅ Activar", height=30, width=100,
-                fg_color="#10B981", hover_color="#059669",
-                command=lambda s=student: self._toggle_active(s, False)
-            ).pack(side="right", padx=(5, 0))
-
-        return card
-
     def _toggle_active(self, student: Student, currently_active: bool):
         """Activa o desactiva un alumno con confirmación"""
         if currently_active:
@@ -550,13 +506,11 @@ class StudentsFrame(ctk.CTkFrame):
 
     def _get_educational_options(self):
         """Obtiene las opciones para los combobox educativos"""
-        from repositories.educational_repo import EducationalRepository
-        repo = EducationalRepository(self.db_connection)
-        
-        grades = repo.get_all_grades()
-        groups = repo.get_all_groups() 
-        shifts = repo.get_all_shifts()
-        
+        catalogs = self.educational_repo.catalogs()
+        grades = catalogs['grade'].values()
+        groups = catalogs['group'].values()
+        shifts = catalogs['shift'].values()
+
         grade_options = [""] + [f"{grade.name} ({grade.id})" for grade in grades]
         group_options = [""] + [f"{group.name} ({group.id})" for group in groups]
         shift_options = [""] + [f"{shift.name} ({shift.id})" for shift in shifts]
@@ -565,19 +519,7 @@ class StudentsFrame(ctk.CTkFrame):
 
     def _get_educational_name(self, educational_id: int, educational_type: str) -> str:
         """Obtiene el nombre de un grado, grupo o turno por su ID"""
-        from repositories.educational_repo import EducationalRepository
-        repo = EducationalRepository(self.db_connection)
-        
         try:
-            if educational_type == 'grade':
-                grade = repo.get_grade_by_id(educational_id)
-                return grade.name if grade else ""
-            elif educational_type == 'group':
-                group = repo.get_group_by_id(educational_id)
-                return group.name if group else ""
-            elif educational_type == 'shift':
-                shift = repo.get_shift_by_id(educational_id)
-                return shift.name if shift else ""
-            return ""
+            return self.educational_repo.get_name(educational_type, educational_id)
         except Exception:
             return ""
@@ -0,0 +1,163 @@
+# ui/virtual_list.py
+"""
+Lista/cuadrícula virtualizada para listados largos (alumnos, productos).
+
+Solo existen widgets para los renglones visibles más un pequeño margen.
+Las tarjetas viven como ventanas de un Canvas; al desplazarse, las que
+salen de la vista regresan a un pool y se vuelven a usar con bind_item()
+para los elementos que entran. Abrir o filtrar un listado de cientos de
+registros cuesta lo mismo que uno de veinte.
+
+card_factory(parent) debe regresar un widget con bind_item(item).
+Las tarjetas tienen alto fijo (row_height) para poder calcular qué
+elementos caen en la vista sin medir widgets.
+"""
+import math
+import tkinter as tk
+import customtkinter as ctk
+
+
+class VirtualGrid(ctk.CTkFrame):
+    def __init__(self, parent, card_factory, row_height: int, columns: int = 1,
+                 buffer_rows: int = 2, gap: int = 10):
+        super().__init__(parent, fg_color="transparent")
+        self.card_factory = card_factory
+        self.row_height = row_height
+        self.columns = columns
+        self.buffer_rows = buffer_rows
+        self.gap = gap
+
+        self._items = []
+        self._visible = {}   # índice -> (tarjeta, id de ventana)
+        self._pool = []      # (tarjeta, id de ventana) ocultas
+        self._column_width = 1
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, borderwidth=0,
+                                bg=self._apply_appearance_mode(self._bg_color),
+                                yscrollincrement=20)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self._empty = ctk.CTkLabel(self, text="", text_color="gray60", font=ctk.CTkFont(size=14))
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        # Igual que CTkScrollableFrame: rueda global filtrada por descendencia.
+        # Los enlaces a "all" sobreviven al widget: destroy() quita los nuestros
+        self._wheel_bindings = [
+            (sequence, self.canvas.bind_all(sequence, self._on_wheel, add="+"))
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>")
+        ]
+
+    def destroy(self):
+        for sequence, funcid in self._wheel_bindings:
+            # unbind_all quitaría también los de otras pantallas: solo nuestra línea
+            script = self.tk.call("bind", "all", sequence)
+            kept = [line for line in script.split("\n") if funcid not in line]
+            self.tk.call("bind", "all", sequence, "\n".join(kept))
+        self._wheel_bindings = []
+        super().destroy()
+
+    # =========================================
+    # DATOS
+    # =========================================
+    def set_items(self, items, empty_text: str = ""):
+        """Reemplaza los elementos; solo se vuelven a enlazar las tarjetas visibles."""
+        self._items = list(items)
+        self._recycle_all()
+        self.canvas.yview_moveto(0)
+        self._update_scrollregion()
+
+        if self._items:
+            self._empty.place_forget()
+        else:
+            self._empty.configure(text=empty_text)
+            self._empty.place(relx=0.5, y=50, anchor="n")
+        self._render()
+
+    def refresh(self):
+        """Vuelve a enlazar lo visible (p. ej. después de editar un elemento)."""
+        self._recycle_all()
+        self._render()
+
+    def __len__(self):
+        return len(self._items)
+
+    # =========================================
+    # RENDER
+    # =========================================
+    def _rows(self) -> int:
+        return math.ceil(len(self._items) / self.columns)
+
+    def _update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self._column_width * self.columns,
+                                            self._rows() * self.row_height))
+
+    def _recycle_all(self):
+        for card, window in self._visible.values():
+            self.canvas.itemconfigure(window, state="hidden")
+            self._pool.append((card, window))
+        self._visible.clear()
+
+    def _render(self):
+        if not self._items:
+            return
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first_row = max(0, int(top // self.row_height) - self.buffer_rows)
+        last_row = min(self._rows() - 1, int((top + height) // self.row_height) + self.buffer_rows)
+        wanted = range(first_row * self.columns, min(len(self._items), (last_row + 1) * self.columns))
+
+        for index in [i for i in self._visible if i not in wanted]:
+            card, window = self._visible.pop(index)
+            self.canvas.itemconfigure(window, state="hidden")
+            self._pool.append((card, window))
+
+        for index in wanted:
+            if index in self._visible:
+                continue
+            if self._pool:
+                card, window = self._pool.pop()
+            else:
+                card = self.card_factory(self.canvas)
+                window = self.canvas.create_window(0, 0, window=card, anchor="nw")
+            card.bind_item(self._items[index])
+            self._place(index, window)
+            self.canvas.itemconfigure(window, state="normal")
+            self._visible[index] = (card, window)
+
+    def _place(self, index: int, window):
+        row, col = divmod(index, self.columns)
+        self.canvas.coords(window, col * self._column_width + self.gap / 2,
+                           row * self.row_height + self.gap / 2)
+        self.canvas.itemconfigure(window, width=max(1, self._column_width - self.gap),
+                                  height=max(1, self.row_height - self.gap))
+
+    # =========================================
+    # EVENTOS
+    # =========================================
+    def _on_resize(self, event):
+        self._column_width = max(1, event.width // self.columns)
+        self._update_scrollregion()
+        for index, (_, window) in self._visible.items():
+            self._place(index, window)
+        self._render()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._render()
+
+    def _on_wheel(self, event):
+        if not self.winfo_exists() or not str(event.widget).startswith(str(self.canvas)):
+            return
+        if self.canvas.yview() == (0.0, 1.0):
+            return
+        if event.num == 4:
+            units = -3
+        elif event.num == 5:
+            units = 3
+        else:
+            units = -3 if event.delta > 0 else 3
+        self.canvas.yview_scroll(units, "units")
+        self._render()